@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк разбора HTML: html.parser целиком против lxml + SoupStrainer
+Меряет время и пиковую память разбора одной страницы на сохраненных фикстурах
+"""
+
+import argparse
+import os
+import re
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup
+
+from html_parsing import (
+    MW_CONTENT, MW_TITLE_AND_CONTENT, QUOTE_CLASS, QUOTE_CONTAINERS,
+    WIKI_WORD_HREF, WIKI_WORD_LINKS, make_soup
+)
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+# Фикстура -> страница, с которой ее можно перезаписать (--record)
+FIXTURE_URLS = {
+    'wikipedia_category_names.html': 'https://ru.wikipedia.org/wiki/Категория:Русские_мужские_имена',
+    'wiktionary_category_nouns.html': 'https://ru.wiktionary.org/wiki/Категория:Существительные_русского_языка',
+    'wikiquote_author.html': 'https://ru.wikiquote.org/wiki/Антон_Чехов',
+    'citaty_info_category.html': 'https://citaty.info/category/mudrost',
+}
+
+QUOTE_TEXT = re.compile(r'[А-Яа-яЁё].*')
+
+# Сценарий: фикстура, фильтр lxml, запрос к дереву (как в парсерах)
+CASES = [
+    ('wikipedia_category_names.html', MW_CONTENT,
+     lambda soup: soup.find_all(['li', 'td', 'a'])),
+    ('wiktionary_category_nouns.html', WIKI_WORD_LINKS,
+     lambda soup: soup.find_all('a', href=WIKI_WORD_HREF)),
+    ('wikiquote_author.html', MW_TITLE_AND_CONTENT,
+     lambda soup: [soup.find('h1')] + soup.find_all(['li', 'p'], string=QUOTE_TEXT)),
+    ('citaty_info_category.html', QUOTE_CONTAINERS,
+     lambda soup: soup.find_all(['div', 'blockquote', 'p'], class_=QUOTE_CLASS)),
+]
+
+
+def parse_before(content: bytes, strainer, query):
+    """Как было: html.parser по всей странице"""
+    return query(BeautifulSoup(content, 'html.parser'))
+
+
+def parse_after(content: bytes, strainer, query):
+    """Как стало: lxml и только нужные поддеревья"""
+    return query(make_soup(content, strainer))
+
+
+def measure(parse, content: bytes, strainer, query, repeat: int):
+    """Медианное время разбора (мс), пиковая память (КБ) и число найденных элементов"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        found = parse(content, strainer, query)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    tracemalloc.start()
+    parse(content, strainer, query)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return statistics.median(timings), peak / 1024, len(found)
+
+
+def record_fixtures():
+    """Перезаписывает фикстуры живыми страницами"""
+    from fetcher import AsyncFetcher
+
+    fetcher = AsyncFetcher()
+    try:
+        for name, url in FIXTURE_URLS.items():
+            response = fetcher.fetch(url, timeout=15)
+            try:
+                response.raise_for_status()
+            except Exception as e:
+                print(f"❌ {url}: {e}")
+                continue
+            with open(os.path.join(FIXTURES_DIR, name), 'wb') as f:
+                f.write(response.content)
+            print(f"💾 {name} ← {url} ({len(response.content):,} байт)")
+    finally:
+        fetcher.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=20, help='число повторов на фикстуру')
+    parser.add_argument('--record', action='store_true', help='обновить фикстуры с живых страниц')
+    args = parser.parse_args()
+
+    if args.record:
+        record_fixtures()
+
+    print(f"{'фикстура':<32} {'было, мс':>9} {'стало, мс':>10} {'x':>6} {'было, КБ':>10} {'стало, КБ':>10} {'элементы':>10}")
+    for name, strainer, query in CASES:
+        with open(os.path.join(FIXTURES_DIR, name), 'rb') as f:
+            content = f.read()
+
+        before_ms, before_kb, before_found = measure(parse_before, content, strainer, query, args.repeat)
+        after_ms, after_kb, after_found = measure(parse_after, content, strainer, query, args.repeat)
+
+        print(f"{name:<32} {before_ms:9.2f} {after_ms:10.2f} {before_ms / after_ms:6.1f} "
+              f"{before_kb:10.0f} {after_kb:10.0f} {before_found:>4} → {after_found:<4}")
+
+
+if __name__ == "__main__":
+    main()
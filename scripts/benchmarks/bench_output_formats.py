@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк форматов вывода: JSON с отступами против компактного (таблица строк)
+Сравнивает размер файла (как есть, gzip, brotli) и время разбора: json.loads +
+декодирование в Python и в Node.js, если он установлен
+"""
+
+import argparse
+import gzip
+import json
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from output import OUTPUT_FORMATS, brotli, decode_compact, serialize
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'src', 'data')
+
+LETTERS = 'абвгдеёжзийклмнопрстуфхцчшщъыьэюя'
+CATEGORIES = ['nature', 'animals', 'people', 'professions', 'home', 'food', 'clothing',
+              'transport', 'city', 'time', 'colors', 'qualities', 'other']
+
+# JSON.parse и, для компактного формата, декодирование (как в src/lib/compactData.ts)
+NODE_PARSE = '''
+const fs = require('fs');
+function decode(value, table) {
+  if (Array.isArray(value)) return value.map((item) => decode(item, table));
+  if (value === null || typeof value !== 'object') return value;
+  const keys = Object.keys(value);
+  if (keys.length === 1) {
+    const item = value[keys[0]];
+    if (keys[0] === '@d') {
+      const result = new Array(item.length);
+      let position = 0;
+      for (let i = 0; i < item.length; i++) { position += item[i]; result[i] = table[position]; }
+      return result;
+    }
+    if (keys[0] === '@i') return item.map((position) => table[position]);
+    if (keys[0] === '@c') {
+      const names = Object.keys(item);
+      const columns = names.map((name) => decode(item[name], table));
+      const rows = new Array(columns.length ? columns[0].length : 0);
+      for (let i = 0; i < rows.length; i++) {
+        const row = {};
+        names.forEach((name, column) => { row[name] = columns[column][i]; });
+        rows[i] = row;
+      }
+      return rows;
+    }
+  }
+  const result = {};
+  for (const key of keys) result[key] = decode(value[key], table);
+  return result;
+}
+const text = fs.readFileSync(process.argv[1], 'utf8');
+const timings = [];
+for (let i = 0; i < Number(process.argv[2]); i++) {
+  const started = process.hrtime.bigint();
+  const data = JSON.parse(text);
+  if (data.format === 'strtab-1') decode(data.data, data.strings);
+  timings.push(Number(process.hrtime.bigint() - started) / 1e6);
+}
+timings.sort((a, b) => a - b);
+console.log(timings[Math.floor(timings.length / 2)]);
+'''
+
+
+def synthetic_words(count: int, seed: int = 1) -> dict:
+    """Набор слов в форме enhanced_words.json"""
+    rng = random.Random(seed)
+    words = set()
+    while len(words) < count:
+        words.add(''.join(rng.choice(LETTERS) for _ in range(rng.randint(3, 12))))
+    words = sorted(words)
+
+    categorized = {category: [] for category in CATEGORIES}
+    for word in words:
+        categorized[rng.choice(CATEGORIES)].append(word)
+
+    return {
+        'words': words,
+        'categorizedWords': categorized,
+        'totalWords': len(words),
+        'sources': ['Синтетический набор'],
+        'lastUpdated': '2000-01-01 00:00:00'
+    }
+
+
+def python_parse_ms(content: bytes, output_format: str, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        data = json.loads(content)
+        if output_format == 'compact':
+            decode_compact(data)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def node_parse_ms(content: bytes, repeat: int):
+    if shutil.which('node') is None:
+        return None
+    with tempfile.NamedTemporaryFile(suffix='.json', delete=False) as f:
+        f.write(content)
+    try:
+        output = subprocess.run(['node', '-e', NODE_PARSE, f.name, str(repeat)],
+                                capture_output=True, text=True, check=True).stdout
+        return float(output)
+    finally:
+        os.unlink(f.name)
+
+
+def datasets(words: int):
+    yield f'synthetic_words_{words}', synthetic_words(words)
+    for name in sorted(os.listdir(DATA_DIR)):
+        if name.endswith('.json') and '.compact.' not in name:
+            with open(os.path.join(DATA_DIR, name), encoding='utf-8') as f:
+                yield name, json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--words', type=int, default=100_000, help='размер синтетического набора слов')
+    parser.add_argument('--repeat', type=int, default=5, help='число повторов разбора')
+    args = parser.parse_args()
+
+    print(f"{'набор':<28} {'формат':<8} {'байт':>11} {'gzip':>10} {'brotli':>10} {'py, мс':>8} {'node, мс':>9}")
+    for name, data in datasets(args.words):
+        for output_format in OUTPUT_FORMATS:
+            content = serialize(data, output_format)
+            gzipped = len(gzip.compress(content, compresslevel=9, mtime=0))
+            brotlied = f'{len(brotli.compress(content, quality=11)):,}' if brotli is not None else '-'
+            py_ms = python_parse_ms(content, output_format, args.repeat)
+            node_ms = node_parse_ms(content, args.repeat)
+            node_column = f'{node_ms:9.2f}' if node_ms is not None else f"{'-':>9}"
+            print(f"{name:<28} {output_format:<8} {len(content):>11,} {gzipped:>10,} {brotlied:>10} "
+                  f"{py_ms:8.2f} {node_column}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,449 @@
+#!/usr/bin/env python3
+"""
+Офлайн-бенчмарк конвейера парсеров на записанных фикстурах
+Страницы отдает локальный сервер-заглушка: запросы загрузчика к реальным
+хостам перенаправляются на него, поэтому источники реестра и parse_* методы
+работают без сети и с воспроизводимым временем. Запросы к MediaWiki API (--mediawiki-api)
+получают записанные ответы list=categorymembers с продолжением. Отдельно меряются валидация, categorize_words,
+remove_duplicates и схлопывание вариантов на синтетических наборах
+1k/100k/1M элементов. Результат пишется в JSON, который можно сравнить
+с прошлым прогоном (--compare)
+"""
+
+import argparse
+import bz2
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from functools import partial
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional
+from urllib.parse import parse_qs, unquote, urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from enhanced_names_parser import EnhancedNamesParser
+from enhanced_words_parser import WORD_VALIDATOR as ENHANCED_WORD_VALIDATOR
+from enhanced_words_parser import EnhancedWordsParser
+from fetcher import AsyncFetcher
+from json_stream import Stream
+from mediawiki import API_PATH
+from normalization import collapse_store, collapse_variants
+from parse_names import RussianNamesParser
+from parse_quotes import QuotesParser
+from parse_words import WORD_VALIDATOR, RussianWordsParser
+from rate_limiter import HostRateLimiter
+from sources import LINES
+from validation import clean_names, is_name_like_text, is_valid_quote
+from word_store import WordStore
+
+BENCH_FORMAT = 'bench-1'
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURES_DIR = os.path.join(BENCH_DIR, 'fixtures')
+API_FIXTURES_DIR = os.path.join(FIXTURES_DIR, 'mediawiki_api')
+RESULTS_DIR = os.path.join(BENCH_DIR, 'results')
+
+DEFAULT_SIZES = (1_000, 100_000, 1_000_000)
+
+# Хост -> записанная страница (см. bench_html_parsing.py --record)
+HOST_FIXTURES = {
+    'ru.wikipedia.org': 'wikipedia_category_names.html',
+    'ru.wiktionary.org': 'wiktionary_category_nouns.html',
+    'ru.wikiquote.org': 'wikiquote_author.html',
+    'citaty.info': 'citaty_info_category.html',
+    'ru.citaty.net': 'citaty_info_category.html',
+}
+# Ответ API на категорию без записанных ответов
+EMPTY_CATEGORY = {'batchcomplete': True, 'query': {'categorymembers': []}}
+# Хост большого списка слов: отдается синтетический файл нужного размера
+WORDLIST_HOST = 'raw.githubusercontent.com'
+
+PARSERS = (RussianWordsParser, EnhancedWordsParser, RussianNamesParser, EnhancedNamesParser, QuotesParser)
+
+LETTERS = 'абвгдеёжзийклмнопрстуфхцчшщъыьэюя'
+AUTHORS = ['Лев Толстой', 'Антон Чехов', 'Альберт Эйнштейн', 'Стив Джобс', 'Уинстон Черчилль', 'Неизвестный автор']
+
+
+def synthetic_words(count: int, seed: int = 1) -> List[str]:
+    """Слова для валидации: в основном русские, с долей мусора, как на реальных страницах"""
+    rng = random.Random(seed)
+    words = []
+    for _ in range(count):
+        roll = rng.random()
+        if roll < 0.03:
+            words.append(rng.choice(['категория', 'страница', 'шаблон', 'правка']))
+        elif roll < 0.06:
+            words.append(''.join(rng.choice('abcdefxyz0123456789') for _ in range(rng.randint(2, 10))))
+        else:
+            words.append(''.join(rng.choice(LETTERS) for _ in range(rng.randint(1, 14))))
+    return words
+
+
+def synthetic_quotes(count: int, seed: int = 1) -> List[Dict]:
+    """Цитаты, десятая часть которых - почти дубликаты предыдущих"""
+    rng = random.Random(seed)
+    quotes = []
+    for _ in range(count):
+        if quotes and rng.random() < 0.1:
+            original = rng.choice(quotes)
+            text = original['text'].replace('е', 'ё', 1).rstrip('.') + '!'
+            quotes.append({'text': text, 'author': rng.choice(AUTHORS)})
+        else:
+            words = [''.join(rng.choice(LETTERS) for _ in range(rng.randint(2, 9))) for _ in range(rng.randint(4, 16))]
+            quotes.append({'text': ' '.join(words).capitalize() + '.', 'author': rng.choice(AUTHORS)})
+    return quotes
+
+
+def synthetic_dump(path: str, count: int, seed: int = 3):
+    """Дамп Викисловаря в формате pages-articles.xml.bz2 из count статей
+
+    Как в настоящем дампе: русские существительные, прилагательные и глаголы,
+    статьи других языков, имена собственные, перенаправления и служебные
+    страницы.
+    """
+    rng = random.Random(seed)
+    templates = [
+        ('сущ ru m ina 1a', 0.35), ('прил ru 1a', 0.15), ('гл ru 1a', 0.1),
+    ]
+    definitions = [' '.join(synthetic_words(40, seed=seed + number)) for number in range(64)]
+    with bz2.open(path, 'wt', encoding='utf-8') as f:
+        f.write('<mediawiki xmlns="http://www.mediawiki.org/xml/export-0.11/" xml:lang="ru">\n'
+                '<siteinfo><sitename>Викисловарь</sitename></siteinfo>\n')
+        for page_id in range(count):
+            title = ''.join(rng.choice(LETTERS) for _ in range(rng.randint(3, 12)))
+            roll = rng.random()
+            ns, redirect, language = 0, '', 'ru'
+            if roll < 0.05:
+                ns = 14
+            elif roll < 0.1:
+                redirect = f'<redirect title="{title}а" />'
+            elif roll < 0.3:
+                language = rng.choice(['en', 'uk', 'be', 'de'])
+            elif roll < 0.35:
+                title = title.capitalize()
+            template = next((name for name, share in templates if rng.random() < share), 'сущ ru f a 1a')
+            text = (f'= {{{{-{language}-}}}} =\n\n=== Морфологические и синтаксические свойства ===\n'
+                    f'{{{{{template}\n|основа={title}\n}}}}\n\n=== Семантические свойства ===\n'
+                    + rng.choice(definitions) + '\n')
+            f.write(f'<page><title>{title}</title><ns>{ns}</ns><id>{page_id}</id>{redirect}'
+                    f'<revision><text xml:space="preserve">{text}</text></revision></page>\n')
+        f.write('</mediawiki>\n')
+
+
+def wordlist(count: int) -> bytes:
+    """Большой список слов, по слову в строке"""
+    return '\n'.join(synthetic_words(count, seed=2)).encode('utf-8')
+
+
+def load_api_fixtures() -> Dict[str, List[Dict]]:
+    """Хост -> записанные порции ответа categorymembers одной категории"""
+    fixtures = {}
+    for name in sorted(os.listdir(API_FIXTURES_DIR)):
+        if name.endswith('.json'):
+            with open(os.path.join(API_FIXTURES_DIR, name), encoding='utf-8') as f:
+                fixture = json.load(f)
+            fixtures[fixture['host']] = fixture['responses']
+    return fixtures
+
+
+class ReplayServer:
+    """Локальный сервер-заглушка: /<хост>/<путь> -> фикстура хоста или 404
+
+    /<хост>/w/api.php отвечает записанными порциями categorymembers хоста
+    (на любую категорию, как и HTML-фикстура отдается на любой путь):
+    порция выбирается по cmcontinue из предыдущей.
+    """
+
+    def __init__(self, wordlist_size: int = DEFAULT_SIZES[0]):
+        self.pages = {}
+        for host, name in HOST_FIXTURES.items():
+            with open(os.path.join(FIXTURES_DIR, name), 'rb') as f:
+                self.pages[host] = f.read()
+        self.api = load_api_fixtures()
+        self.wordlist_size = wordlist_size
+        self._wordlists = {}
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                parts = urlsplit(self.path)
+                host, _, path = unquote(parts.path).lstrip('/').partition('/')
+                if '/' + path == API_PATH:
+                    body = server.api_response(host, parse_qs(parts.query))
+                    content_type = 'application/json; charset=utf-8'
+                else:
+                    body = server.page(host)
+                    content_type = 'text/html; charset=utf-8'
+                if body is None:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.address = f'http://127.0.0.1:{self.httpd.server_address[1]}'
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def page(self, host: str) -> Optional[bytes]:
+        if host == WORDLIST_HOST:
+            if self.wordlist_size not in self._wordlists:
+                self._wordlists[self.wordlist_size] = wordlist(self.wordlist_size)
+            return self._wordlists[self.wordlist_size]
+        return self.pages.get(host)
+
+    def api_response(self, host: str, query: Dict[str, List[str]]) -> Optional[bytes]:
+        if query.get('list') != ['categorymembers']:
+            return None
+        responses = self.api.get(host, [EMPTY_CATEGORY])
+        response = responses[0]
+        token = query.get('cmcontinue', [None])[0]
+        if token is not None:
+            # Следующая порция - та, что идет после порции с этим токеном
+            tokens = [previous.get('continue', {}).get('cmcontinue') for previous in responses]
+            response = responses[tokens.index(token) + 1] if token in tokens else EMPTY_CATEGORY
+        return json.dumps(response, ensure_ascii=False).encode('utf-8')
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class ReplayAdapter(HTTPAdapter):
+    """Транспорт requests, отправляющий любой URL на сервер-заглушку"""
+
+    def __init__(self, address: str):
+        super().__init__()
+        self.address = address
+
+    def send(self, request, **kwargs):
+        original = request.url
+        parts = urlsplit(original)
+        request.url = f'{self.address}/{parts.netloc}{parts.path or "/"}' + (f'?{parts.query}' if parts.query else '')
+        response = super().send(request, **kwargs)
+        response.url = original
+        return response
+
+
+class ReplayFetcher(AsyncFetcher):
+    """Загрузчик без ограничения частоты, все запросы идут на сервер-заглушку"""
+
+    def __init__(self, address: str):
+        super().__init__(rate_limiter=HostRateLimiter(default_rate=1e9, default_burst=10**9, host_limits={}))
+        self.address = address
+
+    def _session(self) -> requests.Session:
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = super()._session()
+            adapter = ReplayAdapter(self.address)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+        return session
+
+
+def count_items(result) -> int:
+    if isinstance(result, dict):
+        return sum(count_items(value) for value in result.values())
+    if isinstance(result, (list, tuple, set, WordStore, Stream)):
+        return len(result)
+    return 0
+
+
+def measure(function: Callable[[], object], repeat: int) -> Dict:
+    """Медиана и минимум времени вызова (с), число элементов результата"""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            started = time.perf_counter()
+            result = function()
+            timings.append(time.perf_counter() - started)
+    return {
+        'seconds': statistics.median(timings),
+        'min': min(timings),
+        'runs': repeat,
+        'items': count_items(result),
+    }
+
+
+def parse_method_cases(server: ReplayServer, sizes: List[int], repeat: int):
+    """Каждый источник реестра и остальные parse_* методы парсеров
+
+    Источник меряется через crawl_source (случай <парсер>.crawl_source[<источник>]),
+    построчный датасет - на каждом размере списка слов. Источники-категории
+    меряются еще и в режиме MediaWiki API (случай <парсер>.crawl_source[<источник>, api]).
+    """
+    fetcher = ReplayFetcher(server.address)
+    try:
+        for parser_class in PARSERS:
+            parser = parser_class(fetcher=fetcher)
+            api_parser = parser_class(fetcher=fetcher, category_api=True)
+            for name in sorted(dir(parser_class)):
+                if not name.startswith('parse_'):
+                    continue
+                case = f'{parser_class.__name__}.{name}'
+                if parser_class is EnhancedWordsParser and name == 'parse_wiktionary_dump':
+                    # Разбор в текущем процессе: время одного воркера на статью
+                    for size in sizes:
+                        with tempfile.TemporaryDirectory() as directory:
+                            path = os.path.join(directory, 'ruwiktionary-bench-pages-articles.xml.bz2')
+                            synthetic_dump(path, size)
+                            dump_parser = parser_class(fetcher=fetcher, wiktionary_dump=path)
+                            yield case, size, measure(dump_parser.parse_wiktionary_dump, repeat)
+                else:
+                    yield case, None, measure(getattr(parser, name), repeat)
+            for source in parser.registry.select(parser_class.NAME):
+                case = f'{parser_class.__name__}.crawl_source[{source.name}]'
+                crawl = partial(parser.crawl_source, source.name)
+                if source.mode == LINES:
+                    for size in sizes:
+                        server.wordlist_size = size
+                        yield case, size, measure(crawl, repeat)
+                else:
+                    yield case, None, measure(crawl, repeat)
+                if source.titles:
+                    case = f'{parser_class.__name__}.crawl_source[{source.name}, api]'
+                    yield case, None, measure(partial(api_parser.crawl_source, source.name), repeat)
+    finally:
+        fetcher.close()
+
+
+def stage_cases(sizes: List[int], repeat: int):
+    """Валидация, категоризация, схлопывание вариантов и дедупликация цитат"""
+    # Загрузчик стадиям не нужен, но парсеры создают его по умолчанию
+    fetcher = AsyncFetcher()
+    words_parser = RussianWordsParser(fetcher=fetcher)
+    enhanced_parser = EnhancedWordsParser(fetcher=fetcher)
+    quotes_parser = QuotesParser(fetcher=fetcher)
+
+    try:
+        yield from _stage_cases(sizes, repeat, words_parser, enhanced_parser, quotes_parser)
+    finally:
+        fetcher.close()
+
+
+def _stage_cases(sizes, repeat, words_parser, enhanced_parser, quotes_parser):
+    for size in sizes:
+        words = synthetic_words(size)
+        valid = sorted(set(ENHANCED_WORD_VALIDATOR.filter(words)))
+        quotes = synthetic_quotes(size)
+
+        cases = [
+            ('validation.parse_words.WORD_VALIDATOR.filter', lambda: list(WORD_VALIDATOR.filter(words))),
+            ('validation.enhanced_words_parser.WORD_VALIDATOR.filter',
+             lambda: list(ENHANCED_WORD_VALIDATOR.filter(words))),
+            ('validation.clean_names', lambda: list(clean_names(words))),
+            ('validation.is_name_like_text', lambda: [word for word in words if is_name_like_text(word)]),
+            ('validation.is_valid_quote', lambda: [quote for quote in quotes if is_valid_quote(quote['text'])]),
+            ('RussianWordsParser.categorize_words', lambda: words_parser.categorize_words(valid)),
+            ('EnhancedWordsParser.categorize_words', lambda: enhanced_parser.categorize_words(valid)),
+            ('normalization.collapse_variants', lambda: collapse_variants(set(valid))[0]),
+            ('normalization.collapse_store', lambda: collapse_store(WordStore(valid))[0]),
+            ('word_store.WordStore', lambda: WordStore(words)),
+            ('word_store.WordStore[spill]', lambda: WordStore(words, max_bytes=0)),
+            ('QuotesParser.remove_duplicates', lambda: quotes_parser.remove_duplicates(quotes)),
+        ]
+        for case, function in cases:
+            yield case, size, measure(function, repeat)
+
+
+def environment() -> Dict:
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=BENCH_DIR, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'commit': commit,
+    }
+
+
+def result_key(result: Dict) -> str:
+    return f"{result['case']}@{result['size']}" if result['size'] is not None else result['case']
+
+
+def print_result(result: Dict, previous: Dict[str, Dict]):
+    size = f"{result['size']:,}" if result['size'] is not None else '-'
+    line = f"{result['case']:<58} {size:>10} {result['seconds'] * 1000:11.2f} {result['items']:>10,}"
+    old = previous.get(result_key(result))
+    if old is not None and old['seconds'] > 0:
+        line += f" {result['seconds'] / old['seconds']:7.2f}x"
+    print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help='размеры синтетических наборов через запятую')
+    parser.add_argument('--repeat', type=int, default=3, help='число повторов каждого замера')
+    parser.add_argument('--only', choices=('parse', 'stages'), help='только parse_* методы или только стадии')
+    parser.add_argument('--output', help='файл результата (по умолчанию benchmarks/results/pipeline-<время>.json)')
+    parser.add_argument('--compare', help='прошлый результат: печатать отношение времени к нему')
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',') if size]
+    previous = {}
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            previous = {result_key(result): result for result in json.load(f)['results']}
+
+    results = []
+    print(f"{'замер':<58} {'размер':>10} {'медиана, мс':>11} {'элементы':>10}" + (f" {'к old':>8}" if previous else ''))
+
+    def record(case, size, measurement):
+        result = {'case': case, 'size': size, **measurement}
+        results.append(result)
+        print_result(result, previous)
+
+    if args.only != 'stages':
+        with ReplayServer() as server:
+            for case, size, measurement in parse_method_cases(server, sizes, args.repeat):
+                record(case, size, measurement)
+    if args.only != 'parse':
+        for case, size, measurement in stage_cases(sizes, args.repeat):
+            record(case, size, measurement)
+
+    report = {
+        'format': BENCH_FORMAT,
+        'generatedAt': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'environment': environment(),
+        'sizes': sizes,
+        'repeat': args.repeat,
+        'results': results,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"pipeline-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"💾 Результат сохранен в {output}")
+
+
+if __name__ == "__main__":
+    main()
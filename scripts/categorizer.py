@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Категоризация слов по тематическим словарям
+Словари хранятся в data/word_categories.json и один раз разворачиваются
+в индекс слово -> категория, так что поиск категории слова - одно
+обращение к dict вместо проверки по всем спискам подряд
+"""
+
+import json
+import os
+from array import array
+from functools import lru_cache, partial
+from itertools import compress, repeat
+from typing import Dict, Iterable, List, Optional
+
+from json_stream import Stream
+from metrics import timed
+
+DEFAULT_CATEGORIES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'word_categories.json')
+
+
+class WordCategorizer:
+    """Индекс слово -> категория с категорией по умолчанию для остальных слов"""
+
+    def __init__(self, vocabulary: Dict[str, List[str]], categories: List[str], fallback: str = 'other',
+                 pos_fallbacks: Optional[Dict[str, str]] = None):
+        self.categories = list(categories)
+        self.fallback = fallback
+        # Категория слова вне словарей по его части речи (прилагательное -> qualities)
+        self.pos_fallbacks = dict(pos_fallbacks or {})
+
+        # Категории перечислены по приоритету: слово из нескольких словарей
+        # (например, «рыба») попадает в первую по порядку
+        self.index = {}
+        for category in self.categories:
+            for word in vocabulary.get(category, ()):
+                self.index.setdefault(word, category)
+
+    @classmethod
+    def from_file(cls, vocabulary: str, path: str = DEFAULT_CATEGORIES_FILE) -> 'WordCategorizer':
+        """Загружает словарь vocabulary из файла категорий"""
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(data['vocabularies'][vocabulary], data['categories'], data.get('fallback', 'other'),
+                   data.get('partOfSpeechFallbacks'))
+
+    def category_of(self, word: str, part_of_speech: Optional[str] = None) -> str:
+        category = self.index.get(word)
+        if category is None:
+            category = self.pos_fallbacks.get(part_of_speech, self.fallback)
+        return category
+
+    @timed('categorize')
+    def categorize(self, words: Iterable[str], parts_of_speech: Optional[Dict[str, str]] = None) -> Dict[str, List[str]]:
+        """Раскладывает слова по категориям, сохраняя их порядок
+
+        parts_of_speech (слово -> часть речи, например из дампа Викисловаря)
+        определяет категорию слов, которых нет в словарях.
+        """
+        result = {category: [] for category in self.categories}
+        result[self.fallback] = []
+
+        lookup = self.index.get
+        fallback = self.fallback
+        if not parts_of_speech:
+            for word in words:
+                result[lookup(word, fallback)].append(word)
+            return result
+
+        pos_of = parts_of_speech.get
+        pos_fallback = self.pos_fallbacks.get
+        for word in words:
+            category = lookup(word)
+            if category is None:
+                category = pos_fallback(pos_of(word), fallback)
+            result[category].append(word)
+        return result
+
+    @timed('categorize')
+    def categorize_stream(self, words: Iterable[str], parts_of_speech: Optional[Dict[str, str]] = None
+                          ) -> Dict[str, Stream]:
+        """То же, что categorize, но категории - потоки, а не списки слов
+
+        words обходится повторно в одном и том же порядке (хранилище слов,
+        Stream). Принадлежность хранится номером категории - байтом на
+        слово, и поток категории при обходе выбирает свои слова из words.
+        """
+        labels = list(dict.fromkeys(self.categories + [self.fallback]))
+        number = {label: position for position, label in enumerate(labels)}
+
+        lookup = self.index.get
+        if not parts_of_speech:
+            categories = map(lookup, words, repeat(self.fallback))
+        else:
+            pos_of = parts_of_speech.get
+            pos_fallback = self.pos_fallbacks.get
+            fallback = self.fallback
+
+            def category_of(word: str) -> str:
+                category = lookup(word)
+                return category if category is not None else pos_fallback(pos_of(word), fallback)
+
+            categories = map(category_of, words)
+        members = array('B' if len(labels) <= 256 else 'H', map(number.__getitem__, categories))
+        return {label: Stream(partial(_select, words, members, position), members.count(position))
+                for label, position in number.items()}
+
+
+def _select(words: Iterable[str], members: array, position: int) -> Iterable[str]:
+    return compress(words, map(position.__eq__, members))
+
+
+@lru_cache(maxsize=None)
+def load_categorizer(vocabulary: str, path: str = DEFAULT_CATEGORIES_FILE) -> WordCategorizer:
+    """Категоризатор словаря vocabulary, загружается один раз на процесс"""
+    return WordCategorizer.from_file(vocabulary, path)
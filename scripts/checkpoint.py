@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Хранилище контрольных точек парсинга
+Записывает результат каждого обработанного URL в SQLite сразу после
+обработки, чтобы упавший запуск можно было продолжить с флагом --resume
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List
+
+DEFAULT_CHECKPOINT_DIR = '.checkpoints'
+
+
+class CheckpointStore:
+    """Журнал обработанных URL и извлеченных из них элементов"""
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript('''
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                completed_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS items (
+                url TEXT NOT NULL,
+                dataset TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                item TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS items_url ON items (url);
+        ''')
+        self._db.commit()
+
+    @classmethod
+    def for_parser(cls, name: str, directory: str = DEFAULT_CHECKPOINT_DIR) -> 'CheckpointStore':
+        """Хранилище для конкретного парсера"""
+        return cls(os.path.join(directory, f'{name}.sqlite'))
+
+    def reset(self):
+        """Начинает журнал заново (запуск без --resume)"""
+        with self._lock:
+            self._db.execute('DELETE FROM items')
+            self._db.execute('DELETE FROM pages')
+            self._db.commit()
+
+    def is_completed(self, url: str) -> bool:
+        with self._lock:
+            row = self._db.execute('SELECT 1 FROM pages WHERE url = ?', (url,)).fetchone()
+        return row is not None
+
+    def completed_urls(self) -> List[str]:
+        with self._lock:
+            return [row[0] for row in self._db.execute('SELECT url FROM pages ORDER BY completed_at')]
+
+    def record(self, url: str, items: Dict[str, Iterable]):
+        """Атомарно записывает элементы страницы и отмечает ее обработанной"""
+        rows = []
+        for dataset, values in items.items():
+            for position, value in enumerate(values):
+                rows.append((url, dataset, position, json.dumps(value, ensure_ascii=False)))
+
+        with self._lock:
+            with self._db:
+                self._db.execute('DELETE FROM items WHERE url = ?', (url,))
+                self._db.executemany(
+                    'INSERT INTO items (url, dataset, position, item) VALUES (?, ?, ?, ?)', rows
+                )
+                self._db.execute(
+                    'INSERT OR REPLACE INTO pages (url, completed_at) VALUES (?, ?)', (url, time.time())
+                )
+
+    def items(self, url: str) -> Dict[str, List]:
+        """Элементы, сохраненные для URL"""
+        result = {}
+        with self._lock:
+            rows = self._db.execute(
+                'SELECT dataset, item FROM items WHERE url = ? ORDER BY dataset, position', (url,)
+            ).fetchall()
+        for dataset, item in rows:
+            result.setdefault(dataset, []).append(json.loads(item))
+        return result
+
+    def close(self):
+        with self._lock:
+            self._db.close()
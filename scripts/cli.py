@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Общие параметры командной строки для всех парсеров
+"""
+
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Callable, Optional
+
+from checkpoint import DEFAULT_CHECKPOINT_DIR, CheckpointStore
+from fetcher import AsyncFetcher
+from http_cache import DEFAULT_CACHE_DIR, DEFAULT_MAX_BYTES, HttpCache
+from metrics import DEFAULT_METRICS_DIR, METRICS
+from output import OUTPUT_FORMATS, DatasetWriter
+from word_store import WordStore
+
+
+def build_arg_parser(description: str) -> argparse.ArgumentParser:
+    """Создает парсер аргументов с общими для всех скриптов флагами"""
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('--offline', action='store_true',
+                        help='не ходить в сеть, брать ответы только из кэша')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='не использовать дисковый кэш ответов')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR,
+                        help=f'папка кэша ответов (по умолчанию {DEFAULT_CACHE_DIR})')
+    parser.add_argument('--cache-max-mb', type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024),
+                        help='максимальный размер кэша в мегабайтах')
+    parser.add_argument('--resume', action='store_true',
+                        help='продолжить прерванный запуск, пропуская уже обработанные URL')
+    parser.add_argument('--checkpoint-dir', default=DEFAULT_CHECKPOINT_DIR,
+                        help=f'папка контрольных точек (по умолчанию {DEFAULT_CHECKPOINT_DIR})')
+    parser.add_argument('--parse-workers', type=int, default=os.cpu_count() or 1,
+                        help='число процессов для разбора HTML (1 - разбор в основном процессе)')
+    parser.add_argument('--output-format', choices=OUTPUT_FORMATS + ('all',), default='json',
+                        help='формат результата: json с отступами, compact (таблица строк и индексы) или оба')
+    parser.add_argument('--precompress', action='store_true',
+                        help='положить рядом с результатом сжатые копии .gz и .br')
+    parser.add_argument('--flat-lists', action='store_true',
+                        help='в json писать списки одной строкой, без отступа перед каждым элементом')
+    parser.add_argument('--shard-size', type=int, default=0,
+                        help='дополнительно записать списки частями по N элементов с манифестом (0 - не писать)')
+    parser.add_argument('--mediawiki-api', action='store_true',
+                        help='обходить категории Википедии/Викисловаря через API (list=categorymembers), а не HTML')
+    parser.add_argument('--wiktionary-dump',
+                        help='локальный дамп ruwiktionary-*-pages-articles.xml.bz2 вместо страниц категорий Викисловаря')
+    parser.add_argument('--memory-limit-mb', type=int, default=0,
+                        help='память под отсортированные слова и имена; сверх нее они выгружаются на диск (0 - без предела)')
+    parser.add_argument('--spill-dir',
+                        help='папка временных файлов выгрузки (по умолчанию системная временная папка)')
+    parser.add_argument('--metrics-dir', default=DEFAULT_METRICS_DIR,
+                        help=f'папка отчетов о времени стадий в JSON и Prometheus (по умолчанию {DEFAULT_METRICS_DIR})')
+    return parser
+
+
+def create_fetcher(args: argparse.Namespace, user_agent: str) -> AsyncFetcher:
+    """Создает загрузчик по аргументам командной строки"""
+    if args.offline and args.no_cache:
+        raise SystemExit("❌ --offline нельзя сочетать с --no-cache")
+
+    cache = None
+    if not args.no_cache:
+        cache = HttpCache(args.cache_dir, max_bytes=args.cache_max_mb * 1024 * 1024)
+
+    return AsyncFetcher(user_agent=user_agent, cache=cache, cache_only=args.offline)
+
+
+def create_checkpoint(args: argparse.Namespace, name: str) -> CheckpointStore:
+    """Открывает контрольную точку парсера; без --resume начинает ее заново"""
+    checkpoint = CheckpointStore.for_parser(name, args.checkpoint_dir)
+    if args.resume:
+        print(f"♻️  Продолжаю с контрольной точки: {len(checkpoint.completed_urls())} URL уже обработано")
+    else:
+        checkpoint.reset()
+    return checkpoint
+
+
+def create_parse_pool(args: argparse.Namespace) -> Optional[ProcessPoolExecutor]:
+    """Пул процессов для разбора страниц или None при --parse-workers 1"""
+    if args.parse_workers <= 1:
+        return None
+    return ProcessPoolExecutor(max_workers=args.parse_workers)
+
+
+def create_writer(args: argparse.Namespace) -> DatasetWriter:
+    """Запись результата в форматах из --output-format"""
+    formats = OUTPUT_FORMATS if args.output_format == 'all' else (args.output_format,)
+    return DatasetWriter(formats, precompress=args.precompress, shard_size=args.shard_size,
+                         flat_lists=args.flat_lists, word_store=create_word_store(args))
+
+
+def create_word_store(args: argparse.Namespace) -> Callable[..., WordStore]:
+    """Фабрика хранилищ слов с пределом памяти из --memory-limit-mb"""
+    max_bytes = args.memory_limit_mb * 1024 * 1024 if args.memory_limit_mb > 0 else None
+    if args.spill_dir:
+        os.makedirs(args.spill_dir, exist_ok=True)
+    return partial(WordStore, max_bytes=max_bytes, spill_dir=args.spill_dir)
+
+
+def export_metrics(args: argparse.Namespace, name: str):
+    """Выгружает метрики запуска и печатает самые долгие стадии и хосты"""
+    json_path, prom_path = METRICS.export(args.metrics_dir, name)
+    for timing in METRICS.slowest('stage_seconds') + METRICS.slowest('fetch_seconds', limit=3):
+        label = ', '.join(f'{key}={value}' for key, value in timing['labels'].items())
+        print(f"⏱️  {timing['name']} [{label}]: {timing['sum']:.2f} с за {timing['count']} вызовов")
+    print(f"📈 Метрики сохранены в {json_path} и {prom_path}")
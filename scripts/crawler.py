@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Обход списка страниц: загрузка, извлечение данных и контрольные точки
+Общий движок для всех источников из реестра (sources.py)
+"""
+
+import os
+import time
+from concurrent.futures import Executor, Future, ThreadPoolExecutor, as_completed
+from functools import partial
+from itertools import chain
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from checkpoint import CheckpointStore
+from fetcher import DEFAULT_USER_AGENT, AsyncFetcher, FetchResult
+from mediawiki import CategoryMembers, is_category_url
+from metrics import METRICS
+from output import DatasetWriter
+from sources import LINES, PAGES, Source, SourceRegistry, load_registry
+from word_store import WordStore
+
+# Функция извлечения: ответ -> {имя набора: [элементы]}
+Extractor = Callable[[FetchResult], Dict[str, List]]
+# Задание обхода: URL, функция извлечения, таймаут запроса
+CrawlJob = Tuple[List[str], Extractor, float]
+
+# Ключ контрольной точки категории, обойденной через MediaWiki API
+CATEGORY_API_MARK = '#categorymembers'
+
+
+def _checkpoint_key(name: str, url: str) -> str:
+    """Ключ страницы задания в контрольной точке
+
+    У каждого задания своя функция извлечения, поэтому один и тот же URL
+    разных заданий хранится отдельно.
+    """
+    return f'{name}#{url}' if name else url
+
+
+def _timed_extract(extract: Extractor, response: FetchResult) -> Tuple[Dict[str, List], float]:
+    """Извлечение с замером времени там, где оно выполняется (в том числе в воркере),
+    чтобы ожидание в очереди пула не попадало во время разбора"""
+    started = time.perf_counter()
+    items = extract(response)
+    return items, time.perf_counter() - started
+
+
+def _pooled_extract(extract: Extractor, response: FetchResult) -> Tuple[Dict[str, List], float, Dict]:
+    """_timed_extract в процессе-воркере; возвращает еще и прирост счетчиков METRICS
+
+    Счетчики, которые увеличивает извлечение (например, проверки
+    валидаторов), иначе остались бы в копии METRICS воркера.
+    """
+    before = METRICS.counters()
+    items, seconds = _timed_extract(extract, response)
+    return items, seconds, METRICS.counters_since(before)
+
+
+def _pooled_result(parse: Future) -> Tuple[Dict[str, List], float]:
+    """Результат _pooled_extract; прирост счетчиков воркера переносится в METRICS"""
+    items, seconds, counters = parse.result()
+    METRICS.add_counters(counters)
+    return items, seconds
+
+
+class Crawler:
+    """Загружает страницы и обрабатывает их по мере поступления
+
+    Если задан parse_pool (ProcessPoolExecutor), разбор страниц выполняется
+    в процессах-воркерах: туда уходит тело страницы, обратно возвращаются
+    только извлеченные элементы. Функция извлечения должна сериализоваться
+    через pickle (метод парсера или functools.partial от него).
+    """
+
+    def __init__(self, fetcher: AsyncFetcher, checkpoint: Optional[CheckpointStore] = None,
+                 parse_pool: Optional[Executor] = None):
+        self.fetcher = fetcher
+        self.checkpoint = checkpoint
+        self.parse_pool = parse_pool
+
+    def crawl(self, urls: List[str], extract: Extractor, timeout: float = 10) -> Dict[str, List]:
+        """Обходит URL и объединяет извлеченные элементы в порядке urls"""
+        return self.crawl_many({'': (urls, extract, timeout)})['']
+
+    def crawl_many(self, jobs: Dict[str, CrawlJob]) -> Dict[str, Dict[str, List]]:
+        """Обходит URL нескольких заданий одним расписанием
+
+        jobs: имя -> (URL, функция извлечения, таймаут). Все URL ставятся
+        в очередь загрузчика сразу, поэтому страницы разных источников
+        загружаются и разбираются вперемешку. Элементы каждого задания
+        объединяются в порядке его URL.
+
+        Страницы, уже обработанные в прошлом запуске, берутся из контрольной
+        точки без загрузки. Результат каждой новой страницы записывается
+        в контрольную точку сразу после ее обработки.
+        """
+        per_url = {}
+        fetches = {}
+        for name, (urls, extract, timeout) in jobs.items():
+            for url in urls:
+                key = _checkpoint_key(name, url)
+                if self.checkpoint is not None and self.checkpoint.is_completed(key):
+                    print(f"⏭️  Уже обработано: {url}")
+                    per_url[name, url] = self.checkpoint.items(key)
+                else:
+                    fetches[self.fetcher.submit(url, timeout)] = (name, url, extract)
+
+        parses = {}
+        for fetch in as_completed(fetches):
+            name, url, extract = fetches[fetch]
+            response = fetch.result()
+            print(f"📄 Обрабатываю: {url}")
+            if response.error is not None:
+                print(f"❌ Ошибка при парсинге {url}: {response.error}")
+                continue
+
+            if self.parse_pool is None:
+                self._collect(name, url, lambda: _timed_extract(extract, response), per_url)
+            else:
+                parses[self.parse_pool.submit(_pooled_extract, extract, response)] = (name, url)
+
+        for parse in as_completed(parses):
+            self._collect(*parses[parse], partial(_pooled_result, parse), per_url)
+
+        results = {}
+        for name, (urls, _, _) in jobs.items():
+            merged = results[name] = {}
+            for url in urls:
+                for dataset, values in per_url.get((name, url), {}).items():
+                    merged.setdefault(dataset, []).extend(values)
+        return results
+
+    def _collect(self, name: str, url: str, get_items: Callable[[], Tuple[Dict[str, List], float]],
+                 per_url: Dict[Tuple[str, str], Dict]):
+        """Получает элементы страницы и записывает их в контрольную точку"""
+        host = urlparse(url).netloc
+        try:
+            items, seconds = get_items()
+        except Exception as e:
+            print(f"❌ Ошибка при парсинге {url}: {e}")
+            METRICS.inc('parse_errors_total', host=host)
+            return
+
+        METRICS.observe('parse_seconds', seconds, host=host)
+        for dataset, values in items.items():
+            METRICS.inc('items_extracted_total', len(values), host=host, dataset=dataset)
+        METRICS.event('parse', url=url, seconds=round(seconds, 6),
+                      items={dataset: len(values) for dataset, values in items.items()})
+
+        if self.checkpoint is not None:
+            self.checkpoint.record(_checkpoint_key(name, url), items)
+        per_url[name, url] = items
+
+
+class SourceParser:
+    """Основа парсеров: загрузчик, обход страниц, воркеры разбора и запись результата"""
+
+    USER_AGENT = DEFAULT_USER_AGENT
+    # Имя парсера: группа источников в реестре, контрольная точка, отчет метрик
+    NAME = ''
+
+    def __init__(self, fetcher: Optional[AsyncFetcher] = None, checkpoint: Optional[CheckpointStore] = None,
+                 parse_pool: Optional[Executor] = None, writer: Optional[DatasetWriter] = None,
+                 registry: Optional[SourceRegistry] = None, category_api: bool = False,
+                 word_store: Callable[..., WordStore] = WordStore):
+        self.fetcher = fetcher or AsyncFetcher(user_agent=self.USER_AGENT)
+        self.checkpoint = checkpoint
+        self.parse_pool = parse_pool
+        self.writer = writer or DatasetWriter()
+        self.registry = registry or load_registry()
+        # Категории MediaWiki через list=categorymembers вместо HTML-страниц
+        self.category_api = category_api
+        # Фабрика хранилищ для очистки и сортировки больших наборов (--memory-limit-mb)
+        self.word_store = word_store
+        self.crawler = Crawler(self.fetcher, checkpoint, parse_pool)
+
+    def __getstate__(self):
+        # В процесс-воркер уходят только настройки разбора, без сетевых
+        # ресурсов, пула, контрольной точки и реестра источников
+        state = self.__dict__.copy()
+        for name in ('fetcher', 'checkpoint', 'parse_pool', 'crawler', 'writer', 'registry'):
+            state.pop(name, None)
+        return state
+
+    def crawl_sources(self, names: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, Iterable]]:
+        """Выполняет источники парсера из реестра одним общим расписанием
+
+        Страницы всех источников ставятся в очередь загрузчика сразу, так
+        что разные сайты загружаются и разбираются одновременно, а
+        вежливость по каждому хосту соблюдает сам загрузчик. Построчные
+        датасеты читаются в отдельных потоках параллельно со страницами.
+        Возвращает источник -> {набор: элементы}: список для страниц,
+        хранилище слов для построчного датасета.
+        """
+        sources = self.registry.select(self.NAME, names)
+        for source in sources:
+            print(f"🔍 {source.title}...")
+            if source.rate_limit is not None:
+                for host in source.hosts:
+                    self.fetcher.rate_limiter.set_limit(host, *source.rate_limit)
+
+        line_sources = [source for source in sources if source.mode == LINES]
+        jobs = {}
+        categories = {}
+        for source in sources:
+            if source.mode != PAGES:
+                continue
+            urls = source.urls
+            if self.category_api and source.titles:
+                categories[source.name] = (source, [url for url in urls if is_category_url(url)])
+                urls = [url for url in urls if not is_category_url(url)]
+            jobs[source.name] = (urls, source.extractor(self), source.timeout)
+
+        with METRICS.timer('stage_seconds', stage='crawl'):
+            with ThreadPoolExecutor(max_workers=len(line_sources) + 1) as pool:
+                line_futures = {source.name: pool.submit(self._read_lines, source) for source in line_sources}
+                category_future = pool.submit(self._read_categories, categories) if categories else None
+                results = self.crawler.crawl_many(jobs)
+                for name, future in line_futures.items():
+                    results[name] = future.result()
+                if category_future is not None:
+                    for name, datasets in category_future.result().items():
+                        for dataset, values in datasets.items():
+                            results[name].setdefault(dataset, []).extend(values)
+
+        return {source.name: results[source.name] for source in sources}
+
+    def crawl_source(self, name: str) -> Dict[str, Iterable]:
+        """Элементы одного источника из реестра"""
+        return self.crawl_sources([name])[name]
+
+    def collect_sources(self, names: Optional[Iterable[str]] = None) -> Dict[str, Iterator]:
+        """Элементы всех источников по наборам в порядке реестра
+
+        Наборы не копируются в общий список: каждый - одноразовый итератор
+        по элементам источников подряд.
+        """
+        merged = {}
+        for datasets in self.crawl_sources(names).values():
+            for dataset, values in datasets.items():
+                merged.setdefault(dataset, []).append(values)
+        return {dataset: chain.from_iterable(parts) for dataset, parts in merged.items()}
+
+    def _read_categories(self, categories: Dict[str, Tuple[Source, List[str]]]) -> Dict[str, Dict[str, List]]:
+        """Категории источников через MediaWiki API, все категории одновременно
+
+        Заголовки каждой категории разбирает метод источника titles; результат
+        записывается в контрольную точку под URL категории с пометкой API.
+        """
+        per_url = {}
+        pending = []
+        for name, (source, urls) in categories.items():
+            for url in urls:
+                key = url + CATEGORY_API_MARK
+                if self.checkpoint is not None and self.checkpoint.is_completed(key):
+                    print(f"⏭️  Уже обработано: {url}")
+                    per_url[name, url] = self.checkpoint.items(key)
+                else:
+                    pending.append((source, url))
+
+        timeout = max(source.timeout for source, _ in categories.values())
+        titles = CategoryMembers(self.fetcher, timeout).titles(dict.fromkeys(url for _, url in pending))
+        for source, url in pending:
+            if url not in titles:
+                continue
+            items = getattr(self, source.titles)(url, titles[url])
+            host = urlparse(url).netloc
+            for dataset, values in items.items():
+                METRICS.inc('items_extracted_total', len(values), host=host, dataset=dataset)
+            if self.checkpoint is not None:
+                self.checkpoint.record(url + CATEGORY_API_MARK, items)
+            per_url[source.name, url] = items
+
+        results = {}
+        for name, (_, urls) in categories.items():
+            merged = results[name] = {}
+            for url in urls:
+                for dataset, values in per_url.get((name, url), {}).items():
+                    merged.setdefault(dataset, []).extend(values)
+        return results
+
+    def _read_lines(self, source: Source) -> Dict[str, WordStore]:
+        """Построчный источник: каждый файл читается потоком и сразу фильтруется
+
+        Строки копятся не в списке, а в хранилище self.word_store(), так что
+        при --memory-limit-mb датасет больше памяти выгружается на диск.
+        Датасеты не пишутся в контрольную точку: при --resume они
+        перечитываются из кэша ответов без загрузки по сети.
+        """
+        extract = source.extractor(self)
+        items = self.word_store()
+        for url in source.urls:
+            try:
+                print(f"📄 Загружаю датасет: {url}")
+                items.update(extract(self.fetcher.stream_lines(url, timeout=source.timeout)))
+            except Exception as e:
+                print(f"❌ Ошибка датасета {url}: {e}")
+        return {source.dataset: items}
+
+    def save_to_json(self, data, filename: str):
+        """Сохраняет данные в файл в форматах, выбранных в writer"""
+        with METRICS.timer('stage_seconds', stage='save', file=os.path.basename(filename)):
+            self.writer.save(data, filename)
+
+    def save_shards(self, directory: str, datasets: Dict[str, List[str]]):
+        """Сохраняет списки частями для выборочной загрузки (при --shard-size)"""
+        with METRICS.timer('stage_seconds', stage='save_shards', file=os.path.basename(directory)):
+            self.writer.save_shards(directory, datasets)
+
+    def close(self):
+        """Освобождает загрузчик, пул разбора и контрольную точку"""
+        self.fetcher.close()
+        if self.parse_pool is not None:
+            self.parse_pool.shutdown()
+        if self.checkpoint is not None:
+            self.checkpoint.close()
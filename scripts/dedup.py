@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Поиск почти одинаковых цитат
+Одна и та же цитата с разных сайтов отличается кавычками, пунктуацией,
+пробелами и «ё». Тексты нормализуются и разбиваются на шинглы (пары слов),
+по шинглам считается MinHash-подпись, а подписи раскладываются по корзинам
+LSH. Сравниваются только цитаты из общей корзины, поэтому время работы
+растет почти линейно, а не квадратично от числа цитат
+"""
+
+import hashlib
+import random
+import re
+from typing import Dict, FrozenSet, List
+
+from metrics import timed
+
+UNKNOWN_AUTHOR = 'Неизвестный автор'
+
+# Все, кроме букв и цифр, считается разделителем слов
+NON_WORD_CHARS = re.compile(r'[\W_]+')
+
+
+def normalize_text(text: str) -> str:
+    """Текст без регистра, пунктуации, кавычек и различия е/ё"""
+    return NON_WORD_CHARS.sub(' ', text.lower().replace('ё', 'е')).strip()
+
+
+def shingles(normalized: str) -> FrozenSet[int]:
+    """Хеши пар соседних слов (для однословного текста - самого слова)"""
+    words = normalized.split()
+    if len(words) < 2:
+        grams = words
+    else:
+        grams = [f'{first} {second}' for first, second in zip(words, words[1:])]
+    return frozenset(
+        int.from_bytes(hashlib.blake2b(gram.encode('utf-8'), digest_size=8).digest(), 'little') for gram in grams
+    )
+
+
+def jaccard(first: FrozenSet[int], second: FrozenSet[int]) -> float:
+    if not first and not second:
+        return 1.0
+    return len(first & second) / len(first | second)
+
+
+class _DisjointSet:
+    """Объединение цитат в группы дубликатов"""
+
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+
+    def find(self, item: int) -> int:
+        parent = self.parent
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    def union(self, first: int, second: int):
+        first, second = self.find(first), self.find(second)
+        if first != second:
+            # Корнем группы остается цитата, встреченная раньше
+            if second < first:
+                first, second = second, first
+            self.parent[second] = first
+
+
+class NearDuplicateIndex:
+    """MinHash + LSH: находит группы почти одинаковых текстов
+
+    Подпись - минимумы хешей шинглов, перемешанных bands * rows случайными
+    64-битными масками. Подпись делится на bands полос по rows значений,
+    тексты с совпавшей полосой становятся кандидатами. При bands=10, rows=2
+    пара со сходством 0.7 попадает в общую корзину с вероятностью ~99.9%;
+    окончательное решение принимается по точному сходству Жаккара
+    (threshold), так что ложные кандидаты не склеиваются.
+    """
+
+    def __init__(self, bands: int = 10, rows: int = 2, threshold: float = 0.7, seed: int = 1):
+        self.bands = bands
+        self.rows = rows
+        self.threshold = threshold
+        rng = random.Random(seed)
+        self.masks = [rng.getrandbits(64) for _ in range(bands * rows)]
+
+    def signature(self, hashes: FrozenSet[int]) -> List[int]:
+        if not hashes:
+            return [0] * len(self.masks)
+        return [min(map(mask.__xor__, hashes)) for mask in self.masks]
+
+    def groups(self, texts: List[str]) -> List[int]:
+        """Номер группы (индекс первого текста группы) для каждого текста"""
+        disjoint = _DisjointSet(len(texts))
+        exact = {}
+        sets = {}
+        buckets = {}
+        rows = self.rows
+
+        for position, text in enumerate(texts):
+            normalized = normalize_text(text)
+
+            # Точные совпадения после нормализации - без подписи
+            first = exact.setdefault(normalized, position)
+            if first != position:
+                disjoint.union(first, position)
+                continue
+
+            sets[position] = hashes = shingles(normalized)
+            signature = self.signature(hashes)
+            for band in range(self.bands):
+                key = (band, *signature[band * rows:(band + 1) * rows])
+                buckets.setdefault(key, []).append(position)
+
+        for members in buckets.values():
+            if len(members) < 2:
+                continue
+            for index, first in enumerate(members):
+                for second in members[index + 1:]:
+                    if disjoint.find(first) == disjoint.find(second):
+                        continue
+                    if jaccard(sets[first], sets[second]) >= self.threshold:
+                        disjoint.union(first, second)
+
+        return [disjoint.find(position) for position in range(len(texts))]
+
+
+def has_known_author(quote: Dict) -> bool:
+    author = quote.get('author', '').strip()
+    return bool(author) and author != UNKNOWN_AUTHOR
+
+
+@timed('dedup')
+def remove_near_duplicates(quotes: List[Dict], index: NearDuplicateIndex = None) -> List[Dict]:
+    """Оставляет по одной цитате из каждой группы почти одинаковых
+
+    Из группы выбирается первая цитата с известным автором, а если
+    автора нет ни у одной - первая по порядку. Цитата остается на месте
+    первого члена своей группы.
+    """
+    index = index or NearDuplicateIndex()
+    groups = index.groups([quote['text'] for quote in quotes])
+
+    best = {}
+    for position, group in enumerate(groups):
+        current = best.get(group)
+        if current is None or (not has_known_author(quotes[current]) and has_known_author(quotes[position])):
+            best[group] = position
+
+    return [quotes[best[group]] for group in sorted(best)]
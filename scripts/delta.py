@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Отчет об изменениях между двумя сборками набора данных
+Списки строк в результатах уже отсортированы, поэтому добавленные и
+удаленные элементы находятся одним проходом слиянием двух списков; списки
+могут быть и потоками json_stream.Stream. Цитаты
+сравниваются парами (автор, текст) и группируются по автору
+"""
+
+import json
+import os
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from json_stream import Stream
+
+DELTA_FORMAT = 'delta-1'
+
+
+def delta_filename(filename: str) -> str:
+    """enhanced_words.json -> enhanced_words.delta.json"""
+    root, extension = os.path.splitext(filename)
+    return f'{root}.delta{extension or ".json"}'
+
+
+def _ensure_sorted(items: Iterable) -> Iterable:
+    # Поток (длинный список) проверяется одним проходом и обычно уже отсортирован
+    following = iter(items)
+    next(following, None)
+    if all(previous <= current for previous, current in zip(items, following)):
+        return items
+    return sorted(items)
+
+
+def merge_diff(old: Iterable, new: Iterable) -> Tuple[List, List]:
+    """Добавленные и удаленные элементы двух отсортированных последовательностей"""
+    added, removed = [], []
+    old_iter, new_iter = iter(old), iter(new)
+    missing = object()
+    old_item, new_item = next(old_iter, missing), next(new_iter, missing)
+
+    while old_item is not missing and new_item is not missing:
+        if old_item == new_item:
+            old_item, new_item = next(old_iter, missing), next(new_iter, missing)
+        elif old_item < new_item:
+            removed.append(old_item)
+            old_item = next(old_iter, missing)
+        else:
+            added.append(new_item)
+            new_item = next(new_iter, missing)
+
+    while old_item is not missing:
+        removed.append(old_item)
+        old_item = next(old_iter, missing)
+    while new_item is not missing:
+        added.append(new_item)
+        new_item = next(new_iter, missing)
+    return added, removed
+
+
+def _is_quote_list(value: Any) -> bool:
+    return isinstance(value, list) and bool(value) and all(
+        isinstance(item, dict) and 'text' in item and 'author' in item for item in value
+    )
+
+
+def _is_string_list(value: Any) -> bool:
+    if isinstance(value, Stream):
+        return isinstance(next(iter(value), ''), str)
+    return isinstance(value, list) and all(isinstance(item, str) for item in value)
+
+
+def _diff_quotes(old: List[Dict], new: List[Dict]) -> Dict:
+    old_pairs = _ensure_sorted([(quote['author'], quote['text']) for quote in old])
+    new_pairs = _ensure_sorted([(quote['author'], quote['text']) for quote in new])
+    added, removed = merge_diff(old_pairs, new_pairs)
+
+    by_author = {}
+    for kind, pairs in (('added', added), ('removed', removed)):
+        for author, text in pairs:
+            by_author.setdefault(author, {'added': [], 'removed': []})[kind].append(text)
+    return {'added': len(added), 'removed': len(removed), 'byAuthor': dict(sorted(by_author.items()))}
+
+
+def _walk(old: Any, new: Any, path: str, changes: Dict):
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key in sorted(set(old) | set(new)):
+            _walk(old.get(key, []), new.get(key, []), f'{path}.{key}' if path else key, changes)
+    elif _is_quote_list(old) or _is_quote_list(new):
+        diff = _diff_quotes(old or [], new or [])
+        if diff['added'] or diff['removed']:
+            changes[path] = diff
+    elif _is_string_list(old) and _is_string_list(new):
+        added, removed = merge_diff(_ensure_sorted(old), _ensure_sorted(new))
+        if added or removed:
+            changes[path] = {'added': added, 'removed': removed}
+
+
+def diff_datasets(old: Any, new: Any) -> Dict:
+    """Изменения по всем спискам набора: путь к списку -> добавленные/удаленные"""
+    changes = {}
+    _walk(old, new, '', changes)
+    return changes
+
+
+def _count(value: Any) -> int:
+    # У строковых списков - сами элементы, у цитат - число (подробности в byAuthor)
+    return value if isinstance(value, int) else len(value)
+
+
+def build_delta(name: str, old: Any, new: Any, from_version: Optional[str], to_version: str) -> Dict:
+    changes = diff_datasets(old, new)
+    added = sum(_count(change['added']) for change in changes.values())
+    removed = sum(_count(change['removed']) for change in changes.values())
+    return {
+        'format': DELTA_FORMAT,
+        'dataset': name,
+        'from': from_version,
+        'to': to_version,
+        'summary': {'added': added, 'removed': removed},
+        'changes': changes,
+    }
+
+
+def load_delta(filename: str) -> Optional[Dict]:
+    path = delta_filename(filename)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def format_summary(delta: Dict) -> str:
+    """Одна строка на список: путь +добавлено -удалено"""
+    lines = []
+    for path, change in delta['changes'].items():
+        lines.append(f"   {path}: +{_count(change['added'])} -{_count(change['removed'])}")
+    return '\n'.join(lines)
@@ -4,162 +4,124 @@
 Собирает данные с nazovite.ru, Википедии и других надежных источников
 """
 
-import requests
-from bs4 import BeautifulSoup
-import json
 import re
 import time
-from typing import List, Set, Dict
+from itertools import chain
+from typing import Dict, Iterable, List, Set
 from urllib.parse import urljoin, urlparse
 
-class EnhancedNamesParser:
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-        })
+from cli import (build_arg_parser, create_checkpoint, create_fetcher, create_parse_pool, create_word_store,
+                 create_writer, export_metrics)
+from crawler import SourceParser
+from gender import FEMALE, FEMALE_INDICATORS, MALE, MALE_INDICATORS, GenderClassifier
+from html_parsing import WIKI_WORD_HREF, WIKI_WORD_LINKS, make_soup
+from mediawiki import category_title, page_name
+from json_stream import Stream
+from normalization import collapse_store, to_nfc
+from validation import WIKI_SECTION_STOPWORDS, WordValidator, clean_names
+
+NAME_VALIDATOR = WordValidator(max_length=20, stopwords=WIKI_SECTION_STOPWORDS)
+NAME_GENDER = GenderClassifier(male_indicators=MALE_INDICATORS + ('отец',),
+                               female_indicators=FEMALE_INDICATORS + ('мать',))
+
+
+class EnhancedNamesParser(SourceParser):
+    NAME = 'enhanced_names_parser'
+    USER_AGENT = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
         
-    def parse_nazovite_ru(self) -> Dict[str, List[str]]:
-        """Парсинг имен с nazovite.ru - качественный источник"""
-        print("🔍 Парсинг имен с nazovite.ru...")
+    def extract_nazovite_names(self, response) -> Dict[str, List[str]]:
+        """Извлекает имена со страницы nazovite.ru"""
+        response.raise_for_status()
         
         male_names = set()
         female_names = set()
         
-        # Страницы с именами на nazovite.ru
-        pages = [
-            "https://www.nazovite.ru/russkie/",
-            "https://www.nazovite.ru/russkie/muzhskie/",
-            "https://www.nazovite.ru/russkie/zhenskie/",
-            "https://www.nazovite.ru/popular/",
-            "https://www.nazovite.ru/rare/"
-        ]
+        soup = make_soup(response.content)
         
-        for page in pages:
-            try:
-                print(f"📄 Обрабатываю: {page}")
-                response = self.session.get(page, timeout=15)
-                response.raise_for_status()
-                
-                soup = BeautifulSoup(response.content, 'html.parser')
-                
-                # Ищем имена в различных элементах
-                name_elements = soup.find_all(['a', 'span', 'div'], string=re.compile(r'^[А-Яа-яЁё]+$'))
-                
-                for element in name_elements:
-                    name = element.get_text().strip()
-                    
-                    if self.is_valid_name(name):
-                        # Определяем пол по контексту
-                        context = str(element.parent) if element.parent else ""
-                        
-                        if self.is_male_context(context, name):
-                            male_names.add(name)
-                        elif self.is_female_context(context, name):
-                            female_names.add(name)
-                        else:
-                            # Если не можем определить, добавляем в оба списка
-                            male_names.add(name)
-                            female_names.add(name)
-                
-                time.sleep(2)  # Вежливая задержка
+        # Ищем имена в различных элементах
+        name_elements = soup.find_all(['a', 'span', 'div'], string=re.compile(r'^[А-Яа-яЁё]+$'))
+        
+        # Контекст общего родителя проверяется один раз для всех его имен
+        context_gender = NAME_GENDER.context_resolver()
+        
+        for element in name_elements:
+            name = element.get_text().strip()
+            
+            if self.is_valid_name(name):
+                # Определяем пол по контексту
+                gender = context_gender(element.parent)
                 
-            except Exception as e:
-                print(f"❌ Ошибка при парсинге {page}: {e}")
-                continue
+                if gender == MALE:
+                    male_names.add(name)
+                elif gender == FEMALE:
+                    female_names.add(name)
+                else:
+                    # Если не можем определить, добавляем в оба списка
+                    male_names.add(name)
+                    female_names.add(name)
         
         return {
-            'male': list(male_names),
-            'female': list(female_names)
+            'male': sorted(male_names),
+            'female': sorted(female_names)
         }
     
-    def parse_wikipedia_enhanced(self) -> Dict[str, List[str]]:
-        """Улучшенный парсинг Википедии"""
-        print("🔍 Улучшенный парсинг Википедии...")
+    def extract_wikipedia_names(self, response) -> Dict[str, List[str]]:
+        """Извлекает имена со страницы Википедии"""
+        response.raise_for_status()
+        page = response.url
         
         male_names = set()
         female_names = set()
         
-        # Более точные ссылки на Википедии
-        pages = [
-            "https://ru.wikipedia.org/wiki/Категория:Русские_мужские_имена",
-            "https://ru.wikipedia.org/wiki/Категория:Русские_женские_имена",
-            "https://ru.wikipedia.org/wiki/Список_русских_мужских_имён",
-            "https://ru.wikipedia.org/wiki/Список_русских_женских_имён"
-        ]
+        soup = make_soup(response.content, WIKI_WORD_LINKS)
         
-        for page in pages:
-            try:
-                print(f"📄 Обрабатываю: {page}")
-                response = self.session.get(page, timeout=15)
-                response.raise_for_status()
-                
-                soup = BeautifulSoup(response.content, 'html.parser')
-                
-                # Ищем ссылки на имена
-                links = soup.find_all('a', href=re.compile(r'/wiki/[А-Яа-яЁё]'))
-                
-                for link in links:
-                    name = link.get_text().strip()
-                    
-                    if self.is_valid_name(name):
-                        # Определяем пол по URL или контексту
-                        if 'мужск' in page.lower():
-                            male_names.add(name)
-                        elif 'женск' in page.lower():
-                            female_names.add(name)
-                        else:
-                            # Пытаемся определить по окончаниям
-                            if self.is_male_name_by_ending(name):
-                                male_names.add(name)
-                            elif self.is_female_name_by_ending(name):
-                                female_names.add(name)
-                
-                time.sleep(2)
-                
-            except Exception as e:
-                print(f"❌ Ошибка при парсинге {page}: {e}")
-                continue
+        # Ищем ссылки на имена
+        links = soup.find_all('a', href=WIKI_WORD_HREF)
+        
+        for link in links:
+            name = link.get_text().strip()
+            
+            if self.is_valid_name(name):
+                # Определяем пол по URL или контексту
+                if 'мужск' in page.lower():
+                    male_names.add(name)
+                elif 'женск' in page.lower():
+                    female_names.add(name)
+                else:
+                    # Пытаемся определить по окончаниям
+                    gender = NAME_GENDER.gender_by_ending(name)
+                    if gender == MALE:
+                        male_names.add(name)
+                    elif gender == FEMALE:
+                        female_names.add(name)
         
         return {
-            'male': list(male_names),
-            'female': list(female_names)
+            'male': sorted(male_names),
+            'female': sorted(female_names)
         }
     
-    def parse_names_api(self) -> Dict[str, List[str]]:
-        """Парсинг с API сервисов имен"""
-        print("🔍 Парсинг с API сервисов...")
-        
-        male_names = set()
-        female_names = set()
+    def extract_wikipedia_titles(self, category_url: str, titles: List[str]) -> Dict[str, List[str]]:
+        """Имена из заголовков статей категории Википедии (режим MediaWiki API)"""
+        names = [name for name in map(page_name, titles) if self.is_valid_name(name)]
+        names = NAME_GENDER.classify_titles(names, category_title(category_url))
+        return {
+            'male': sorted(names['male']),
+            'female': sorted(names['female'])
+        }
+    
+    def extract_api_names(self, response) -> Dict[str, List[str]]:
+        """Извлекает имена из ответа API"""
+        if response.error is not None:
+            raise response.error
         
-        # Попробуем найти открытые API
-        api_endpoints = [
-            "https://api.namesapi.com/v1/names",
-            "https://randomuser.me/api/?results=1000&nat=ru"
-        ]
-        
-        for endpoint in api_endpoints:
-            try:
-                print(f"📄 Пробую API: {endpoint}")
-                response = self.session.get(endpoint, timeout=10)
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    # Обрабатываем данные в зависимости от структуры API
-                    names = self.extract_names_from_api_data(data)
-                    male_names.update(names.get('male', []))
-                    female_names.update(names.get('female', []))
-                
-                time.sleep(1)
-                
-            except Exception as e:
-                print(f"❌ Ошибка API {endpoint}: {e}")
-                continue
+        if response.status_code != 200:
+            return {}
         
+        # Обрабатываем данные в зависимости от структуры API
+        names = self.extract_names_from_api_data(response.json())
         return {
-            'male': list(male_names),
-            'female': list(female_names)
+            'male': list(names.get('male', [])),
+            'female': list(names.get('female', []))
         }
     
     def parse_common_names_datasets(self) -> Dict[str, List[str]]:
@@ -248,94 +210,34 @@ class EnhancedNamesParser:
     
     def is_valid_name(self, name: str) -> bool:
         """Проверяет, является ли текст валидным именем"""
-        if not name or len(name) < 2 or len(name) > 20:
-            return False
-        
-        # Проверяем, что имя содержит только русские буквы
-        if not re.match(r'^[А-Яа-яЁё]+$', name):
-            return False
-        
-        # Исключаем технические слова
-        exclude_words = [
-            'категория', 'страница', 'вики', 'ссылка', 'редактировать', 'обсуждение',
-            'история', 'создать', 'поиск', 'навигация', 'меню', 'заголовок', 'содержание',
-            'примечание', 'см', 'также', 'внешние', 'ссылки', 'литература', 'примечания'
-        ]
-        
-        if name.lower() in exclude_words:
-            return False
-        
-        return True
-    
-    def is_male_context(self, context: str, name: str) -> bool:
-        """Определяет мужской контекст"""
-        male_indicators = ['мужск', 'мальчик', 'папа', 'сын', 'брат', 'муж', 'отец']
-        return any(indicator in context.lower() for indicator in male_indicators)
-    
-    def is_female_context(self, context: str, name: str) -> bool:
-        """Определяет женский контекст"""
-        female_indicators = ['женск', 'девочка', 'мама', 'дочь', 'сестра', 'жена', 'мать']
-        return any(indicator in context.lower() for indicator in female_indicators)
-    
-    def is_male_name_by_ending(self, name: str) -> bool:
-        """Определяет мужское имя по окончанию"""
-        male_endings = ['ов', 'ев', 'ин', 'ский', 'цкий', 'ич', 'он', 'ен']
-        return any(name.lower().endswith(ending) for ending in male_endings)
-    
-    def is_female_name_by_ending(self, name: str) -> bool:
-        """Определяет женское имя по окончанию"""
-        female_endings = ['а', 'я', 'ова', 'ева', 'ина', 'ская', 'цкая']
-        return any(name.lower().endswith(ending) for ending in female_endings)
+        return NAME_VALIDATOR.is_valid(name)
     
     def extract_names_from_api_data(self, data: dict) -> Dict[str, List[str]]:
         """Извлекает имена из данных API"""
         # Заглушка для обработки различных форматов API
         return {'male': [], 'female': []}
     
-    def clean_and_validate_names(self, names: List[str]) -> List[str]:
-        """Очищает и валидирует список имен"""
-        cleaned = []
-        
-        for name in names:
-            # Очищаем от лишних символов
-            name = re.sub(r'[^\w\-]', '', name.strip())
-            
-            # Проверяем длину и содержание
-            if 2 <= len(name) <= 20 and re.match(r'^[А-Яа-яЁё]+$', name):
-                # Приводим к правильному регистру
-                name = name.capitalize()
-                cleaned.append(name)
-        
-        # Удаляем дубликаты и сортируем
-        return sorted(list(set(cleaned)))
-    
-    def save_to_json(self, data: dict, filename: str):
-        """Сохраняет данные в JSON файл"""
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-        print(f"💾 Данные сохранены в {filename}")
+    def clean_and_validate_names(self, names: Iterable[str]) -> Stream:
+        """Очищает и валидирует имена"""
+        # Удаляем дубликаты и варианты написания (Пётр/Петр) и сортируем
+        cleaned, merged = collapse_store(self.word_store(clean_names(map(to_nfc, names))))
+        print(f"🔤 Объединено вариантов написания имен: {merged}")
+        return Stream(cleaned.__iter__, len(cleaned))
     
     def run(self):
         """Запускает полный процесс парсинга"""
         print("🚀 Запуск улучшенного парсера русских имен...")
         
-        # Парсим из разных источников
-        nazovite_data = self.parse_nazovite_ru()
-        wikipedia_data = self.parse_wikipedia_enhanced()
-        api_data = self.parse_names_api()
+        collected = self.collect_sources()
         dataset_data = self.parse_common_names_datasets()
         
         # Объединяем данные
-        all_male_names = set()
-        all_female_names = set()
-        
-        for source_data in [nazovite_data, wikipedia_data, api_data, dataset_data]:
-            all_male_names.update(source_data['male'])
-            all_female_names.update(source_data['female'])
+        all_male_names = chain(collected.pop('male', []), dataset_data['male'])
+        all_female_names = chain(collected.pop('female', []), dataset_data['female'])
         
         # Очищаем и валидируем
-        cleaned_male = self.clean_and_validate_names(list(all_male_names))
-        cleaned_female = self.clean_and_validate_names(list(all_female_names))
+        cleaned_male = self.clean_and_validate_names(all_male_names)
+        cleaned_female = self.clean_and_validate_names(all_female_names)
         
         # Формируем итоговые данные
         result = {
@@ -355,6 +257,7 @@ class EnhancedNamesParser:
         
         # Сохраняем результат
         self.save_to_json(result, '../src/data/enhanced_names.json')
+        self.save_shards('../src/data/enhanced_names', {'male': cleaned_male, 'female': cleaned_female})
         
         print(f"✅ Парсинг завершен!")
         print(f"📊 Найдено мужских имен: {len(cleaned_male)}")
@@ -362,5 +265,17 @@ class EnhancedNamesParser:
         print(f"📊 Всего имен: {len(cleaned_male) + len(cleaned_female)}")
 
 if __name__ == "__main__":
-    parser = EnhancedNamesParser()
-    parser.run()
+    args = build_arg_parser(__doc__).parse_args()
+    parser = EnhancedNamesParser(
+        fetcher=create_fetcher(args, EnhancedNamesParser.USER_AGENT),
+        checkpoint=create_checkpoint(args, EnhancedNamesParser.NAME),
+        parse_pool=create_parse_pool(args),
+        writer=create_writer(args),
+        category_api=args.mediawiki_api,
+        word_store=create_word_store(args)
+    )
+    try:
+        parser.run()
+    finally:
+        parser.close()
+        export_metrics(args, EnhancedNamesParser.NAME)
@@ -4,127 +4,80 @@
 Собирает данные из корпусов русского языка, словарей и датасетов
 """
 
-import requests
-from bs4 import BeautifulSoup
-import json
 import re
 import time
-from typing import List, Set, Dict
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
+from typing import List, Set, Dict, Iterable, Iterator, Optional
 
-class EnhancedWordsParser:
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-        })
-        
-    def parse_national_corpus(self) -> List[str]:
-        """Парсинг из Национального корпуса русского языка"""
-        print("🔍 Парсинг из Национального корпуса русского языка...")
-        
-        words = set()
-        
-        # Попробуем получить доступ к корпусу
-        corpus_urls = [
-            "http://ruscorpora.ru/search",
-            "https://ruscorpora.ru/new/search-main.html"
-        ]
+from cli import (build_arg_parser, create_checkpoint, create_fetcher, create_parse_pool, create_word_store,
+                 create_writer, export_metrics)
+from categorizer import load_categorizer
+from crawler import SourceParser
+from html_parsing import WIKI_WORD_HREF, WIKI_WORD_LINKS, make_soup
+from json_stream import Stream
+from normalization import collapse_store, to_nfc
+from validation import WIKI_EDITOR_STOPWORDS, WordValidator
+from wiktionary_dump import ADJECTIVE, NOUN, WiktionaryDump
+
+WORD_VALIDATOR = WordValidator(max_length=25, stopwords=WIKI_EDITOR_STOPWORDS)
+
+
+class EnhancedWordsParser(SourceParser):
+    NAME = 'enhanced_words_parser'
+    USER_AGENT = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+    
+    def __init__(self, *args, wiktionary_dump: Optional[str] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Локальный дамп Викисловаря вместо страниц категорий (источник wiktionary)
+        self.wiktionary_dump = wiktionary_dump
         
-        for url in corpus_urls:
-            try:
-                print(f"📄 Пробую корпус: {url}")
-                response = self.session.get(url, timeout=15)
-                
-                if response.status_code == 200:
-                    soup = BeautifulSoup(response.content, 'html.parser')
-                    
-                    # Ищем слова в различных элементах
-                    word_elements = soup.find_all(['span', 'div', 'a'], string=re.compile(r'^[А-Яа-яЁё]+$'))
-                    
-                    for element in word_elements:
-                        word = element.get_text().strip()
-                        if self.is_valid_word(word):
-                            words.add(word)
-                
-                time.sleep(2)
-                
-            except Exception as e:
-                print(f"❌ Ошибка корпуса {url}: {e}")
-                continue
+    def extract_corpus_words(self, response) -> Dict[str, List[str]]:
+        """Извлекает слова со страницы корпуса"""
+        if response.error is not None:
+            raise response.error
         
-        return list(words)
-    
-    def parse_wiktionary_enhanced(self) -> List[str]:
-        """Улучшенный парсинг Викисловаря"""
-        print("🔍 Улучшенный парсинг Викисловаря...")
+        if response.status_code != 200:
+            return {}
         
         words = set()
+        soup = make_soup(response.content)
         
-        # Более точные категории
-        categories = [
-            "https://ru.wiktionary.org/wiki/Категория:Существительные_русского_языка",
-            "https://ru.wiktionary.org/wiki/Категория:Прилагательные_русского_языка", 
-            "https://ru.wiktionary.org/wiki/Категория:Глаголы_русского_языка",
-            "https://ru.wiktionary.org/wiki/Категория:Наречия_русского_языка",
-            "https://ru.wiktionary.org/wiki/Категория:Местоимения_русского_языка"
-        ]
+        # Ищем слова в различных элементах
+        word_elements = soup.find_all(['span', 'div', 'a'], string=re.compile(r'^[А-Яа-яЁё]+$'))
         
-        for category in categories:
-            try:
-                print(f"📄 Обрабатываю: {category}")
-                response = self.session.get(category, timeout=15)
-                response.raise_for_status()
-                
-                soup = BeautifulSoup(response.content, 'html.parser')
-                
-                # Ищем ссылки на слова
-                links = soup.find_all('a', href=re.compile(r'/wiki/[А-Яа-яЁё]'))
-                
-                for link in links:
-                    word = link.get_text().strip()
-                    if self.is_valid_word(word):
-                        words.add(word)
-                
-                time.sleep(2)
-                
-            except Exception as e:
-                print(f"❌ Ошибка при парсинге {category}: {e}")
-                continue
+        for element in word_elements:
+            word = element.get_text().strip()
+            if self.is_valid_word(word):
+                words.add(word)
         
-        return list(words)
+        return {'words': sorted(words)}
     
-    def parse_open_datasets(self) -> List[str]:
-        """Парсинг из открытых датасетов"""
-        print("🔍 Парсинг из открытых датасетов...")
+    def extract_wiktionary_words(self, response) -> Dict[str, List[str]]:
+        """Извлекает слова со страницы категории Викисловаря"""
+        response.raise_for_status()
         
         words = set()
+        soup = make_soup(response.content, WIKI_WORD_LINKS)
         
-        # Попробуем найти открытые датасеты
-        dataset_urls = [
-            "https://raw.githubusercontent.com/danakt/russian-words/master/russian.txt",
-            "https://raw.githubusercontent.com/hbenbel/Russian-Wordlist/master/russian.txt"
-        ]
+        # Ищем ссылки на слова
+        links = soup.find_all('a', href=WIKI_WORD_HREF)
         
-        for url in dataset_urls:
-            try:
-                print(f"📄 Загружаю датасет: {url}")
-                response = self.session.get(url, timeout=15)
-                
-                if response.status_code == 200:
-                    lines = response.text.split('\n')
-                    
-                    for line in lines:
-                        word = line.strip()
-                        if self.is_valid_word(word):
-                            words.add(word)
-                
-                time.sleep(1)
-                
-            except Exception as e:
-                print(f"❌ Ошибка датасета {url}: {e}")
-                continue
+        for link in links:
+            word = link.get_text().strip()
+            if self.is_valid_word(word):
+                words.add(word)
         
-        return list(words)
+        return {'words': sorted(words)}
+    
+    def extract_wiktionary_titles(self, category_url: str, titles: List[str]) -> Dict[str, List[str]]:
+        """Слова из заголовков статей категории Викисловаря (режим MediaWiki API)"""
+        return {'words': sorted({title for title in titles if self.is_valid_word(title)})}
+    
+    def parse_wiktionary_dump(self) -> Dict[str, List[str]]:
+        """Существительные и прилагательные из локального дампа Викисловаря"""
+        print("🔍 Разбираю дамп Викисловаря...")
+        return WiktionaryDump(self.wiktionary_dump, WORD_VALIDATOR, pool=self.parse_pool).words()
     
     def parse_comprehensive_wordlist(self) -> List[str]:
         """Добавляем обширный список русских слов"""
@@ -189,119 +142,51 @@ class EnhancedWordsParser:
     
     def is_valid_word(self, word: str) -> bool:
         """Проверяет, является ли слово валидным"""
-        if not word or len(word) < 2 or len(word) > 25:
-            return False
-        
-        # Проверяем, что слово содержит только русские буквы
-        if not re.match(r'^[А-Яа-яЁё]+$', word):
-            return False
-        
-        # Исключаем технические слова
-        exclude_words = [
-            'категория', 'страница', 'вики', 'ссылка', 'редактировать', 'обсуждение',
-            'история', 'создать', 'поиск', 'навигация', 'меню', 'заголовок', 'содержание',
-            'примечание', 'см', 'также', 'внешние', 'ссылки', 'литература', 'примечания',
-            'шаблон', 'проект', 'участник', 'обсуждение', 'вклад', 'история', 'создать',
-            'редактировать', 'источник', 'правка', 'отмена', 'сохранить', 'предварительный'
-        ]
-        
-        if word.lower() in exclude_words:
-            return False
-        
-        return True
+        return WORD_VALIDATOR.is_valid(word)
     
-    def categorize_words(self, words: List[str]) -> Dict[str, List[str]]:
-        """Категоризирует слова по типам"""
-        categories = {
-            'nature': [],      # Природа
-            'animals': [],     # Животные
-            'people': [],      # Люди
-            'professions': [], # Профессии
-            'home': [],        # Дом и быт
-            'food': [],        # Еда
-            'clothing': [],    # Одежда
-            'transport': [],   # Транспорт
-            'city': [],        # Город
-            'time': [],        # Время
-            'colors': [],      # Цвета
-            'qualities': [],   # Качества
-            'other': []        # Прочее
-        }
-        
-        # Расширенные правила категоризации
-        nature_words = ['солнце', 'луна', 'звезда', 'небо', 'дождь', 'снег', 'ветер', 'река', 'море', 'гора', 'лес', 'дерево', 'цветок', 'трава', 'лист', 'камень', 'песок', 'земля', 'огонь', 'вода', 'лёд', 'пар', 'туман']
-        animal_words = ['собака', 'кошка', 'лошадь', 'корова', 'птица', 'рыба', 'волк', 'медведь', 'лиса', 'заяц', 'белка', 'мышь', 'орел', 'сокол', 'сова', 'ворон', 'лебедь', 'журавль', 'павлин', 'тигр', 'лев', 'слон', 'жираф', 'кенгуру', 'крокодил', 'черепаха', 'змея', 'лягушка']
-        people_words = ['человек', 'мужчина', 'женщина', 'ребёнок', 'мать', 'отец', 'сын', 'дочь', 'брат', 'сестра', 'дедушка', 'бабушка', 'дядя', 'тётя', 'друг', 'подруга', 'сосед', 'гость', 'знакомый', 'незнакомец']
-        profession_words = ['учитель', 'врач', 'повар', 'водитель', 'строитель', 'художник', 'писатель', 'музыкант', 'актёр', 'спортсмен', 'полицейский', 'пожарный', 'солдат', 'моряк', 'лётчик', 'продавец', 'менеджер', 'директор', 'секретарь', 'бухгалтер']
-        home_words = ['дом', 'квартира', 'комната', 'кухня', 'спальня', 'ванная', 'окно', 'дверь', 'стол', 'стул', 'кровать', 'шкаф', 'полка', 'зеркало', 'лампа', 'телевизор', 'компьютер', 'телефон', 'часы', 'календарь']
-        food_words = ['хлеб', 'мясо', 'рыба', 'молоко', 'сыр', 'яйцо', 'картофель', 'морковь', 'лук', 'помидор', 'огурец', 'капуста', 'яблоко', 'груша', 'банан', 'апельсин', 'лимон', 'виноград', 'клубника', 'сахар', 'соль', 'чай', 'кофе']
-        clothing_words = ['рубашка', 'платье', 'брюки', 'пиджак', 'шапка', 'обувь', 'туфли', 'сапоги', 'кроссовки', 'пальто', 'куртка', 'свитер', 'футболка', 'джинсы', 'юбка', 'блузка', 'галстук', 'перчатки', 'шарф', 'носки']
-        transport_words = ['машина', 'автобус', 'поезд', 'самолёт', 'корабль', 'велосипед', 'мотоцикл', 'трамвай', 'метро', 'такси', 'грузовик', 'фургон', 'яхта', 'лодка', 'вертолёт', 'ракета', 'катер', 'пароход', 'теплоход', 'баржа']
-        city_words = ['улица', 'дорога', 'площадь', 'парк', 'магазин', 'ресторан', 'больница', 'школа', 'университет', 'библиотека', 'музей', 'театр', 'кино', 'стадион', 'банк', 'почта', 'аптека', 'парикмахерская', 'отель', 'вокзал']
-        time_words = ['время', 'час', 'день', 'неделя', 'месяц', 'год', 'утро', 'вечер', 'ночь', 'понедельник', 'вторник', 'среда', 'четверг', 'пятница', 'суббота', 'воскресенье', 'январь', 'февраль', 'март', 'апрель', 'май', 'июнь', 'июль', 'август', 'сентябрь', 'октябрь', 'ноябрь', 'декабрь']
-        color_words = ['красный', 'синий', 'зелёный', 'жёлтый', 'чёрный', 'белый', 'серый', 'коричневый', 'розовый', 'фиолетовый', 'оранжевый', 'голубой', 'бордовый', 'золотой', 'серебряный', 'медный', 'бронзовый']
-        quality_words = ['большой', 'маленький', 'хороший', 'плохой', 'красивый', 'новый', 'старый', 'молодой', 'быстрый', 'медленный', 'горячий', 'холодный', 'светлый', 'тёмный', 'громкий', 'тихий', 'мягкий', 'твёрдый', 'лёгкий', 'тяжёлый', 'дорогой', 'дешёвый', 'богатый', 'бедный', 'умный', 'глупый', 'весёлый', 'грустный', 'злой', 'добрый', 'честный', 'лживый', 'смелый', 'трусливый', 'сильный', 'слабый', 'здоровый', 'больной']
-        
-        for word in words:
-            if word in nature_words:
-                categories['nature'].append(word)
-            elif word in animal_words:
-                categories['animals'].append(word)
-            elif word in people_words:
-                categories['people'].append(word)
-            elif word in profession_words:
-                categories['professions'].append(word)
-            elif word in home_words:
-                categories['home'].append(word)
-            elif word in food_words:
-                categories['food'].append(word)
-            elif word in clothing_words:
-                categories['clothing'].append(word)
-            elif word in transport_words:
-                categories['transport'].append(word)
-            elif word in city_words:
-                categories['city'].append(word)
-            elif word in time_words:
-                categories['time'].append(word)
-            elif word in color_words:
-                categories['colors'].append(word)
-            elif word in quality_words:
-                categories['qualities'].append(word)
-            else:
-                categories['other'].append(word)
-        
-        return categories
+    def iter_valid_words(self, lines: Iterable[str]) -> Iterator[str]:
+        """Конвейер валидации: отдает валидные слова по мере поступления строк"""
+        return WORD_VALIDATOR.filter_lines(lines)
     
-    def save_to_json(self, data: Dict, filename: str):
-        """Сохраняет данные в JSON файл"""
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-        print(f"💾 Данные сохранены в {filename}")
+    def categorize_words(self, words: Iterable[str], parts_of_speech: Optional[Dict[str, str]] = None) -> Dict[str, Stream]:
+        """Категоризирует слова по типам (слова вне словарей - по части речи, если она известна)
+
+        Категории - потоки по words, без копий списков слов.
+        """
+        return load_categorizer('extended').categorize_stream(words, parts_of_speech)
     
     def run(self):
         """Запускает полный процесс парсинга"""
         print("🚀 Запуск улучшенного парсера русских слов...")
         
-        # Парсим из разных источников
-        corpus_words = self.parse_national_corpus()
-        wiktionary_words = self.parse_wiktionary_enhanced()
-        dataset_words = self.parse_open_datasets()
+        # Дамп Викисловаря, если он задан, заменяет страницы категорий и
+        # читается параллельно с сетью
+        names = None
+        if self.wiktionary_dump:
+            names = [source.name for source in self.registry.select(self.NAME) if source.name != 'wiktionary']
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            dump_future = pool.submit(self.parse_wiktionary_dump) if self.wiktionary_dump else None
+            collected = self.collect_sources(names)
+            dump_words = dump_future.result() if dump_future is not None else {}
         comprehensive_words = self.parse_comprehensive_wordlist()
         
-        # Объединяем все слова
-        all_words = set(corpus_words + wiktionary_words + dataset_words + comprehensive_words)
+        # Часть речи из дампа: у слова-омонима (рабочий) приоритет у существительного
+        parts_of_speech = dict.fromkeys(dump_words.get(ADJECTIVE, []), ADJECTIVE)
+        parts_of_speech.update(dict.fromkeys(dump_words.get(NOUN, []), NOUN))
         
         # Очищаем и валидируем
-        cleaned_words = []
-        for word in all_words:
-            if self.is_valid_word(word):
-                cleaned_words.append(word.lower())
+        all_words = chain(collected.pop('words', []), comprehensive_words, parts_of_speech)
+        cleaned_words = self.word_store(word.lower() for word in WORD_VALIDATOR.filter(map(to_nfc, all_words)))
+        
+        # Удаляем дубликаты и варианты написания (лёд/лед) и сортируем
+        unique_store, merged = collapse_store(cleaned_words)
+        del cleaned_words
+        print(f"🔤 Объединено вариантов написания: {merged}")
         
-        # Удаляем дубликаты и сортируем
-        unique_words = sorted(list(set(cleaned_words)))
+        unique_words = Stream(unique_store.__iter__, len(unique_store))
         
         # Категоризируем слова
-        categorized_words = self.categorize_words(unique_words)
+        categorized_words = self.categorize_words(unique_words, parts_of_speech)
         
         # Формируем итоговые данные
         result = {
@@ -310,7 +195,7 @@ class EnhancedWordsParser:
             'totalWords': len(unique_words),
             'sources': [
                 'Национальный корпус русского языка',
-                'Викисловарь - расширенные категории',
+                'Дамп Викисловаря' if self.wiktionary_dump else 'Викисловарь - расширенные категории',
                 'Открытые датасеты слов',
                 'Обширный список русских слов'
             ],
@@ -319,11 +204,25 @@ class EnhancedWordsParser:
         
         # Сохраняем результат
         self.save_to_json(result, '../src/data/enhanced_words.json')
+        self.save_shards('../src/data/enhanced_words', {'all': unique_words, **categorized_words})
         
         print(f"✅ Парсинг завершен!")
         print(f"📊 Найдено слов: {len(unique_words)}")
         print(f"📊 Категорий: {len(categorized_words)}")
 
 if __name__ == "__main__":
-    parser = EnhancedWordsParser()
-    parser.run()
+    args = build_arg_parser(__doc__).parse_args()
+    parser = EnhancedWordsParser(
+        fetcher=create_fetcher(args, EnhancedWordsParser.USER_AGENT),
+        checkpoint=create_checkpoint(args, EnhancedWordsParser.NAME),
+        parse_pool=create_parse_pool(args),
+        writer=create_writer(args),
+        category_api=args.mediawiki_api,
+        word_store=create_word_store(args),
+        wiktionary_dump=args.wiktionary_dump
+    )
+    try:
+        parser.run()
+    finally:
+        parser.close()
+        export_metrics(args, EnhancedWordsParser.NAME)
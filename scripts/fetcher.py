@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+Общий асинхронный загрузчик страниц для всех парсеров
+Ограничивает число соединений глобально и для каждого хоста,
+поэтому запросы к разным сайтам выполняются параллельно
+"""
+
+import asyncio
+import codecs
+import io
+import json
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from typing import Dict, Iterable, Iterator, List, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from http_cache import CacheEntry, CacheMissError, HttpCache
+from metrics import METRICS
+from rate_limiter import HostRateLimiter, parse_retry_after
+
+DEFAULT_USER_AGENT = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+
+
+def _declared_encoding(response: requests.Response) -> Optional[str]:
+    """Кодировка из заголовка Content-Type (без догадок requests про ISO-8859-1)"""
+    content_type = response.headers.get('Content-Type', '')
+    if 'charset=' in content_type.lower():
+        return response.encoding
+    return None
+
+
+class FetchResult:
+    """Результат загрузки одного URL"""
+
+    def __init__(self, url: str, status_code: Optional[int] = None, content: bytes = b'',
+                 encoding: Optional[str] = None, headers: Optional[Dict[str, str]] = None,
+                 error: Optional[Exception] = None, elapsed: float = 0.0, from_cache: bool = False):
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.encoding = encoding
+        self.headers = CaseInsensitiveDict(headers or {})
+        self.error = error
+        self.elapsed = elapsed
+        self.from_cache = from_cache
+
+    @property
+    def ok(self) -> bool:
+        """Запрос выполнен без ошибок и с успешным статусом"""
+        return self.error is None and self.status_code is not None and self.status_code < 400
+
+    @property
+    def text(self) -> str:
+        """Тело ответа в виде строки"""
+        return self.content.decode(self.encoding or 'utf-8', errors='replace')
+
+    def json(self):
+        """Тело ответа в виде JSON"""
+        return json.loads(self.text)
+
+    def raise_for_status(self):
+        """Пробрасывает сетевую ошибку или ошибку HTTP, как requests.Response"""
+        if self.error is not None:
+            raise self.error
+        if self.status_code is not None and self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} для {self.url}")
+
+
+class AsyncFetcher:
+    """Загрузчик пачек URL на asyncio с ограничением соединений на хост"""
+
+    def __init__(self, user_agent: str = DEFAULT_USER_AGENT, max_connections: int = 16,
+                 per_host_connections: int = 2, rate_limiter: Optional[HostRateLimiter] = None,
+                 max_retries: int = 2, max_retry_after: float = 120.0,
+                 cache: Optional[HttpCache] = None, cache_only: bool = False):
+        self.user_agent = user_agent
+        self.max_connections = max_connections
+        self.per_host_connections = per_host_connections
+        self.rate_limiter = rate_limiter or HostRateLimiter()
+        self.max_retries = max_retries
+        self.max_retry_after = max_retry_after
+        self.cache = cache
+        self.cache_only = cache_only
+        if cache_only and cache is None:
+            raise ValueError("Автономный режим требует кэша ответов")
+
+        self._local = threading.local()
+        self._executor = ThreadPoolExecutor(max_workers=max_connections)
+        self._loop = None
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+        # Создаются внутри цикла событий
+        self._global_semaphore = None
+        self._host_semaphores = {}
+
+    def _session(self) -> requests.Session:
+        """Сессия requests для текущего рабочего потока"""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            session.headers.update({'User-Agent': self.user_agent})
+            self._local.session = session
+        return session
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """Запускает цикл событий в фоновом потоке при первом обращении"""
+        with self._start_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, name='fetcher-loop', daemon=True)
+                self._thread.start()
+        return self._loop
+
+    def _host_semaphore(self, host: str) -> asyncio.Semaphore:
+        """Семафор хоста (создается лениво внутри цикла)"""
+        if self._global_semaphore is None:
+            self._global_semaphore = asyncio.Semaphore(self.max_connections)
+        if host not in self._host_semaphores:
+            self._host_semaphores[host] = asyncio.Semaphore(self.per_host_connections)
+        return self._host_semaphores[host]
+
+    def _cached_result(self, entry: CacheEntry, started: float) -> FetchResult:
+        """Ответ, восстановленный из кэша"""
+        headers = {}
+        if entry.content_type:
+            headers['Content-Type'] = entry.content_type
+        return FetchResult(
+            entry.url,
+            status_code=entry.status_code,
+            content=self.cache.read(entry),
+            encoding=entry.encoding,
+            headers=headers,
+            elapsed=time.monotonic() - started,
+            from_cache=True
+        )
+
+    def _get_cached(self, url: str) -> FetchResult:
+        """Ответ только из кэша (автономный режим)"""
+        started = time.monotonic()
+        entry = self.cache.lookup(url)
+        if entry is None:
+            return FetchResult(url, error=CacheMissError(f"{url} нет в кэше"))
+        return self._cached_result(entry, started)
+
+    def _get(self, url: str, timeout: float) -> FetchResult:
+        """Блокирующий запрос, выполняется в пуле потоков"""
+        started = time.monotonic()
+        entry = self.cache.lookup(url) if self.cache else None
+        try:
+            headers = entry.conditional_headers() if entry else {}
+            response = self._session().get(url, timeout=timeout, headers=headers)
+
+            if response.status_code == 304 and entry is not None:
+                return self._cached_result(entry, started)
+
+            encoding = _declared_encoding(response)
+            if self.cache is not None and response.status_code == 200:
+                self.cache.store(url, response.content, response.headers, response.status_code, encoding)
+
+            return FetchResult(
+                url,
+                status_code=response.status_code,
+                content=response.content,
+                encoding=encoding,
+                headers=response.headers,
+                elapsed=time.monotonic() - started
+            )
+        except Exception as e:
+            return FetchResult(url, error=e, elapsed=time.monotonic() - started)
+
+    def _retry_delay(self, result: FetchResult) -> Optional[float]:
+        """Задержка перед повтором по Retry-After или None, если повтор не нужен"""
+        if result.status_code not in (429, 503):
+            return None
+        delay = parse_retry_after(result.headers.get('Retry-After'))
+        if delay is None or delay > self.max_retry_after:
+            return None
+        return delay
+
+    def _record(self, result: FetchResult, host: str, started: float):
+        """Метрики загрузки: время с учетом ожидания лимитов и повторов, байты, статус"""
+        latency = time.monotonic() - started
+        status = 'error' if result.error is not None else str(result.status_code)
+        source = 'cache' if result.from_cache else 'network'
+        METRICS.observe('fetch_seconds', latency, host=host)
+        METRICS.inc('fetch_requests_total', host=host, status=status, source=source)
+        METRICS.inc('fetch_bytes_total', len(result.content), host=host, source=source)
+        METRICS.event('fetch', url=result.url, seconds=round(latency, 6), request_seconds=round(result.elapsed, 6),
+                      bytes=len(result.content), status=status, source=source)
+
+    async def _fetch_one(self, url: str, timeout: float) -> FetchResult:
+        loop = asyncio.get_running_loop()
+        host = urlparse(url).netloc
+        started = time.monotonic()
+        if self.cache_only:
+            result = await loop.run_in_executor(self._executor, self._get_cached, url)
+            self._record(result, host, started)
+            return result
+
+        semaphore = self._host_semaphore(host)
+
+        for attempt in range(self.max_retries + 1):
+            async with semaphore:
+                await self.rate_limiter.acquire_async(host)
+                async with self._global_semaphore:
+                    result = await loop.run_in_executor(self._executor, self._get, url, timeout)
+
+            delay = self._retry_delay(result)
+            if delay is None or attempt == self.max_retries:
+                break
+            # Сервер попросил подождать: откладываем все запросы к этому хосту
+            METRICS.inc('fetch_retries_total', host=host)
+            self.rate_limiter.defer(host, delay)
+        self._record(result, host, started)
+        return result
+
+    async def _fetch_many(self, urls: List[str], timeout: float) -> List[FetchResult]:
+        return await asyncio.gather(*(self._fetch_one(url, timeout) for url in urls))
+
+    def fetch_all(self, urls: Iterable[str], timeout: float = 10) -> List[FetchResult]:
+        """Загружает пачку URL параллельно, результаты в исходном порядке
+
+        Метод потокобезопасен: несколько parse_* из разных потоков делят
+        общие лимиты, поэтому запросы к разным хостам перекрываются.
+        """
+        urls = list(urls)
+        if not urls:
+            return []
+        loop = self._ensure_loop()
+        future = asyncio.run_coroutine_threadsafe(self._fetch_many(urls, timeout), loop)
+        return future.result()
+
+    def submit(self, url: str, timeout: float = 10) -> Future:
+        """Ставит URL в общую очередь загрузки; результат - FetchResult в Future"""
+        return asyncio.run_coroutine_threadsafe(self._fetch_one(url, timeout), self._ensure_loop())
+
+    def iter_fetch(self, urls: Iterable[str], timeout: float = 10) -> Iterator[FetchResult]:
+        """Загружает URL параллельно и отдает результаты по мере готовности"""
+        futures = [self.submit(url, timeout) for url in urls]
+        for future in as_completed(futures):
+            yield future.result()
+
+    def fetch(self, url: str, timeout: float = 10) -> FetchResult:
+        """Загружает один URL"""
+        return self.fetch_all([url], timeout=timeout)[0]
+
+    def stream_lines(self, url: str, timeout: float = 15, chunk_size: int = 64 * 1024) -> Iterator[str]:
+        """Построчно читает большой текстовый ответ, не держа его в памяти
+
+        Тело читается кусками и декодируется инкрементально; при наличии
+        кэша оно одновременно дописывается в кэш в сжатом виде.
+        """
+        entry = self.cache.lookup(url) if self.cache else None
+        if self.cache_only:
+            if entry is None:
+                raise CacheMissError(f"{url} нет в кэше")
+            yield from self._stream_cached(entry)
+            return
+
+        host = urlparse(url).netloc
+        self.rate_limiter.acquire(host)
+        started = time.monotonic()
+        headers = entry.conditional_headers() if entry else {}
+        with self._session().get(url, timeout=timeout, headers=headers, stream=True) as response:
+            if response.status_code == 304 and entry is not None:
+                yield from self._stream_cached(entry)
+                return
+            response.raise_for_status()
+
+            encoding = _declared_encoding(response)
+            writer = None
+            if self.cache is not None and response.status_code == 200:
+                writer = self.cache.writer(url, response.headers, response.status_code, encoding)
+
+            decoder = codecs.getincrementaldecoder(encoding or 'utf-8')(errors='replace')
+            pending = ''
+            received = 0
+            try:
+                for chunk in response.iter_content(chunk_size=chunk_size):
+                    received += len(chunk)
+                    if writer is not None:
+                        writer.write(chunk)
+                    lines = (pending + decoder.decode(chunk)).split('\n')
+                    pending = lines.pop()
+                    for line in lines:
+                        yield line.rstrip('\r')
+                pending += decoder.decode(b'', final=True)
+                if pending:
+                    yield pending.rstrip('\r')
+            except BaseException:
+                # Включая GeneratorExit: недочитанное тело в кэш не попадает
+                if writer is not None:
+                    writer.abort()
+                raise
+            if writer is not None:
+                writer.commit()
+            # Время потоковой загрузки включает обработку строк потребителем
+            latency = time.monotonic() - started
+            METRICS.observe('fetch_seconds', latency, host=host)
+            METRICS.inc('fetch_requests_total', host=host, status=str(response.status_code), source='network')
+            METRICS.inc('fetch_bytes_total', received, host=host, source='network')
+            METRICS.event('fetch', url=url, seconds=round(latency, 6), bytes=received,
+                          status=str(response.status_code), source='network', streamed=True)
+
+    def _stream_cached(self, entry: CacheEntry) -> Iterator[str]:
+        """Построчное чтение тела из кэша"""
+        with self.cache.open(entry) as raw:
+            with io.TextIOWrapper(raw, encoding=entry.encoding or 'utf-8', errors='replace', newline='') as text:
+                for line in text:
+                    yield line.rstrip('\r\n')
+
+    def close(self):
+        """Останавливает цикл событий и пул потоков"""
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+            self._loop = None
+        self._executor.shutdown(wait=True)
+        if self.cache is not None:
+            self.cache.close()
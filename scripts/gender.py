@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Определение пола имени по контексту страницы и окончанию
+Окончания собраны в префиксное дерево по перевернутым суффиксам: одно
+прохождение по буквам имени с конца проверяет все окончания сразу.
+Контекст (HTML родительского элемента) приводится к нижнему регистру и
+проверяется на маркеры один раз на узел, а не для каждого имени
+"""
+
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Set, Tuple
+
+MALE = 'male'
+FEMALE = 'female'
+
+MALE_ENDINGS = ('ов', 'ев', 'ин', 'ский', 'цкий', 'ич', 'он', 'ен')
+FEMALE_ENDINGS = ('а', 'я', 'ова', 'ева', 'ина', 'ская', 'цкая')
+
+MALE_INDICATORS = ('мужск', 'мальчик', 'папа', 'сын', 'брат', 'муж')
+FEMALE_INDICATORS = ('женск', 'девочка', 'мама', 'дочь', 'сестра', 'жена')
+
+# Ключ метки в узле дерева (пустая строка не бывает буквой)
+_LABEL = ''
+
+
+class SuffixTrie:
+    """Дерево перевернутых суффиксов с метками"""
+
+    def __init__(self):
+        self.root = {}
+
+    def add(self, suffix: str, label: str):
+        node = self.root
+        for char in reversed(suffix):
+            node = node.setdefault(char, {})
+        node[_LABEL] = label
+
+    def labels(self, word: str) -> Iterator[str]:
+        """Метки всех суффиксов, которыми оканчивается слово (от коротких к длинным)"""
+        node = self.root
+        for char in reversed(word):
+            node = node.get(char)
+            if node is None:
+                return
+            label = node.get(_LABEL)
+            if label is not None:
+                yield label
+
+
+class GenderClassifier:
+    """Пол имени: сначала по маркерам в контексте, затем по окончанию
+
+    Мужские маркеры и окончания имеют приоритет над женскими.
+    """
+
+    def __init__(self, male_endings: Iterable[str] = MALE_ENDINGS, female_endings: Iterable[str] = FEMALE_ENDINGS,
+                 male_indicators: Iterable[str] = MALE_INDICATORS,
+                 female_indicators: Iterable[str] = FEMALE_INDICATORS):
+        self.endings = SuffixTrie()
+        for ending in female_endings:
+            self.endings.add(ending, FEMALE)
+        for ending in male_endings:
+            self.endings.add(ending, MALE)
+        self.male_indicators = tuple(male_indicators)
+        self.female_indicators = tuple(female_indicators)
+
+    def gender_by_ending(self, name: str) -> Optional[str]:
+        gender = None
+        for label in self.endings.labels(name.lower()):
+            if label == MALE:
+                return MALE
+            gender = label
+        return gender
+
+    def gender_by_context(self, context: str) -> Optional[str]:
+        """Пол по маркерам в тексте, уже приведенном к нижнему регистру"""
+        if any(indicator in context for indicator in self.male_indicators):
+            return MALE
+        if any(indicator in context for indicator in self.female_indicators):
+            return FEMALE
+        return None
+
+    def context_resolver(self) -> Callable[[Any], Optional[str]]:
+        """Пол по контексту узла с памятью по узлу, на время разбора одной страницы"""
+        cache = {}
+
+        def resolve(node) -> Optional[str]:
+            if node is None:
+                return None
+            # Узел хранится рядом с результатом, чтобы его id не переиспользовался
+            cached = cache.get(id(node))
+            if cached is None or cached[0] is not node:
+                cached = cache[id(node)] = (node, self.gender_by_context(str(node).lower()))
+            return cached[1]
+
+        return resolve
+
+    def classify_all(self, candidates: Iterable[Tuple[str, Any]]) -> Dict[str, Set[str]]:
+        """Пакетная классификация пар (имя, элемент) одной страницы
+
+        Пол определяется по контексту родителя элемента, а если маркеров
+        нет - по окончанию. Имена без признаков пола отбрасываются.
+        """
+        result = {MALE: set(), FEMALE: set()}
+        resolve = self.context_resolver()
+        for name, element in candidates:
+            gender = resolve(element.parent) or self.gender_by_ending(name)
+            if gender is not None:
+                result[gender].add(name)
+        return result
+
+    def classify_titles(self, names: Iterable[str], context: str) -> Dict[str, Set[str]]:
+        """Классификация имен из заголовков одной категории
+
+        Пол берется из названия категории («Русские мужские имена»), а если
+        маркеров в нем нет - по окончанию каждого имени.
+        """
+        result = {MALE: set(), FEMALE: set()}
+        context_gender = self.gender_by_context(context.lower())
+        for name in names:
+            gender = context_gender or self.gender_by_ending(name)
+            if gender is not None:
+                result[gender].add(name)
+        return result
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Разбор HTML для парсеров
+Использует бэкенд lxml и SoupStrainer, чтобы строить дерево только
+для нужных частей страницы (списки категорий, #mw-content-text,
+контейнеры цитат), а не для всей страницы целиком
+"""
+
+import re
+from typing import Optional
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+HTML_BACKEND = 'lxml'
+
+# Ссылки на статьи с кириллическим заголовком (категории Википедии/Викисловаря)
+WIKI_WORD_HREF = re.compile(r'/wiki/[А-Яа-яЁё]')
+WIKI_WORD_LINKS = SoupStrainer('a', href=WIKI_WORD_HREF)
+
+# Основной текст статьи MediaWiki (без навигации, шапки и подвала)
+MW_CONTENT = SoupStrainer(id='mw-content-text')
+
+# Заголовок и основной текст статьи (Викицитатник: автор + цитаты)
+MW_TITLE_AND_CONTENT = SoupStrainer(id=['firstHeading', 'mw-content-text'])
+
+# Контейнеры цитат citaty.info. Разбираются вместе с оберткой цитаты
+# (article.node-quote), в которой рядом с текстом лежит автор
+QUOTE_CLASS = re.compile(r'quote|text|content')
+QUOTE_WRAPPER_CLASS = re.compile(r'quote$')
+QUOTE_AUTHOR_CLASS = re.compile(r'author')
+QUOTE_CONTAINERS = SoupStrainer(['article', 'div', 'blockquote', 'p'], class_=QUOTE_CLASS)
+
+
+def make_soup(content: bytes, parse_only: Optional[SoupStrainer] = None) -> BeautifulSoup:
+    """Строит дерево через lxml, при необходимости только для нужных элементов"""
+    return BeautifulSoup(content, HTML_BACKEND, parse_only=parse_only)
+
+
+def class_strainer(*selectors: str) -> SoupStrainer:
+    """Фильтр по CSS-селекторам классов вида '.quote-text'"""
+    classes = [selector.lstrip('.') for selector in selectors]
+    return SoupStrainer(class_=classes)
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Постоянный дисковый кэш HTTP-ответов
+Хранит сжатые тела ответов по URL, поддерживает условные запросы
+(ETag / Last-Modified) и вытеснение по LRU при превышении размера
+"""
+
+import gzip
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import BinaryIO, Dict, Optional
+
+DEFAULT_CACHE_DIR = '.http_cache'
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+class CacheMissError(Exception):
+    """URL отсутствует в кэше в автономном режиме"""
+
+
+class CacheEntry:
+    """Метаданные закэшированного ответа"""
+
+    def __init__(self, url: str, key: str, status_code: int, encoding: Optional[str],
+                 content_type: Optional[str], etag: Optional[str], last_modified: Optional[str],
+                 size: int):
+        self.url = url
+        self.key = key
+        self.status_code = status_code
+        self.encoding = encoding
+        self.content_type = content_type
+        self.etag = etag
+        self.last_modified = last_modified
+        self.size = size
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """Заголовки для условного запроса"""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class HttpCache:
+    """Кэш ответов: индекс в SQLite, тела в gzip-файлах"""
+
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(directory, 'index.sqlite'), check_same_thread=False)
+        self._db.execute('''
+            CREATE TABLE IF NOT EXISTS entries (
+                url TEXT PRIMARY KEY,
+                key TEXT NOT NULL,
+                status_code INTEGER NOT NULL,
+                encoding TEXT,
+                content_type TEXT,
+                etag TEXT,
+                last_modified TEXT,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            )
+        ''')
+        self._db.commit()
+
+    def _body_path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key + '.gz')
+
+    def lookup(self, url: str) -> Optional[CacheEntry]:
+        """Метаданные ответа или None, если тело не сохранено"""
+        with self._lock:
+            row = self._db.execute(
+                'SELECT url, key, status_code, encoding, content_type, etag, last_modified, size '
+                'FROM entries WHERE url = ?', (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        entry = CacheEntry(*row)
+        if not os.path.exists(self._body_path(entry.key)):
+            self.delete(url)
+            return None
+        return entry
+
+    def touch(self, url: str):
+        """Отмечает использование записи для LRU"""
+        with self._lock:
+            self._db.execute('UPDATE entries SET last_access = ? WHERE url = ?', (time.time(), url))
+            self._db.commit()
+
+    def read(self, entry: CacheEntry) -> bytes:
+        """Тело ответа целиком"""
+        self.touch(entry.url)
+        with gzip.open(self._body_path(entry.key), 'rb') as f:
+            return f.read()
+
+    def open(self, entry: CacheEntry) -> BinaryIO:
+        """Тело ответа как поток (для больших датасетов)"""
+        self.touch(entry.url)
+        return gzip.open(self._body_path(entry.key), 'rb')
+
+    def store(self, url: str, content: bytes, headers: Dict[str, str], status_code: int = 200,
+              encoding: Optional[str] = None):
+        """Сохраняет ответ целиком"""
+        writer = self.writer(url, headers, status_code, encoding)
+        writer.write(content)
+        writer.commit()
+
+    def writer(self, url: str, headers: Dict[str, str], status_code: int = 200,
+               encoding: Optional[str] = None) -> 'CacheWriter':
+        """Поэтапная запись ответа, тело можно дописывать по частям"""
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return CacheWriter(self, url, key, headers, status_code, encoding)
+
+    def _commit(self, url: str, key: str, headers: Dict[str, str], status_code: int,
+                encoding: Optional[str], size: int):
+        with self._lock:
+            self._db.execute(
+                'INSERT OR REPLACE INTO entries '
+                '(url, key, status_code, encoding, content_type, etag, last_modified, size, last_access) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (url, key, status_code, encoding, headers.get('Content-Type'),
+                 headers.get('ETag'), headers.get('Last-Modified'), size, time.time())
+            )
+            self._db.commit()
+        self.evict()
+
+    def delete(self, url: str):
+        """Удаляет запись и ее тело"""
+        with self._lock:
+            row = self._db.execute('SELECT key FROM entries WHERE url = ?', (url,)).fetchone()
+            self._db.execute('DELETE FROM entries WHERE url = ?', (url,))
+            self._db.commit()
+        if row is not None:
+            try:
+                os.remove(self._body_path(row[0]))
+            except FileNotFoundError:
+                pass
+
+    def total_size(self) -> int:
+        """Суммарный размер сжатых тел в байтах"""
+        with self._lock:
+            return self._db.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+
+    def evict(self):
+        """Вытесняет давно не использованные записи, пока кэш больше лимита"""
+        total = self.total_size()
+        if total <= self.max_bytes:
+            return
+        with self._lock:
+            rows = self._db.execute('SELECT url, size FROM entries ORDER BY last_access').fetchall()
+        for url, size in rows:
+            if total <= self.max_bytes:
+                break
+            self.delete(url)
+            total -= size
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class CacheWriter:
+    """Запись тела в кэш по частям: сначала во временный файл, затем rename"""
+
+    def __init__(self, cache: HttpCache, url: str, key: str, headers: Dict[str, str],
+                 status_code: int, encoding: Optional[str]):
+        self.cache = cache
+        self.url = url
+        self.key = key
+        self.headers = headers
+        self.status_code = status_code
+        self.encoding = encoding
+
+        self._path = cache._body_path(key)
+        os.makedirs(os.path.dirname(self._path), exist_ok=True)
+        self._tmp_path = f"{self._path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        self._raw = open(self._tmp_path, 'wb')
+        self._file = gzip.GzipFile(fileobj=self._raw, mode='wb')
+
+    def write(self, chunk: bytes):
+        self._file.write(chunk)
+
+    def commit(self):
+        """Завершает запись и регистрирует ответ в индексе"""
+        self._file.close()
+        self._raw.close()
+        os.replace(self._tmp_path, self._path)
+        size = os.path.getsize(self._path)
+        self.cache._commit(self.url, self.key, self.headers, self.status_code, self.encoding, size)
+
+    def abort(self):
+        """Отменяет запись (ошибка посреди загрузки)"""
+        self._file.close()
+        self._raw.close()
+        try:
+            os.remove(self._tmp_path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""
+Потоковые запись и чтение JSON для больших наборов данных
+Длинные списки (все слова, категории, имена) передаются не списками, а
+потоками Stream, которые при каждом обходе заново читают хранилище слов
+или файл. iter_json выдает текст документа кусками в том же виде, что и
+json.dumps, поэтому запись результата не держит в памяти ни документ, ни
+сами списки. load_lazy читает уже записанный документ так же: списки
+строк и чисел в нем не разбираются сразу, а становятся потоками, которые
+читают свой участок файла при обходе
+"""
+
+import json
+import re
+from itertools import chain, islice
+from json.encoder import encode_basestring
+from typing import Any, Callable, Iterable, Iterator, List, Optional
+
+# Элементов списка в одном куске текста
+BATCH_ITEMS = 4096
+# Порция чтения файла и запас текста, который держится перед разбором токена
+READ_SIZE = 1 << 20
+MARGIN = 64 * 1024
+
+_MISSING = object()
+
+
+class Stream:
+    """Последовательность строк или чисел, которую можно обойти несколько раз
+
+    factory создает новый итератор на каждый обход (например, метод
+    __iter__ хранилища слов). Длина, если она не передана, считается одним
+    обходом при первом запросе.
+    """
+
+    def __init__(self, factory: Callable[[], Iterable], length: Optional[int] = None):
+        self.factory = factory
+        self._length = length
+
+    def __iter__(self) -> Iterator:
+        return iter(self.factory())
+
+    def __len__(self) -> int:
+        if self._length is None:
+            self._length = sum(1 for _ in self)
+        return self._length
+
+    def __bool__(self) -> bool:
+        if self._length is not None:
+            return self._length > 0
+        return next(iter(self), _MISSING) is not _MISSING
+
+
+def _is_container(value: Any) -> bool:
+    return isinstance(value, (dict, list, tuple, Stream))
+
+
+def _batches(items: Iterable) -> Iterator[List]:
+    items = iter(items)
+    while True:
+        batch = list(islice(items, BATCH_ITEMS))
+        if not batch:
+            return
+        yield batch
+
+
+def _join_scalars(separator: str, batch: List) -> Optional[str]:
+    """Пачка строк или целых чисел одним куском текста, иначе None"""
+    try:
+        return separator.join(map(encode_basestring, batch))
+    except TypeError:
+        pass
+    # bool - тоже int, но в JSON пишется как true/false
+    if all(type(item) is int for item in batch):
+        return separator.join(map(int.__repr__, batch))
+    return None
+
+
+def iter_json(value: Any, indent: Optional[int] = None, sort_keys: bool = False,
+              flat_lists: bool = False) -> Iterator[str]:
+    """Текст JSON кусками
+
+    С indent - как json.dumps(value, ensure_ascii=False, indent=indent), без
+    него - как с separators=(',', ':'). flat_lists пишет списки без
+    вложенных объектов в одну строку, без отступа перед каждым элементом.
+    Потоки Stream пишутся как списки.
+    """
+    return _iter_value(value, 0, indent, sort_keys, flat_lists)
+
+
+def _newline(indent: Optional[int], level: int) -> str:
+    return '' if indent is None else '\n' + ' ' * (indent * level)
+
+
+def _iter_value(value: Any, level: int, indent: Optional[int], sort_keys: bool, flat_lists: bool) -> Iterator[str]:
+    if isinstance(value, str):
+        yield encode_basestring(value)
+    elif isinstance(value, dict):
+        yield from _iter_object(value, level, indent, sort_keys, flat_lists)
+    elif isinstance(value, (list, tuple, Stream)):
+        yield from _iter_array(value, level, indent, sort_keys, flat_lists)
+    else:
+        yield json.dumps(value)
+
+
+def _iter_object(value: dict, level: int, indent: Optional[int], sort_keys: bool, flat_lists: bool) -> Iterator[str]:
+    if not value:
+        yield '{}'
+        return
+    inner = _newline(indent, level + 1)
+    key_separator = ':' if indent is None else ': '
+    items = sorted(value.items()) if sort_keys else value.items()
+    for position, (key, item) in enumerate(items):
+        yield ('{' if position == 0 else ',') + inner + encode_basestring(key) + key_separator
+        yield from _iter_value(item, level + 1, indent, sort_keys, flat_lists)
+    yield _newline(indent, level) + '}'
+
+
+def _iter_array(value: Iterable, level: int, indent: Optional[int], sort_keys: bool, flat_lists: bool) -> Iterator[str]:
+    items = iter(value)
+    first = next(items, _MISSING)
+    if first is _MISSING:
+        yield '[]'
+        return
+
+    # В потоках только строки и числа; у обычного списка это проверяется
+    flat = indent is None or flat_lists and (isinstance(value, Stream) or not any(map(_is_container, value)))
+    inner = '' if flat else _newline(indent, level + 1)
+    separator = ',' + inner
+    yield '[' + inner
+    for number, batch in enumerate(_batches(chain((first,), items))):
+        if number:
+            yield separator
+        text = _join_scalars(separator, batch)
+        if text is not None:
+            yield text
+            continue
+        for position, item in enumerate(batch):
+            if position:
+                yield separator
+            yield from _iter_value(item, level + 1, indent, sort_keys, flat_lists)
+    yield ('' if flat else _newline(indent, level)) + ']'
+
+
+# --- Чтение
+
+WHITESPACE = re.compile(r'\s*')
+# Скалярное значение JSON: строка, число или литерал
+SCALAR = r'"(?:[^"\\]|\\.)*"|-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?|true|false|null'
+SCALAR_TOKEN = re.compile(SCALAR)
+# Подряд идущие элементы списка, каждый с запятой после него
+SCALAR_RUN = re.compile(r'(?:\s*(?:' + SCALAR + r')\s*,)*')
+# Последний элемент списка и закрывающая скобка
+SCALAR_LAST = re.compile(r'\s*(?:' + SCALAR + r')\s*\]')
+
+
+def _decode_token(token: str) -> Any:
+    if token[0] == '"' and '\\' not in token:
+        return token[1:-1]
+    return json.loads(token)
+
+
+def _complete_length(data: bytes) -> int:
+    """Длина начала data без незаконченного последнего символа UTF-8"""
+    for position in range(len(data) - 1, max(len(data) - 4, -1), -1):
+        lead = data[position]
+        if lead & 0xC0 != 0x80:
+            size = 1 if lead < 0x80 else 2 if lead < 0xE0 else 3 if lead < 0xF0 else 4
+            return position if position + size > len(data) else len(data)
+    return len(data)
+
+
+class _Reader:
+    """Текст файла UTF-8 порциями; помнит байтовое смещение начала текста"""
+
+    def __init__(self, path: str, offset: int = 0):
+        self.file = open(path, 'rb')
+        self.seek(offset)
+
+    def seek(self, offset: int):
+        """Начинает чтение заново с байтового смещения offset"""
+        self.file.seek(offset)
+        self.base = offset
+        self.text = ''
+        self.pos = 0
+        self.pending = b''
+        self.eof = False
+
+    def close(self):
+        self.file.close()
+
+    def fill(self, margin: int = MARGIN):
+        """Дочитывает файл, пока после pos меньше margin символов"""
+        if self.eof or len(self.text) - self.pos >= margin:
+            return
+        # Разобранный текст отбрасывается, смещение сдвигается на его байты
+        self.base += len(self.text[:self.pos].encode('utf-8'))
+        parts = [self.text[self.pos:]]
+        self.pos = 0
+        size = len(parts[0])
+        while size < margin:
+            data = self.pending + self.file.read(READ_SIZE)
+            if len(data) == len(self.pending):
+                self.eof = True
+                parts.append(data.decode('utf-8'))
+                break
+            # Незаконченный символ в конце порции дочитается со следующей
+            cut = _complete_length(data)
+            parts.append(data[:cut].decode('utf-8'))
+            self.pending = data[cut:]
+            size += len(parts[-1])
+        self.text = ''.join(parts)
+
+    def offset(self) -> int:
+        """Байтовое смещение текущей позиции в файле"""
+        return self.base + len(self.text[:self.pos].encode('utf-8'))
+
+    def skip_whitespace(self) -> str:
+        """Пропускает пробелы и возвращает следующий символ ('' в конце файла)"""
+        while True:
+            self.fill()
+            self.pos = WHITESPACE.match(self.text, self.pos).end()
+            if self.pos < len(self.text) or self.eof:
+                return self.text[self.pos:self.pos + 1]
+
+    def expect(self, char: str):
+        if self.skip_whitespace() != char:
+            raise ValueError(f"Ожидался {char!r} в позиции {self.offset()}")
+        self.pos += 1
+
+    def _more(self):
+        # Токен не поместился в запас (например, строка длиннее MARGIN)
+        if self.eof:
+            raise ValueError(f"Неверный JSON в позиции {self.offset()}")
+        # Запас растет вдвое, чтобы длинный токен не разбирался заново на каждой порции
+        self.fill(2 * (len(self.text) - self.pos) + READ_SIZE)
+
+    def scalar(self) -> Any:
+        self.skip_whitespace()
+        while True:
+            self.fill()
+            match = SCALAR_TOKEN.match(self.text, self.pos)
+            # Число в конце текста могло оборваться на границе порции
+            if match is not None and (match.end() < len(self.text) or self.eof):
+                self.pos = match.end()
+                return _decode_token(match.group())
+            self._more()
+
+    def scalars(self, keep: bool = True) -> Iterator[Any]:
+        """Элементы списка скаляров до закрывающей скобки (keep=False - только пропуск)
+
+        Если следующий элемент - объект или список, останавливается перед
+        ним и возвращает (в StopIteration) False, иначе True.
+        """
+        while True:
+            self.fill()
+            start = self.pos
+            end = SCALAR_RUN.match(self.text, start).end()
+            last = SCALAR_LAST.match(self.text, end)
+            if last is not None:
+                end = last.end()
+            # В участке только целые элементы, поэтому поиск токенов без привязки безопасен
+            if keep:
+                yield from map(_decode_token, SCALAR_TOKEN.findall(self.text, start, end))
+            self.pos = end
+            if last is not None:
+                return True
+            rest = WHITESPACE.match(self.text, end).end()
+            if rest < len(self.text) and self.text[rest] in '{[':
+                return False
+            self._more()
+
+    def skip_scalars(self) -> bool:
+        """Пропускает список скаляров; False - в списке есть объект или список"""
+        items = self.scalars(keep=False)
+        while True:
+            try:
+                next(items)
+            except StopIteration as stop:
+                return stop.value
+
+
+def _iter_scalars(path: str, offset: int) -> Iterator[Any]:
+    reader = _Reader(path, offset)
+    try:
+        yield from reader.scalars()
+    finally:
+        reader.close()
+
+
+def _read_value(reader: _Reader, path: str, lazy: bool = True) -> Any:
+    """Значение с текущей позиции; lazy=False - без потоков (внутри списков)"""
+    char = reader.skip_whitespace()
+    if char == '{':
+        reader.pos += 1
+        result = {}
+        if reader.skip_whitespace() == '}':
+            reader.pos += 1
+            return result
+        while True:
+            key = reader.scalar()
+            reader.expect(':')
+            result[key] = _read_value(reader, path, lazy)
+            if reader.skip_whitespace() == '}':
+                reader.pos += 1
+                return result
+            reader.expect(',')
+    if char == '[':
+        reader.pos += 1
+        char = reader.skip_whitespace()
+        if char == ']':
+            reader.pos += 1
+            return []
+        if lazy and char not in '{[':
+            # Список из одних скаляров не разбирается: поток прочитает его при
+            # обходе. Если дальше встретился объект или список, список
+            # разбирается заново поэлементно
+            start = reader.offset()
+            if reader.skip_scalars():
+                return Stream(lambda offset=start: _iter_scalars(path, offset))
+            reader.seek(start)
+        result = []
+        while True:
+            result.append(_read_value(reader, path, lazy=False))
+            if reader.skip_whitespace() == ']':
+                reader.pos += 1
+                return result
+            reader.expect(',')
+    return reader.scalar()
+
+
+def load_lazy(path: str) -> Any:
+    """Документ JSON, в котором списки строк и чисел - потоки Stream по файлу
+
+    Потоками становятся списки из одних скаляров - сам документ или
+    значения объектов. Объекты и остальные списки, в том числе вложенные в
+    списки, разбираются сразу, как json.load. Файл не должен меняться,
+    пока потоки документа используются.
+    """
+    reader = _Reader(path)
+    try:
+        return _read_value(reader, path)
+    finally:
+        reader.close()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Обход категорий Википедии и Викисловаря через MediaWiki API
+Вместо отрисованной HTML-страницы категории запрашивается
+list=categorymembers с cmlimit=max: ответ содержит только заголовки
+статей, по 500 за запрос, и токен продолжения для следующей порции. Так
+видна вся категория, а не первые 200 ссылок, без навигации и разбора HTML.
+Категории обходятся одновременно: следующая порция категории
+запрашивается, как только пришла предыдущая
+"""
+
+import re
+from concurrent.futures import FIRST_COMPLETED, wait
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import unquote, urlencode, urlsplit
+
+from fetcher import AsyncFetcher
+
+API_PATH = '/w/api.php'
+# Допустимое отставание реплик базы (с): при большем сервер отвечает 503
+# с Retry-After, и загрузчик откладывает запросы к хосту
+MAX_LAG = 5
+
+# Страница категории: /wiki/Категория:... или /wiki/Category:...
+CATEGORY_PATH = re.compile(r'^/wiki/(Категория|Category):', re.IGNORECASE)
+# Уточнение в скобках: «Иван (имя)» -> «Иван»
+TITLE_QUALIFIER = re.compile(r'\s*\([^)]*\)$')
+
+
+def is_category_url(url: str) -> bool:
+    return CATEGORY_PATH.match(unquote(urlsplit(url).path)) is not None
+
+
+def api_endpoint(url: str) -> str:
+    """https://ru.wiktionary.org/wiki/... -> https://ru.wiktionary.org/w/api.php"""
+    parts = urlsplit(url)
+    return f'{parts.scheme}://{parts.netloc}{API_PATH}'
+
+
+def category_title(url: str) -> str:
+    """Заголовок категории из URL: подчеркивания -> пробелы"""
+    return unquote(urlsplit(url).path)[len('/wiki/'):].replace('_', ' ')
+
+
+def category_members_url(url: str, cmcontinue: Optional[str] = None, namespace: int = 0) -> str:
+    """URL запроса одной порции участников категории по URL ее страницы"""
+    params = {
+        'action': 'query',
+        'list': 'categorymembers',
+        'cmtitle': category_title(url),
+        'cmlimit': 'max',
+        'cmnamespace': namespace,
+        'cmtype': 'page',
+        'format': 'json',
+        'formatversion': 2,
+        'maxlag': MAX_LAG,
+    }
+    if cmcontinue is not None:
+        params['cmcontinue'] = cmcontinue
+    return f'{api_endpoint(url)}?{urlencode(params)}'
+
+
+def page_name(title: str) -> str:
+    """Заголовок статьи без уточнения в скобках"""
+    return TITLE_QUALIFIER.sub('', title).strip()
+
+
+class CategoryMembers:
+    """Заголовки статей категорий через list=categorymembers"""
+
+    def __init__(self, fetcher: AsyncFetcher, timeout: float = 10, max_pages: int = 1000):
+        self.fetcher = fetcher
+        self.timeout = timeout
+        # Защита от зацикливания на неисправном токене продолжения
+        self.max_pages = max_pages
+
+    def titles(self, categories: Iterable[str]) -> Dict[str, List[str]]:
+        """URL категории -> заголовки всех ее статей; категории обходятся одновременно
+
+        Категории, на которых запрос не удался, в результат не попадают
+        (ошибка печатается), чтобы их не записали в контрольную точку.
+        """
+        titles = {}
+        failed = set()
+        pages = {}
+        pending = {}
+        for url in categories:
+            titles[url] = []
+            pages[url] = 1
+            pending[self.fetcher.submit(category_members_url(url), self.timeout)] = url
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                url = pending.pop(future)
+                response = future.result()
+                print(f"📄 Обрабатываю: {url} (API, порция {pages[url]})")
+                try:
+                    response.raise_for_status()
+                    data = response.json()
+                except Exception as e:
+                    print(f"❌ Ошибка API категории {url}: {e}")
+                    failed.add(url)
+                    continue
+                if 'error' in data:
+                    print(f"❌ Ошибка API категории {url}: {data['error'].get('info', data['error'])}")
+                    failed.add(url)
+                    continue
+
+                titles[url].extend(member['title'] for member in data.get('query', {}).get('categorymembers', []))
+
+                cmcontinue = data.get('continue', {}).get('cmcontinue')
+                if cmcontinue is not None and pages[url] < self.max_pages:
+                    pages[url] += 1
+                    pending[self.fetcher.submit(category_members_url(url, cmcontinue), self.timeout)] = url
+
+        return {url: members for url, members in titles.items() if url not in failed}
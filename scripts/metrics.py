@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Счетчики и замеры времени по стадиям парсинга
+Загрузчик, обход страниц, валидаторы, категоризация, дедупликация и запись
+результата отмечают свою работу в общем реестре METRICS. В конце запуска
+реестр выгружается в JSON и в текстовый файл Prometheus (node_exporter
+textfile collector), чтобы было видно, какой источник и какая стадия
+тормозит
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Tuple
+
+from storage import atomic_write
+
+# Префикс имен метрик в формате Prometheus
+PROMETHEUS_PREFIX = 'parser_'
+
+DEFAULT_METRICS_DIR = '.metrics'
+
+# Описания метрик для # HELP
+DESCRIPTIONS = {
+    'fetch_seconds': 'Время загрузки одного URL',
+    'fetch_bytes_total': 'Загружено байт',
+    'fetch_requests_total': 'Запросов по статусу ответа',
+    'fetch_retries_total': 'Повторов по Retry-After',
+    'parse_seconds': 'Время разбора одной страницы',
+    'parse_errors_total': 'Страниц, разбор которых упал',
+    'items_extracted_total': 'Извлечено элементов со страниц',
+    'items_checked_total': 'Проверено элементов валидатором',
+    'items_rejected_total': 'Отброшено элементов валидатором',
+    'stage_seconds': 'Время стадии обработки',
+    'dump_pages_total': 'Прочитано статей дампа',
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Dict[str, object]) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+class Metrics:
+    """Потокобезопасный реестр счетчиков и замеров времени"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[Tuple[str, Labels], float] = {}
+        self._timings: Dict[Tuple[str, Labels], list] = {}
+        self._events: List[Dict] = []
+
+    def inc(self, name: str, value: float = 1, **labels):
+        key = (name, _labels(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, seconds: float, **labels):
+        key = (name, _labels(labels))
+        with self._lock:
+            timing = self._timings.get(key)
+            if timing is None:
+                self._timings[key] = [1, seconds, seconds]
+            else:
+                timing[0] += 1
+                timing[1] += seconds
+                timing[2] = max(timing[2], seconds)
+
+    def counters(self) -> Dict[Tuple[str, Labels], float]:
+        """Копия счетчиков, например, чтобы потом взять прирост через counters_since"""
+        with self._lock:
+            return dict(self._counters)
+
+    def counters_since(self, before: Dict[Tuple[str, Labels], float]) -> Dict[Tuple[str, Labels], float]:
+        """Прирост счетчиков с момента снимка counters()"""
+        with self._lock:
+            return {key: value - before.get(key, 0) for key, value in self._counters.items()
+                    if value != before.get(key, 0)}
+
+    def add_counters(self, counters: Dict[Tuple[str, Labels], float]):
+        """Добавляет прирост счетчиков из другого процесса (воркера пула разбора)"""
+        with self._lock:
+            for key, value in counters.items():
+                self._counters[key] = self._counters.get(key, 0) + value
+
+    def event(self, kind: str, **fields):
+        """Запись об одном URL (загрузка, разбор); попадает только в JSON-отчет"""
+        with self._lock:
+            self._events.append({'kind': kind, **fields})
+
+    @contextmanager
+    def timer(self, name: str, **labels) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._timings.clear()
+            self._events.clear()
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            counters = [
+                {'name': name, 'labels': dict(labels), 'value': value}
+                for (name, labels), value in sorted(self._counters.items())
+            ]
+            timings = [
+                {'name': name, 'labels': dict(labels), 'count': count, 'sum': total, 'max': longest}
+                for (name, labels), (count, total, longest) in sorted(self._timings.items())
+            ]
+            events = list(self._events)
+        return {'counters': counters, 'timings': timings, 'events': events}
+
+    def to_prometheus(self, **extra_labels) -> str:
+        """Текстовый формат Prometheus: счетчики как counter, замеры как summary"""
+        data = self.to_dict()
+        lines = []
+
+        def series(name: str, labels: Dict[str, str]) -> str:
+            labels = {**extra_labels, **labels}
+            if not labels:
+                return name
+            rendered = ','.join(f'{key}="{_escape(value)}"' for key, value in sorted(labels.items()))
+            return f'{name}{{{rendered}}}'
+
+        declared = set()
+        for counter in data['counters']:
+            name = PROMETHEUS_PREFIX + counter['name']
+            if name not in declared:
+                declared.add(name)
+                lines.append(f"# HELP {name} {DESCRIPTIONS.get(counter['name'], counter['name'])}")
+                lines.append(f'# TYPE {name} counter')
+            lines.append(f"{series(name, counter['labels'])} {counter['value']}")
+
+        for timing in data['timings']:
+            name = PROMETHEUS_PREFIX + timing['name']
+            if name not in declared:
+                declared.add(name)
+                lines.append(f"# HELP {name} {DESCRIPTIONS.get(timing['name'], timing['name'])}")
+                lines.append(f'# TYPE {name} summary')
+            lines.append(f"{series(name + '_count', timing['labels'])} {timing['count']}")
+            lines.append(f"{series(name + '_sum', timing['labels'])} {timing['sum']:.6f}")
+
+        return '\n'.join(lines) + '\n'
+
+    def export(self, directory: str, name: str) -> Tuple[str, str]:
+        """Пишет <name>.json и <name>.prom в directory; возвращает пути"""
+        json_path = os.path.join(directory, f'{name}.json')
+        prom_path = os.path.join(directory, f'{name}.prom')
+        report = {'parser': name, 'generatedAt': time.strftime('%Y-%m-%d %H:%M:%S'), **self.to_dict()}
+        atomic_write(json_path, json.dumps(report, ensure_ascii=False, indent=2).encode('utf-8'))
+        atomic_write(prom_path, self.to_prometheus(parser=name).encode('utf-8'))
+        return json_path, prom_path
+
+    def slowest(self, name: str, limit: int = 5):
+        """Самые долгие серии замера name по суммарному времени"""
+        timings = [timing for timing in self.to_dict()['timings'] if timing['name'] == name]
+        return sorted(timings, key=lambda timing: timing['sum'], reverse=True)[:limit]
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+METRICS = Metrics()
+
+
+def timed(stage: str):
+    """Декоратор: время вызова функции идет в stage_seconds{stage=...}"""
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with METRICS.timer('stage_seconds', stage=stage):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Нормализация написания имен и слов
+Источники дают одно и то же слово в разных формах: «Пётр»/«Петр»,
+«лёд»/«лед», составной «ё» (е + U+0308), разные виды дефиса. Варианты
+сводятся к каноническому ключу, и для каждого ключа остается одна
+предпочтительная форма
+"""
+
+import re
+import unicodedata
+from itertools import groupby
+from typing import Iterable, List, Tuple
+
+from metrics import timed
+from word_store import WordStore
+
+# Дефисы и тире Unicode, которые считаются обычным дефисом
+DASHES = re.compile('[\u2010-\u2015\u2212]')
+# Мягкий перенос невидим и в ключ не входит
+SOFT_HYPHEN = '\u00ad'
+# Форма, которая заведомо совпадает со своим ключом: строчная кириллица без «ё»
+# (готовые символы, то есть уже NFC), обычный дефис и пробел
+PLAIN_FORM = re.compile(r'[а-я\- ]*')
+# Разделитель ключа и формы в хранилище вариантов (в словах его не бывает)
+KEY_SEPARATOR = '\t'
+
+
+def to_nfc(text: str) -> str:
+    """Составные символы (е + U+0308) в готовые (ё)"""
+    return unicodedata.normalize('NFC', text)
+
+
+def canonical_key(text: str) -> str:
+    """Ключ, общий для всех вариантов написания: NFC, единый дефис, без регистра, ё → е"""
+    text = DASHES.sub('-', to_nfc(text).replace(SOFT_HYPHEN, ''))
+    return text.casefold().replace('ё', 'е')
+
+
+def _preference(form: str) -> Tuple[int, str]:
+    # Форма с «ё» точнее передает произношение; при равенстве - первая по алфавиту,
+    # чтобы результат не зависел от порядка обхода множества
+    return -(form.count('ё') + form.count('Ё')), form
+
+
+@timed('normalize')
+def collapse_variants(forms: Iterable[str]) -> Tuple[List[str], int]:
+    """Схлопывает варианты написания за один проход
+
+    forms - различные формы (например, множество). Возвращает
+    отсортированный список предпочтительных форм и число объединенных
+    вариантов.
+    """
+    preferred = {}
+    total = 0
+    for form in forms:
+        total += 1
+        key = canonical_key(form)
+        current = preferred.get(key)
+        if current is None or _preference(form) < _preference(current):
+            preferred[key] = form
+    return sorted(preferred.values()), total - len(preferred)
+
+
+@timed('normalize')
+def collapse_store(store: WordStore) -> Tuple[WordStore, int]:
+    """То же, что collapse_variants, но для компактного хранилища форм
+
+    Почти все проверенные слова уже совпадают со своим ключом, поэтому
+    отдельно хранятся только формы, отличные от ключа (с «ё», прописными
+    буквами, особыми дефисами), - строками «ключ<TAB>форма» в хранилище с
+    теми же пределами памяти. Их группы по ключу сливаются с обходом
+    самого хранилища, чтобы найти формы, совпадающие с ключом. Ничего не
+    держится в памяти целиком, поэтому так же работают и выгруженные на
+    диск наборы. Возвращает хранилище предпочтительных форм и число
+    объединенных вариантов.
+    """
+    # Один прогон: оба обхода ниже идут без слияния
+    store.compact()
+    plain = PLAIN_FORM.fullmatch
+    keyed = store.empty_like()
+    for form in store:
+        if plain(form) is None:
+            key = canonical_key(form)
+            if key != form:
+                keyed.add(key + KEY_SEPARATOR + form)
+
+    dropped = store.empty_like()
+    count = 0
+    if keyed:
+        # Ключи и формы идут в одном порядке: форма с ключом ищется слиянием
+        forms_in_store = iter(store)
+        current = next(forms_in_store, None)
+        for key, entries in groupby(keyed, key=lambda entry: entry.split(KEY_SEPARATOR, 1)[0]):
+            forms = [entry.split(KEY_SEPARATOR, 1)[1] for entry in entries]
+            while current is not None and current < key:
+                current = next(forms_in_store, None)
+            if current == key:
+                forms.append(key)
+            preferred = min(forms, key=_preference)
+            for form in forms:
+                if form != preferred:
+                    dropped.add(form)
+                    count += 1
+        keyed.close()
+
+    collapsed = store.without(dropped)
+    dropped.close()
+    return collapsed, count
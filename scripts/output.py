@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+"""
+Запись итоговых наборов данных
+Кроме обычного JSON с отступами умеет писать компактный формат: все строки
+из списков собраны в одну отсортированную таблицу без повторов, а списки
+хранятся как массивы индексов в нее. Отсортированные списки (слова,
+категории, имена) пишутся разностями соседних индексов, списки словарей
+(цитаты) - по столбцам. Рядом можно положить заранее сжатые .gz и .br
+
+Файлы пишутся атомарно. Хеш содержимого (без lastUpdated) хранится в
+data-manifest.json рядом с результатом: если данные не изменились,
+файлы не перезаписываются и кэши сборки не сбрасываются
+
+Длинные списки можно передавать потоками json_stream.Stream (например,
+слова из хранилища): хеш, отчет об изменениях, оба формата и сжатые
+копии считаются и пишутся потоком, без документа и списков в памяти
+"""
+
+import hashlib
+import heapq
+import json
+import os
+import zlib
+from functools import partial
+from itertools import accumulate, groupby
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from delta import build_delta, delta_filename
+from json_stream import Stream, iter_json, load_lazy
+from shards import write_shards
+from storage import FileLock, write_chunks_if_changed, write_if_changed
+from word_store import WordStore
+
+try:
+    import brotli
+except ImportError:  # brotli - необязательная зависимость
+    brotli = None
+
+COMPACT_FORMAT = 'strtab-1'
+
+# Значения, в которые кодируются списки
+SORTED_INDEXES = '@d'   # возрастающие индексы, разностями
+INDEXES = '@i'          # индексы в исходном порядке
+COLUMNS = '@c'          # список словарей по столбцам
+
+OUTPUT_FORMATS = ('json', 'compact')
+# Порция чтения записанного файла для сжатых копий
+READ_SIZE = 1 << 20
+
+# Поля, меняющиеся при каждом запуске и не входящие в хеш содержимого
+VOLATILE_KEYS = ('lastUpdated',)
+DATA_MANIFEST_NAME = 'data-manifest.json'
+
+
+def _is_string_list(value: List) -> bool:
+    return bool(value) and all(isinstance(item, str) for item in value)
+
+
+def _is_table(value: List) -> bool:
+    if not value or not all(isinstance(item, dict) for item in value):
+        return False
+    keys = list(value[0])
+    return all(list(item) == keys for item in value)
+
+
+def _collect_strings(value: Any, strings: set, streams: List[Stream]):
+    if isinstance(value, Stream):
+        streams.append(value)
+    elif isinstance(value, dict):
+        for item in value.values():
+            _collect_strings(item, strings, streams)
+    elif isinstance(value, list):
+        if _is_string_list(value):
+            strings.update(value)
+        elif _is_table(value):
+            for key in value[0]:
+                _collect_strings([row[key] for row in value], strings, streams)
+        else:
+            for item in value:
+                _collect_strings(item, strings, streams)
+
+
+def _sorted_ids(items: Iterable[str], table: Iterable[str]) -> Iterator[int]:
+    """Номера строк отсортированного потока в таблице - слиянием с ней"""
+    positions = enumerate(table)
+    for item in items:
+        for position, string in positions:
+            if string == item:
+                yield position
+                break
+        else:
+            raise ValueError(f"Поток строк не отсортирован или нет строки в таблице: {item!r}")
+
+
+def _deltas(ids: Iterable[int]) -> Iterator[int]:
+    previous = 0
+    for position in ids:
+        yield position - previous
+        previous = position
+
+
+def _encode(value: Any, index: Dict[str, int], table: Iterable[str] = ()) -> Any:
+    if isinstance(value, Stream):
+        # Поток - отсортированные строки без повторов: всегда разностями
+        if not value:
+            return []
+        return {SORTED_INDEXES: Stream(lambda: _deltas(_sorted_ids(value, table)))}
+    if isinstance(value, dict):
+        return {key: _encode(item, index, table) for key, item in value.items()}
+    if not isinstance(value, list):
+        return value
+
+    if _is_string_list(value):
+        ids = [index[item] for item in value]
+        if all(previous < current for previous, current in zip(ids, ids[1:])):
+            return {SORTED_INDEXES: [ids[0]] + [current - previous for previous, current in zip(ids, ids[1:])]}
+        return {INDEXES: ids}
+    if _is_table(value):
+        return {COLUMNS: {key: _encode([row[key] for row in value], index, table) for key in value[0]}}
+    return [_encode(item, index, table) for item in value]
+
+
+def _merged_table(strings: set, streams: List[Stream]) -> Iterator[str]:
+    return (string for string, _ in groupby(heapq.merge(sorted(strings), *streams)))
+
+
+def encode_compact(data: Any, word_store: Callable[..., WordStore] = WordStore) -> Dict:
+    """Переводит набор данных в компактный формат
+
+    Если в данных есть потоки Stream, таблица строк собирается одним
+    слиянием потоков и остальных строк в хранилище word_store, а номера
+    строк потоков находятся слиянием с ней при записи; в памяти остаются
+    только номера обычных списков.
+    """
+    strings = set()
+    streams = []
+    _collect_strings(data, strings, streams)
+    if not streams:
+        table = sorted(strings)
+        index = {string: position for position, string in enumerate(table)}
+    else:
+        # Каждый поток сливается с таблицей заново, поэтому она не пересобирается на каждый обход
+        store = word_store(_merged_table(strings, streams))
+        table = Stream(store.__iter__, len(store))
+        index = {}
+        if strings:
+            for position, string in enumerate(table):
+                if string in strings:
+                    index[string] = position
+    return {'format': COMPACT_FORMAT, 'strings': table, 'data': _encode(data, index, table)}
+
+
+def _pick_sorted(table: Iterable[str], deltas: Iterable[int]) -> Iterator[str]:
+    strings = enumerate(table)
+    for position in accumulate(deltas):
+        for number, string in strings:
+            if number == position:
+                yield string
+                break
+
+
+def _pick(table: Iterable[str], positions: Iterable[int]) -> List[str]:
+    positions = list(positions)
+    wanted = set(positions)
+    found = {number: string for number, string in enumerate(table) if number in wanted}
+    return [found[position] for position in positions]
+
+
+def _decode(value: Any, table: Any) -> Any:
+    if isinstance(value, list):
+        return [_decode(item, table) for item in value]
+    if not isinstance(value, dict):
+        return value
+
+    if len(value) == 1:
+        key, item = next(iter(value.items()))
+        if key == SORTED_INDEXES:
+            if isinstance(table, Stream):
+                return Stream(lambda: _pick_sorted(table, item))
+            result = []
+            position = 0
+            for delta in item:
+                position += delta
+                result.append(table[position])
+            return result
+        if key == INDEXES:
+            if isinstance(table, Stream):
+                return _pick(table, item)
+            return [table[position] for position in item]
+        if key == COLUMNS:
+            columns = {name: _decode(column, table) for name, column in item.items()}
+            return [dict(zip(columns, row)) for row in zip(*columns.values())]
+    return {key: _decode(item, table) for key, item in value.items()}
+
+
+def decode_compact(payload: Dict) -> Any:
+    """Восстанавливает исходный набор данных из компактного формата
+
+    Для документа из load_lazy таблица строк - поток, и отсортированные
+    списки тоже восстанавливаются потоками.
+    """
+    if payload.get('format') != COMPACT_FORMAT:
+        raise ValueError(f"Неизвестный формат данных: {payload.get('format')}")
+    return _decode(payload['data'], payload['strings'])
+
+
+def iter_serialized(data: Any, output_format: str, flat_lists: bool = False,
+                    word_store: Callable[..., WordStore] = WordStore) -> Iterator[bytes]:
+    """Байты файла кусками в формате json (с отступами) или compact (без пробелов)
+
+    flat_lists - списки в json без отступа перед каждым элементом;
+    word_store - хранилище таблицы строк compact, если в данных есть потоки.
+    """
+    if output_format == 'json':
+        chunks = iter_json(data, indent=2, flat_lists=flat_lists)
+    elif output_format == 'compact':
+        chunks = iter_json(encode_compact(data, word_store))
+    else:
+        raise ValueError(f"Неизвестный формат вывода: {output_format}")
+    return (chunk.encode('utf-8') for chunk in chunks)
+
+
+def serialize(data: Any, output_format: str, flat_lists: bool = False) -> bytes:
+    """Байты файла в формате json (с отступами) или compact (без пробелов)"""
+    return b''.join(iter_serialized(data, output_format, flat_lists))
+
+
+def content_hash(data: Any) -> str:
+    """SHA-256 данных без изменчивых полей, не зависящий от порядка ключей
+
+    Совпадает с хешем json.dumps(sort_keys=True, separators=(',', ':')),
+    но текст считается кусками.
+    """
+    if isinstance(data, dict):
+        data = {key: value for key, value in data.items() if key not in VOLATILE_KEYS}
+    digest = hashlib.sha256()
+    for chunk in iter_json(data, sort_keys=True):
+        digest.update(chunk.encode('utf-8'))
+    return digest.hexdigest()
+
+
+def read_file_chunks(path: str) -> Iterator[bytes]:
+    with open(path, 'rb') as f:
+        yield from iter(partial(f.read, READ_SIZE), b'')
+
+
+def gzip_chunks(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Сжатие gzip кусками; те же байты, что у gzip.compress(..., mtime=0)"""
+    # wbits=31 - поток zlib с заголовком gzip, mtime в нем нулевой
+    compressor = zlib.compressobj(9, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        yield compressor.compress(chunk)
+    yield compressor.flush()
+
+
+def brotli_chunks(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Сжатие brotli кусками"""
+    compressor = brotli.Compressor(quality=11)
+    for chunk in chunks:
+        yield compressor.process(chunk)
+    yield compressor.finish()
+
+
+def read_data_manifest(directory: str) -> Dict:
+    """Манифест результатов папки: имя файла -> хеш, версия и записанные файлы"""
+    try:
+        with open(os.path.join(directory, DATA_MANIFEST_NAME), encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def load_previous(filename: str) -> Optional[Any]:
+    """Прошлая сборка набора из JSON или, если его нет, из компактного файла
+
+    Файл читается через load_lazy: списки строк остаются потоками по файлу.
+    """
+    for path, compact in ((filename, False), (compact_filename(filename), True)):
+        if os.path.exists(path):
+            payload = load_lazy(path)
+            return decode_compact(payload) if compact else payload
+    return None
+
+
+def compact_filename(filename: str) -> str:
+    """parsed_words.json -> parsed_words.compact.json"""
+    root, extension = os.path.splitext(filename)
+    return f'{root}.compact{extension or ".json"}'
+
+
+class DatasetWriter:
+    """Пишет набор данных в выбранных форматах и, по желанию, сжатые копии и части"""
+
+    def __init__(self, formats: Iterable[str] = ('json',), precompress: bool = False, shard_size: int = 0,
+                 flat_lists: bool = False, word_store: Callable[..., WordStore] = WordStore):
+        self.formats = tuple(formats)
+        self.precompress = precompress
+        self.shard_size = shard_size
+        # Списки в json одной строкой, без отступа перед каждым элементом
+        self.flat_lists = flat_lists
+        # Хранилище таблицы строк compact (с теми же пределами памяти, что и у парсера)
+        self.word_store = word_store
+
+    def save(self, data: Any, filename: str):
+        directory = os.path.dirname(filename) or '.'
+        name = os.path.basename(filename)
+        digest = content_hash(data)
+        paths = self._paths(filename)
+        layout = self._layout()
+        lock = FileLock(os.path.join(directory, f'{DATA_MANIFEST_NAME}.lock'))
+
+        with lock:
+            entry = read_data_manifest(directory).get(name)
+        # Хеш не зависит от вида файлов, поэтому смена форматов или --flat-lists
+        # тоже требует перезаписи
+        if (entry is not None and entry['sha256'] == digest and entry.get('layout') == layout
+                and all(os.path.exists(path) for path in paths)):
+            print(f"⏭️  Без изменений, не перезаписываю: {filename} (версия {entry['version']})")
+            return
+
+        if entry is not None and entry['sha256'] == digest:
+            # Изменился только вид файлов: отчет об изменениях данных остается прежним
+            summary = entry.get('delta')
+        else:
+            summary = self._write_delta(filename, data, entry, digest)
+
+        for output_format in self.formats:
+            path = filename if output_format == 'json' else compact_filename(filename)
+            _, size = write_chunks_if_changed(path, iter_serialized(data, output_format, self.flat_lists, self.word_store))
+            print(f"💾 Данные сохранены в {path} ({size:,} байт)")
+
+            if self.precompress:
+                self._write_compressed(path)
+
+        with lock:
+            manifest = read_data_manifest(directory)
+            manifest[name] = {
+                'sha256': digest,
+                'version': digest[:12],
+                'lastUpdated': data.get('lastUpdated') if isinstance(data, dict) else None,
+                'files': sorted(os.path.basename(path) for path in paths),
+                'layout': layout,
+                'delta': summary,
+            }
+            content = json.dumps(manifest, ensure_ascii=False, indent=2, sort_keys=True).encode('utf-8')
+            write_if_changed(os.path.join(directory, DATA_MANIFEST_NAME), content)
+
+    def _write_delta(self, filename: str, data: Any, entry: Optional[Dict], digest: str) -> Optional[Dict]:
+        """Сравнивает данные с прошлой сборкой и пишет <имя>.delta.json"""
+        previous = load_previous(filename)
+        if previous is None:
+            return None
+
+        delta = build_delta(os.path.basename(filename), previous, data,
+                            entry['version'] if entry else None, digest[:12])
+        path = delta_filename(filename)
+        write_if_changed(path, json.dumps(delta, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+        print(f"🔀 Изменения относительно прошлой сборки: +{delta['summary']['added']} "
+              f"-{delta['summary']['removed']} ({path})")
+        return delta['summary']
+
+    def _layout(self) -> Dict[str, Any]:
+        """Настройки записи, от которых зависят байты файлов"""
+        return {'formats': sorted(self.formats), 'flatLists': self.flat_lists}
+
+    def _paths(self, filename: str) -> List[str]:
+        """Все файлы, которые пишутся для набора"""
+        paths = []
+        for output_format in self.formats:
+            path = filename if output_format == 'json' else compact_filename(filename)
+            paths.append(path)
+            if self.precompress:
+                paths.append(f'{path}.gz')
+                if brotli is not None:
+                    paths.append(f'{path}.br')
+        return paths
+
+    def save_shards(self, directory: str, datasets: Dict[str, Iterable[str]]):
+        """Пишет списки частями с манифестом, если задан shard_size"""
+        if not self.shard_size:
+            return
+        manifest, changed = write_shards(directory, datasets, self.shard_size)
+        chunks = sum(len(dataset['chunks']) for dataset in manifest['datasets'].values())
+        print(f"🧩 Части сохранены в {directory}: {len(datasets)} списков, {chunks} частей, изменено {changed}")
+
+    def _write_compressed(self, path: str):
+        # Копии сжимаются из уже записанного файла порциями.
+        # mtime=0: одинаковые данные дают побайтно одинаковый архив
+        _, size = write_chunks_if_changed(f'{path}.gz', gzip_chunks(read_file_chunks(path)))
+        sizes = f"gz {size:,} байт"
+
+        if brotli is not None:
+            _, size = write_chunks_if_changed(f'{path}.br', brotli_chunks(read_file_chunks(path)))
+            sizes += f", br {size:,} байт"
+        else:
+            sizes += ", br пропущен (pip install brotli)"
+        print(f"🗜️  Сжатые копии {path}: {sizes}")
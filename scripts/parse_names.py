@@ -4,228 +4,109 @@
 Собирает качественные данные из Википедии и других открытых источников
 """
 
-import requests
-from bs4 import BeautifulSoup
-import json
-import re
 import time
-from typing import List, Set
+from typing import Dict, Iterable, List, Set
 
-class RussianNamesParser:
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
+from cli import (build_arg_parser, create_checkpoint, create_fetcher, create_parse_pool, create_word_store,
+                 create_writer, export_metrics)
+from crawler import SourceParser
+from gender import GenderClassifier
+from html_parsing import MW_CONTENT, make_soup
+from mediawiki import category_title, page_name
+from json_stream import Stream
+from normalization import collapse_store, to_nfc
+from validation import clean_names, find_russian_words, is_name_like_text
+
+NAME_GENDER = GenderClassifier()
+
+
+class RussianNamesParser(SourceParser):
+    NAME = 'parse_names'
+    USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         
-    def parse_wikipedia_names(self) -> dict:
-        """Парсинг имен из Википедии"""
-        print("🔍 Парсинг имен из Википедии...")
+    def extract_wikipedia_names(self, response) -> dict:
+        """Извлекает имена со страницы Википедии"""
+        response.raise_for_status()
         
-        # Ссылки на страницы с популярными русскими именами
-        urls = [
-            "https://ru.wikipedia.org/wiki/Список_популярных_русских_имён",
-            "https://ru.wikipedia.org/wiki/Категория:Русские_мужские_имена",
-            "https://ru.wikipedia.org/wiki/Категория:Русские_женские_имена"
-        ]
+        soup = make_soup(response.content, MW_CONTENT)
         
-        male_names = set()
-        female_names = set()
+        # Ищем имена в различных элементах
+        candidates = []
+        for element in soup.find_all(['li', 'td', 'a']):
+            text = element.get_text().strip()
+            
+            # Фильтруем только русские имена
+            if self.is_russian_name(text):
+                candidates.append((text, element))
         
-        for url in urls:
-            try:
-                print(f"📄 Обрабатываю: {url}")
-                response = self.session.get(url, timeout=10)
-                response.raise_for_status()
-                
-                soup = BeautifulSoup(response.content, 'html.parser')
-                
-                # Ищем имена в различных элементах
-                for element in soup.find_all(['li', 'td', 'a']):
-                    text = element.get_text().strip()
-                    
-                    # Фильтруем только русские имена
-                    if self.is_russian_name(text):
-                        # Определяем пол по контексту или другим признакам
-                        if self.is_male_name(text, element):
-                            male_names.add(text)
-                        elif self.is_female_name(text, element):
-                            female_names.add(text)
-                
-                time.sleep(1)  # Вежливая задержка
-                
-            except Exception as e:
-                print(f"❌ Ошибка при парсинге {url}: {e}")
-                continue
+        # Определяем пол по контексту или окончанию
+        names = NAME_GENDER.classify_all(candidates)
         
         return {
-            'male': list(male_names),
-            'female': list(female_names)
+            'male': sorted(names['male']),
+            'female': sorted(names['female'])
         }
     
-    def parse_open_sources(self) -> dict:
-        """Парсинг из других открытых источников"""
-        print("🔍 Парсинг из открытых источников...")
+    def extract_wikipedia_titles(self, category_url: str, titles: List[str]) -> Dict[str, List[str]]:
+        """Имена из заголовков статей категории Википедии (режим MediaWiki API)"""
+        names = [name for name in map(page_name, titles) if self.is_russian_name(name)]
+        names = NAME_GENDER.classify_titles(names, category_title(category_url))
+        return {
+            'male': sorted(names['male']),
+            'female': sorted(names['female'])
+        }
+    
+    def extract_open_source_names(self, response) -> dict:
+        """Извлекает имена со страницы открытого источника"""
+        response.raise_for_status()
         
-        # Список открытых источников с именами
-        sources = [
-            {
-                'url': 'https://imena-znachenie.ru/popularnye-russkie-imena',
-                'type': 'popular'
-            },
-            {
-                'url': 'https://kakzovut.ru/russkie-imena',
-                'type': 'general'
-            }
-        ]
+        soup = make_soup(response.content)
         
-        male_names = set()
-        female_names = set()
+        # Ищем имена в тексте
+        candidates = []
+        for element in soup.find_all(['div', 'span', 'p', 'li']):
+            text = element.get_text().strip()
+            
+            # Извлекаем имена из текста
+            for name in self.extract_names_from_text(text):
+                candidates.append((name, element))
         
-        for source in sources:
-            try:
-                print(f"📄 Обрабатываю: {source['url']}")
-                response = self.session.get(source['url'], timeout=10)
-                response.raise_for_status()
-                
-                soup = BeautifulSoup(response.content, 'html.parser')
-                
-                # Ищем имена в тексте
-                for element in soup.find_all(['div', 'span', 'p', 'li']):
-                    text = element.get_text().strip()
-                    
-                    # Извлекаем имена из текста
-                    names = self.extract_names_from_text(text)
-                    
-                    for name in names:
-                        if self.is_male_name(name, element):
-                            male_names.add(name)
-                        elif self.is_female_name(name, element):
-                            female_names.add(name)
-                
-                time.sleep(2)  # Вежливая задержка
-                
-            except Exception as e:
-                print(f"❌ Ошибка при парсинге {source['url']}: {e}")
-                continue
+        # Контекст общего родителя проверяется один раз для всех его имен
+        names = NAME_GENDER.classify_all(candidates)
         
         return {
-            'male': list(male_names),
-            'female': list(female_names)
+            'male': sorted(names['male']),
+            'female': sorted(names['female'])
         }
     
     def is_russian_name(self, text: str) -> bool:
         """Проверяет, является ли текст русским именем"""
-        if not text or len(text) < 2 or len(text) > 20:
-            return False
-        
-        # Проверяем, что текст содержит только русские буквы
-        if not re.match(r'^[А-Яа-яЁё\s\-]+$', text):
-            return False
-        
-        # Исключаем общие слова
-        exclude_words = ['имя', 'имена', 'список', 'категория', 'страница', 'википедия']
-        if any(word in text.lower() for word in exclude_words):
-            return False
-        
-        return True
-    
-    def is_male_name(self, name: str, element) -> bool:
-        """Определяет, является ли имя мужским"""
-        # Простые правила определения пола по окончаниям
-        male_endings = ['ов', 'ев', 'ин', 'ский', 'цкий', 'ич', 'он', 'ен']
-        
-        # Проверяем контекст вокруг элемента
-        context = str(element.parent) if element.parent else ""
-        
-        male_indicators = ['мужск', 'мальчик', 'папа', 'сын', 'брат', 'муж']
-        female_indicators = ['женск', 'девочка', 'мама', 'дочь', 'сестра', 'жена']
-        
-        if any(indicator in context.lower() for indicator in male_indicators):
-            return True
-        if any(indicator in context.lower() for indicator in female_indicators):
-            return False
-        
-        # Проверяем окончания
-        for ending in male_endings:
-            if name.lower().endswith(ending):
-                return True
-        
-        return False
-    
-    def is_female_name(self, name: str, element) -> bool:
-        """Определяет, является ли имя женским"""
-        # Простые правила определения пола по окончаниям
-        female_endings = ['а', 'я', 'ова', 'ева', 'ина', 'ская', 'цкая']
-        
-        # Проверяем контекст вокруг элемента
-        context = str(element.parent) if element.parent else ""
-        
-        female_indicators = ['женск', 'девочка', 'мама', 'дочь', 'сестра', 'жена']
-        male_indicators = ['мужск', 'мальчик', 'папа', 'сын', 'брат', 'муж']
-        
-        if any(indicator in context.lower() for indicator in female_indicators):
-            return True
-        if any(indicator in context.lower() for indicator in male_indicators):
-            return False
-        
-        # Проверяем окончания
-        for ending in female_endings:
-            if name.lower().endswith(ending):
-                return True
-        
-        return False
+        return is_name_like_text(text)
     
     def extract_names_from_text(self, text: str) -> List[str]:
         """Извлекает потенциальные имена из текста"""
-        # Разбиваем текст на слова
-        words = re.findall(r'[А-Яа-яЁё]+', text)
-        
-        names = []
-        for word in words:
-            if self.is_russian_name(word):
-                names.append(word)
-        
-        return names
-    
-    def clean_and_validate_names(self, names: List[str]) -> List[str]:
-        """Очищает и валидирует список имен"""
-        cleaned = []
-        
-        for name in names:
-            # Очищаем от лишних символов
-            name = re.sub(r'[^\w\-]', '', name.strip())
-            
-            # Проверяем длину и содержание
-            if 2 <= len(name) <= 20 and re.match(r'^[А-Яа-яЁё]+$', name):
-                # Приводим к правильному регистру
-                name = name.capitalize()
-                cleaned.append(name)
-        
-        # Удаляем дубликаты и сортируем
-        return sorted(list(set(cleaned)))
+        return [word for word in find_russian_words(text) if is_name_like_text(word)]
     
-    def save_to_json(self, data: dict, filename: str):
-        """Сохраняет данные в JSON файл"""
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-        print(f"💾 Данные сохранены в {filename}")
+    def clean_and_validate_names(self, names: Iterable[str]) -> Stream:
+        """Очищает и валидирует имена"""
+        # Удаляем дубликаты и варианты написания (Пётр/Петр) и сортируем
+        cleaned, merged = collapse_store(self.word_store(clean_names(map(to_nfc, names))))
+        print(f"🔤 Объединено вариантов написания имен: {merged}")
+        return Stream(cleaned.__iter__, len(cleaned))
     
     def run(self):
         """Запускает полный процесс парсинга"""
         print("🚀 Запуск парсера русских имен...")
         
-        # Парсим из разных источников
-        wikipedia_data = self.parse_wikipedia_names()
-        open_sources_data = self.parse_open_sources()
+        collected = self.collect_sources()
         
         # Объединяем данные
-        all_male_names = set(wikipedia_data['male'] + open_sources_data['male'])
-        all_female_names = set(wikipedia_data['female'] + open_sources_data['female'])
+        all_male_names = collected.pop('male', [])
+        all_female_names = collected.pop('female', [])
         
         # Очищаем и валидируем
-        cleaned_male = self.clean_and_validate_names(list(all_male_names))
-        cleaned_female = self.clean_and_validate_names(list(all_female_names))
+        cleaned_male = self.clean_and_validate_names(all_male_names)
+        cleaned_female = self.clean_and_validate_names(all_female_names)
         
         # Формируем итоговые данные
         result = {
@@ -243,6 +124,7 @@ class RussianNamesParser:
         
         # Сохраняем результат
         self.save_to_json(result, '../src/data/parsed_names.json')
+        self.save_shards('../src/data/parsed_names', {'male': cleaned_male, 'female': cleaned_female})
         
         print(f"✅ Парсинг завершен!")
         print(f"📊 Найдено мужских имен: {len(cleaned_male)}")
@@ -250,5 +132,17 @@ class RussianNamesParser:
         print(f"📊 Всего имен: {len(cleaned_male) + len(cleaned_female)}")
 
 if __name__ == "__main__":
-    parser = RussianNamesParser()
-    parser.run()
+    args = build_arg_parser(__doc__).parse_args()
+    parser = RussianNamesParser(
+        fetcher=create_fetcher(args, RussianNamesParser.USER_AGENT),
+        checkpoint=create_checkpoint(args, RussianNamesParser.NAME),
+        parse_pool=create_parse_pool(args),
+        writer=create_writer(args),
+        category_api=args.mediawiki_api,
+        word_store=create_word_store(args)
+    )
+    try:
+        parser.run()
+    finally:
+        parser.close()
+        export_metrics(args, RussianNamesParser.NAME)
@@ -4,163 +4,90 @@
 Собирает качественные цитаты с citaty.info и других открытых источников
 """
 
-import requests
-from bs4 import BeautifulSoup
-import json
 import re
 import time
 from typing import List, Dict
-from urllib.parse import urljoin, urlparse
 
-class QuotesParser:
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
+from cli import (build_arg_parser, create_checkpoint, create_fetcher, create_parse_pool, create_writer,
+                 export_metrics)
+from crawler import SourceParser
+from dedup import remove_near_duplicates
+from html_parsing import (MW_TITLE_AND_CONTENT, QUOTE_AUTHOR_CLASS, QUOTE_CLASS, QUOTE_CONTAINERS, QUOTE_WRAPPER_CLASS,
+                          class_strainer, make_soup)
+from validation import is_valid_quote, record_rejects
+
+class QuotesParser(SourceParser):
+    NAME = 'parse_quotes'
+    USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         
-    def parse_citaty_info(self) -> List[Dict]:
-        """Парсинг цитат с citaty.info"""
-        print("🔍 Парсинг цитат с citaty.info...")
+    def extract_citaty_info_quotes(self, response) -> Dict[str, List[Dict]]:
+        """Извлекает цитаты со страницы citaty.info"""
+        response.raise_for_status()
         
         quotes = []
-        base_url = "https://citaty.info"
+        soup = make_soup(response.content, QUOTE_CONTAINERS)
         
-        # Страницы с цитатами
-        pages = [
-            "/random",
-            "/category/motivatsiya",
-            "/category/uspekh",
-            "/category/zhizn",
-            "/category/mudrost",
-            "/category/lyubov"
-        ]
+        # Ищем цитаты в различных элементах
+        quote_elements = soup.find_all(['div', 'blockquote', 'p'], class_=QUOTE_CLASS)
         
-        for page in pages:
-            try:
-                url = urljoin(base_url, page)
-                print(f"📄 Обрабатываю: {url}")
-                
-                response = self.session.get(url, timeout=10)
-                response.raise_for_status()
-                
-                soup = BeautifulSoup(response.content, 'html.parser')
-                
-                # Ищем цитаты в различных элементах
-                quote_elements = soup.find_all(['div', 'blockquote', 'p'], class_=re.compile(r'quote|text|content'))
-                
-                for element in quote_elements:
-                    quote_data = self.extract_quote_from_element(element)
-                    if quote_data:
-                        quotes.append(quote_data)
-                
-                time.sleep(2)  # Вежливая задержка
-                
-            except Exception as e:
-                print(f"❌ Ошибка при парсинге {url}: {e}")
-                continue
+        for element in quote_elements:
+            quote_data = self.extract_quote_from_element(element)
+            if quote_data:
+                quotes.append(quote_data)
         
-        return quotes
+        return {'quotes': quotes}
     
-    def parse_wikiquote(self) -> List[Dict]:
-        """Парсинг цитат с Викицитатника"""
-        print("🔍 Парсинг цитат с Викицитатника...")
+    def extract_wikiquote_quotes(self, response) -> Dict[str, List[Dict]]:
+        """Извлекает цитаты со страницы Викицитатника"""
+        response.raise_for_status()
         
         quotes = []
+        soup = make_soup(response.content, MW_TITLE_AND_CONTENT)
+        
+        # Извлекаем имя автора из заголовка
+        author = self.extract_author_from_wikiquote(soup)
         
-        # Страницы с известными цитатами
-        pages = [
-            "https://ru.wikiquote.org/wiki/Альберт_Эйнштейн",
-            "https://ru.wikiquote.org/wiki/Стив_Джобс",
-            "https://ru.wikiquote.org/wiki/Уинстон_Черчилль",
-            "https://ru.wikiquote.org/wiki/Лев_Толстой",
-            "https://ru.wikiquote.org/wiki/Антон_Чехов"
-        ]
+        # Ищем цитаты
+        quote_elements = soup.find_all(['li', 'p'], string=re.compile(r'[А-Яа-яЁё].*'))
         
-        for url in pages:
-            try:
-                print(f"📄 Обрабатываю: {url}")
-                
-                response = self.session.get(url, timeout=10)
-                response.raise_for_status()
-                
-                soup = BeautifulSoup(response.content, 'html.parser')
-                
-                # Извлекаем имя автора из заголовка
-                author = self.extract_author_from_wikiquote(soup)
-                
-                # Ищем цитаты
-                quote_elements = soup.find_all(['li', 'p'], string=re.compile(r'[А-Яа-яЁё].*'))
-                
-                for element in quote_elements:
-                    text = element.get_text().strip()
-                    
-                    if self.is_valid_quote(text):
-                        quotes.append({
-                            'text': text,
-                            'author': author,
-                            'source': 'Викицитатник'
-                        })
-                
-                time.sleep(2)  # Вежливая задержка
-                
-            except Exception as e:
-                print(f"❌ Ошибка при парсинге {url}: {e}")
-                continue
+        for element in quote_elements:
+            text = element.get_text().strip()
+            
+            if self.is_valid_quote(text):
+                quotes.append({
+                    'text': text,
+                    'author': author,
+                    'source': 'Викицитатник'
+                })
         
-        return quotes
+        return {'quotes': quotes}
     
-    def parse_open_sources(self) -> List[Dict]:
-        """Парсинг из других открытых источников"""
-        print("🔍 Парсинг из открытых источников...")
+    def extract_open_source_quotes(self, response, quote_selector: str, author_selector: str) -> Dict[str, List[Dict]]:
+        """Извлекает цитаты со страницы по CSS-селекторам источника"""
+        response.raise_for_status()
         
         quotes = []
-        
-        # Открытые источники с цитатами
-        sources = [
-            {
-                'url': 'https://ru.citaty.net/random',
-                'selectors': {
-                    'quote': '.quote-text',
-                    'author': '.quote-author'
-                }
-            }
-        ]
-        
-        for source in sources:
-            try:
-                print(f"📄 Обрабатываю: {source['url']}")
-                
-                response = self.session.get(source['url'], timeout=10)
-                response.raise_for_status()
-                
-                soup = BeautifulSoup(response.content, 'html.parser')
-                
-                # Ищем цитаты по селекторам
-                quote_elements = soup.select(source['selectors']['quote'])
-                author_elements = soup.select(source['selectors']['author'])
-                
-                for i, quote_elem in enumerate(quote_elements):
-                    text = quote_elem.get_text().strip()
-                    
-                    author = "Неизвестный автор"
-                    if i < len(author_elements):
-                        author = author_elements[i].get_text().strip()
-                    
-                    if self.is_valid_quote(text):
-                        quotes.append({
-                            'text': text,
-                            'author': author,
-                            'source': 'Открытые источники'
-                        })
-                
-                time.sleep(2)  # Вежливая задержка
-                
-            except Exception as e:
-                print(f"❌ Ошибка при парсинге {source['url']}: {e}")
-                continue
-        
-        return quotes
+        soup = make_soup(response.content, class_strainer(quote_selector, author_selector))
+        
+        # Ищем цитаты по селекторам
+        quote_elements = soup.select(quote_selector)
+        author_elements = soup.select(author_selector)
+        
+        for i, quote_elem in enumerate(quote_elements):
+            text = quote_elem.get_text().strip()
+            
+            author = "Неизвестный автор"
+            if i < len(author_elements):
+                author = author_elements[i].get_text().strip()
+            
+            if self.is_valid_quote(text):
+                quotes.append({
+                    'text': text,
+                    'author': author,
+                    'source': 'Открытые источники'
+                })
+        
+        return {'quotes': quotes}
     
     def extract_quote_from_element(self, element) -> Dict:
         """Извлекает цитату из HTML элемента"""
@@ -180,20 +107,21 @@ class QuotesParser:
     
     def extract_author_from_element(self, element) -> str:
         """Извлекает автора из HTML элемента"""
-        # Ищем автора в атрибутах или соседних элементах
-        author_selectors = ['.author', '.quote-author', '[class*="author"]']
-        
-        for selector in author_selectors:
-            author_elem = element.find(class_=re.compile(r'author'))
-            if author_elem:
-                return author_elem.get_text().strip()
-        
-        # Ищем автора в родительском элементе
-        parent = element.parent
-        if parent:
-            author_elem = parent.find(class_=re.compile(r'author'))
-            if author_elem:
-                return author_elem.get_text().strip()
+        # Автор в самом элементе
+        author_elem = element.find(class_=QUOTE_AUTHOR_CLASS)
+        if author_elem:
+            return author_elem.get_text().strip()
+        
+        # Автор в обертке цитаты или сразу после нее. Выше обертки не
+        # поднимаемся: там авторы всех цитат страницы
+        container = element.find_parent(class_=QUOTE_WRAPPER_CLASS) or element
+        author_elem = container.find(class_=QUOTE_AUTHOR_CLASS)
+        if author_elem is None:
+            sibling = container.find_next_sibling()
+            if sibling is not None and QUOTE_AUTHOR_CLASS.search(' '.join(sibling.get('class', []))):
+                author_elem = sibling
+        if author_elem:
+            return author_elem.get_text().strip()
         
         return "Неизвестный автор"
     
@@ -206,25 +134,7 @@ class QuotesParser:
     
     def is_valid_quote(self, text: str) -> bool:
         """Проверяет, является ли текст валидной цитатой"""
-        if not text or len(text) < 10 or len(text) > 500:
-            return False
-        
-        # Проверяем, что текст содержит русские буквы
-        if not re.search(r'[А-Яа-яЁё]', text):
-            return False
-        
-        # Исключаем технические тексты
-        exclude_patterns = [
-            r'^\d+$',  # Только цифры
-            r'^[А-Яа-яЁё\s]*$',  # Только русские буквы и пробелы (слишком просто)
-            r'категория|страница|вики|ссылка',  # Технические слова
-        ]
-        
-        for pattern in exclude_patterns:
-            if re.search(pattern, text.lower()):
-                return False
-        
-        return True
+        return is_valid_quote(text)
     
     def clean_quote(self, quote: Dict) -> Dict:
         """Очищает цитату от лишних символов"""
@@ -247,35 +157,19 @@ class QuotesParser:
         }
     
     def remove_duplicates(self, quotes: List[Dict]) -> List[Dict]:
-        """Удаляет дубликаты цитат"""
-        seen_texts = set()
-        unique_quotes = []
-        
-        for quote in quotes:
-            text_lower = quote['text'].lower()
-            if text_lower not in seen_texts:
-                seen_texts.add(text_lower)
-                unique_quotes.append(quote)
-        
+        """Удаляет дубликаты цитат, включая почти одинаковые с разных сайтов"""
+        unique_quotes = remove_near_duplicates(quotes)
+        print(f"🧹 Удалено дубликатов: {len(quotes) - len(unique_quotes)}")
         return unique_quotes
     
-    def save_to_json(self, data: List[Dict], filename: str):
-        """Сохраняет данные в JSON файл"""
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-        print(f"💾 Данные сохранены в {filename}")
-    
     def run(self):
         """Запускает полный процесс парсинга"""
         print("🚀 Запуск парсера цитат...")
         
-        # Парсим из разных источников
-        citaty_quotes = self.parse_citaty_info()
-        wikiquote_quotes = self.parse_wikiquote()
-        open_sources_quotes = self.parse_open_sources()
+        collected = self.collect_sources()
         
-        # Объединяем все цитаты
-        all_quotes = citaty_quotes + wikiquote_quotes + open_sources_quotes
+        # Объединяем все цитаты (в порядке источников в реестре)
+        all_quotes = list(collected.get('quotes', []))
         
         # Очищаем и валидируем
         cleaned_quotes = []
@@ -283,6 +177,7 @@ class QuotesParser:
             cleaned = self.clean_quote(quote)
             if self.is_valid_quote(cleaned['text']):
                 cleaned_quotes.append(cleaned)
+        record_rejects('quote', len(all_quotes), len(cleaned_quotes))
         
         # Удаляем дубликаты
         unique_quotes = self.remove_duplicates(cleaned_quotes)
@@ -306,5 +201,16 @@ class QuotesParser:
         print(f"📊 Найдено цитат: {len(unique_quotes)}")
 
 if __name__ == "__main__":
-    parser = QuotesParser()
-    parser.run()
+    args = build_arg_parser(__doc__).parse_args()
+    parser = QuotesParser(
+        fetcher=create_fetcher(args, QuotesParser.USER_AGENT),
+        checkpoint=create_checkpoint(args, QuotesParser.NAME),
+        parse_pool=create_parse_pool(args),
+        writer=create_writer(args),
+        category_api=args.mediawiki_api
+    )
+    try:
+        parser.run()
+    finally:
+        parser.close()
+        export_metrics(args, QuotesParser.NAME)
@@ -4,96 +4,64 @@
 Собирает качественные слова из открытых словарей и корпусов
 """
 
-import requests
-from bs4 import BeautifulSoup
-import json
 import re
 import time
-from typing import List, Set, Dict
+from itertools import chain
+from typing import List, Set, Dict, Iterable
 
-class RussianWordsParser:
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
+from cli import (build_arg_parser, create_checkpoint, create_fetcher, create_parse_pool, create_word_store,
+                 create_writer, export_metrics)
+from categorizer import load_categorizer
+from crawler import SourceParser
+from html_parsing import MW_CONTENT, WIKI_WORD_HREF, WIKI_WORD_LINKS, make_soup
+from json_stream import Stream
+from normalization import collapse_store, to_nfc
+from validation import WIKI_STOPWORDS, WordValidator
+
+WORD_VALIDATOR = WordValidator(max_length=20, stopwords=WIKI_STOPWORDS)
+
+
+class RussianWordsParser(SourceParser):
+    NAME = 'parse_words'
+    USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         
-    def parse_wiktionary(self) -> List[str]:
-        """Парсинг слов из Викисловаря"""
-        print("🔍 Парсинг слов из Викисловаря...")
+    def extract_wiktionary_words(self, response) -> Dict[str, List[str]]:
+        """Извлекает слова со страницы категории Викисловаря"""
+        response.raise_for_status()
         
         words = set()
+        soup = make_soup(response.content, WIKI_WORD_LINKS)
         
-        # Категории слов в Викисловаре
-        categories = [
-            "https://ru.wiktionary.org/wiki/Категория:Существительные_русского_языка",
-            "https://ru.wiktionary.org/wiki/Категория:Прилагательные_русского_языка",
-            "https://ru.wiktionary.org/wiki/Категория:Глаголы_русского_языка"
-        ]
+        # Ищем ссылки на слова
+        word_links = soup.find_all('a', href=WIKI_WORD_HREF)
         
-        for category_url in categories:
-            try:
-                print(f"📄 Обрабатываю: {category_url}")
-                
-                response = self.session.get(category_url, timeout=10)
-                response.raise_for_status()
-                
-                soup = BeautifulSoup(response.content, 'html.parser')
-                
-                # Ищем ссылки на слова
-                word_links = soup.find_all('a', href=re.compile(r'/wiki/[А-Яа-яЁё]'))
-                
-                for link in word_links:
-                    word = link.get_text().strip()
-                    if self.is_valid_word(word):
-                        words.add(word)
-                
-                time.sleep(2)  # Вежливая задержка
-                
-            except Exception as e:
-                print(f"❌ Ошибка при парсинге {category_url}: {e}")
-                continue
+        for link in word_links:
+            word = link.get_text().strip()
+            if self.is_valid_word(word):
+                words.add(word)
         
-        return list(words)
+        return {'words': sorted(words)}
+    
+    def extract_wiktionary_titles(self, category_url: str, titles: List[str]) -> Dict[str, List[str]]:
+        """Слова из заголовков статей категории Викисловаря (режим MediaWiki API)"""
+        return {'words': sorted({title for title in titles if self.is_valid_word(title)})}
     
-    def parse_open_sources(self) -> List[str]:
-        """Парсинг из других открытых источников"""
-        print("🔍 Парсинг из открытых источников...")
+    def extract_open_source_words(self, response) -> Dict[str, List[str]]:
+        """Извлекает слова со страницы открытого источника"""
+        response.raise_for_status()
         
         words = set()
+        soup = make_soup(response.content, MW_CONTENT)
         
-        # Открытые источники со словами
-        sources = [
-            {
-                'url': 'https://ru.wiktionary.org/wiki/Служебная:Все_страницы',
-                'type': 'wiktionary_pages'
-            }
-        ]
+        # Ищем слова в различных элементах
+        word_elements = soup.find_all(['a', 'span', 'div'], string=re.compile(r'^[А-Яа-яЁё]+$'))
         
-        for source in sources:
-            try:
-                print(f"📄 Обрабатываю: {source['url']}")
-                
-                response = self.session.get(source['url'], timeout=10)
-                response.raise_for_status()
-                
-                soup = BeautifulSoup(response.content, 'html.parser')
-                
-                # Ищем слова в различных элементах
-                word_elements = soup.find_all(['a', 'span', 'div'], string=re.compile(r'^[А-Яа-яЁё]+$'))
-                
-                for element in word_elements:
-                    word = element.get_text().strip()
-                    if self.is_valid_word(word):
-                        words.add(word)
-                
-                time.sleep(2)  # Вежливая задержка
-                
-            except Exception as e:
-                print(f"❌ Ошибка при парсинге {source['url']}: {e}")
-                continue
+        for element in word_elements:
+            word = element.get_text().strip()
+            if self.is_valid_word(word):
+                words.add(word)
         
-        return list(words)
+        return {'words': sorted(words)}
     
     def parse_common_words(self) -> List[str]:
         """Добавляет часто используемые русские слова"""
@@ -171,23 +139,7 @@ class RussianWordsParser:
     
     def is_valid_word(self, word: str) -> bool:
         """Проверяет, является ли слово валидным русским словом"""
-        if not word or len(word) < 2 or len(word) > 20:
-            return False
-        
-        # Проверяем, что слово содержит только русские буквы
-        if not re.match(r'^[А-Яа-яЁё]+$', word):
-            return False
-        
-        # Исключаем технические слова
-        exclude_words = [
-            'категория', 'страница', 'вики', 'ссылка', 'редактировать', 'обсуждение',
-            'история', 'создать', 'поиск', 'навигация', 'меню', 'заголовок'
-        ]
-        
-        if word.lower() in exclude_words:
-            return False
-        
-        return True
+        return WORD_VALIDATOR.is_valid(word)
     
     def clean_word(self, word: str) -> str:
         """Очищает слово от лишних символов"""
@@ -199,95 +151,27 @@ class RussianWordsParser:
         
         return word
     
-    def categorize_words(self, words: List[str]) -> Dict[str, List[str]]:
-        """Категоризирует слова по типам"""
-        categories = {
-            'nature': [],      # Природа
-            'animals': [],     # Животные
-            'people': [],      # Люди
-            'professions': [], # Профессии
-            'home': [],        # Дом и быт
-            'food': [],        # Еда
-            'clothing': [],    # Одежда
-            'transport': [],   # Транспорт
-            'city': [],        # Город
-            'time': [],        # Время
-            'colors': [],      # Цвета
-            'qualities': [],   # Качества
-            'other': []        # Прочее
-        }
-        
-        # Простые правила категоризации
-        nature_words = ['солнце', 'луна', 'звезда', 'небо', 'дождь', 'снег', 'ветер', 'река', 'море', 'гора', 'лес', 'дерево', 'цветок']
-        animal_words = ['собака', 'кошка', 'лошадь', 'корова', 'птица', 'рыба', 'волк', 'медведь', 'лиса', 'заяц']
-        people_words = ['человек', 'мужчина', 'женщина', 'ребёнок', 'мать', 'отец', 'сын', 'дочь', 'брат', 'сестра']
-        profession_words = ['учитель', 'врач', 'повар', 'водитель', 'строитель', 'художник', 'писатель', 'музыкант']
-        home_words = ['дом', 'квартира', 'комната', 'кухня', 'окно', 'дверь', 'стол', 'стул', 'кровать', 'шкаф']
-        food_words = ['хлеб', 'мясо', 'рыба', 'молоко', 'сыр', 'яйцо', 'картофель', 'яблоко', 'чай', 'кофе']
-        clothing_words = ['рубашка', 'платье', 'брюки', 'пиджак', 'шапка', 'обувь', 'туфли', 'сапоги']
-        transport_words = ['машина', 'автобус', 'поезд', 'самолёт', 'корабль', 'велосипед', 'мотоцикл']
-        city_words = ['улица', 'дорога', 'площадь', 'парк', 'магазин', 'ресторан', 'больница', 'школа']
-        time_words = ['время', 'час', 'день', 'неделя', 'месяц', 'год', 'утро', 'вечер', 'ночь']
-        color_words = ['красный', 'синий', 'зелёный', 'жёлтый', 'чёрный', 'белый', 'серый']
-        quality_words = ['большой', 'маленький', 'хороший', 'плохой', 'красивый', 'новый', 'старый']
-        
-        for word in words:
-            if word in nature_words:
-                categories['nature'].append(word)
-            elif word in animal_words:
-                categories['animals'].append(word)
-            elif word in people_words:
-                categories['people'].append(word)
-            elif word in profession_words:
-                categories['professions'].append(word)
-            elif word in home_words:
-                categories['home'].append(word)
-            elif word in food_words:
-                categories['food'].append(word)
-            elif word in clothing_words:
-                categories['clothing'].append(word)
-            elif word in transport_words:
-                categories['transport'].append(word)
-            elif word in city_words:
-                categories['city'].append(word)
-            elif word in time_words:
-                categories['time'].append(word)
-            elif word in color_words:
-                categories['colors'].append(word)
-            elif word in quality_words:
-                categories['qualities'].append(word)
-            else:
-                categories['other'].append(word)
-        
-        return categories
-    
-    def save_to_json(self, data: Dict, filename: str):
-        """Сохраняет данные в JSON файл"""
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-        print(f"💾 Данные сохранены в {filename}")
+    def categorize_words(self, words: Iterable[str]) -> Dict[str, Stream]:
+        """Категоризирует слова по типам (категории - потоки по words)"""
+        return load_categorizer('basic').categorize_stream(words)
     
     def run(self):
         """Запускает полный процесс парсинга"""
         print("🚀 Запуск парсера русских слов...")
         
-        # Парсим из разных источников
-        wiktionary_words = self.parse_wiktionary()
-        open_sources_words = self.parse_open_sources()
+        collected = self.collect_sources()
         common_words = self.parse_common_words()
         
-        # Объединяем все слова
-        all_words = set(wiktionary_words + open_sources_words + common_words)
-        
         # Очищаем и валидируем
-        cleaned_words = []
-        for word in all_words:
-            cleaned = self.clean_word(word)
-            if self.is_valid_word(cleaned):
-                cleaned_words.append(cleaned)
+        all_words = chain(collected.pop('words', []), common_words)
+        cleaned_words = self.word_store(WORD_VALIDATOR.filter(self.clean_word(to_nfc(word)) for word in all_words))
+        
+        # Удаляем дубликаты и варианты написания (лёд/лед) и сортируем
+        unique_store, merged = collapse_store(cleaned_words)
+        del cleaned_words
+        print(f"🔤 Объединено вариантов написания: {merged}")
         
-        # Удаляем дубликаты и сортируем
-        unique_words = sorted(list(set(cleaned_words)))
+        unique_words = Stream(unique_store.__iter__, len(unique_store))
         
         # Категоризируем слова
         categorized_words = self.categorize_words(unique_words)
@@ -307,11 +191,24 @@ class RussianWordsParser:
         
         # Сохраняем результат
         self.save_to_json(result, '../src/data/parsed_words.json')
+        self.save_shards('../src/data/parsed_words', {'all': unique_words, **categorized_words})
         
         print(f"✅ Парсинг завершен!")
         print(f"📊 Найдено слов: {len(unique_words)}")
         print(f"📊 Категорий: {len(categorized_words)}")
 
 if __name__ == "__main__":
-    parser = RussianWordsParser()
-    parser.run()
+    args = build_arg_parser(__doc__).parse_args()
+    parser = RussianWordsParser(
+        fetcher=create_fetcher(args, RussianWordsParser.USER_AGENT),
+        checkpoint=create_checkpoint(args, RussianWordsParser.NAME),
+        parse_pool=create_parse_pool(args),
+        writer=create_writer(args),
+        category_api=args.mediawiki_api,
+        word_store=create_word_store(args)
+    )
+    try:
+        parser.run()
+    finally:
+        parser.close()
+        export_metrics(args, RussianWordsParser.NAME)
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Параллельный запуск парсеров
+Каждый парсер работает в отдельном процессе, его вывод транслируется
+построчно с префиксом, а в конце печатается сводка по времени и статусу
+"""
+
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+
+class ParserRunResult:
+    """Итог работы одного парсера"""
+
+    def __init__(self, script_name: str, description: str, returncode: int, duration: float,
+                 error: Optional[str] = None):
+        self.script_name = script_name
+        self.description = description
+        self.returncode = returncode
+        self.duration = duration
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        return self.returncode == 0
+
+
+class ParserRunner:
+    """Запускает независимые парсеры одновременно в пуле процессов"""
+
+    def __init__(self, extra_args: Optional[List[str]] = None, max_workers: Optional[int] = None):
+        self.extra_args = extra_args or []
+        self.max_workers = max_workers
+        self._print_lock = threading.Lock()
+
+    def _log(self, prefix: str, line: str):
+        with self._print_lock:
+            print(f"[{prefix}] {line}", flush=True)
+
+    def run_one(self, script_name: str, description: str) -> ParserRunResult:
+        """Запускает парсер и транслирует его вывод по мере появления"""
+        prefix = os.path.splitext(script_name)[0]
+        started = time.monotonic()
+
+        if not os.path.exists(script_name):
+            self._log(prefix, f"❌ Файл {script_name} не найден")
+            return ParserRunResult(script_name, description, 1, 0.0, 'файл не найден')
+
+        self._log(prefix, f"🚀 {description}")
+        env = dict(os.environ, PYTHONUNBUFFERED='1', PYTHONIOENCODING='utf-8')
+        try:
+            process = subprocess.Popen(
+                [sys.executable, script_name] + self.extra_args,
+                stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                text=True, encoding='utf-8', errors='replace', env=env
+            )
+            for line in process.stdout:
+                self._log(prefix, line.rstrip('\n'))
+            returncode = process.wait()
+        except Exception as e:
+            self._log(prefix, f"❌ Ошибка при запуске {script_name}: {e}")
+            return ParserRunResult(script_name, description, 1, time.monotonic() - started, str(e))
+
+        duration = time.monotonic() - started
+        status = "УСПЕШНО" if returncode == 0 else f"ОШИБКА (код {returncode})"
+        self._log(prefix, f"{'✅' if returncode == 0 else '❌'} {description} - {status} за {duration:.2f} с")
+        return ParserRunResult(script_name, description, returncode, duration)
+
+    def run_all(self, parsers: List[Tuple[str, str]]) -> List[ParserRunResult]:
+        """Запускает все парсеры одновременно, результаты в исходном порядке"""
+        workers = self.max_workers or len(parsers) or 1
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(self.run_one, script, description) for script, description in parsers]
+            return [future.result() for future in futures]
+
+
+def print_summary(results: List[ParserRunResult], width: int = 60):
+    """Печатает сводку: время и статус каждого парсера"""
+    print(f"\n{'='*width}")
+    print("📋 СВОДКА ПО ПАРСЕРАМ:")
+    for result in results:
+        mark = '✅' if result.ok else '❌'
+        details = f"код {result.returncode}" if result.error is None else result.error
+        print(f"{mark} {result.script_name:<28} {result.duration:8.2f} с  ({details})")
+    print(f"{'='*width}")
+
+
+def exit_code(results: List[ParserRunResult]) -> int:
+    """Ненулевой код, если хотя бы один парсер завершился с ошибкой"""
+    return 0 if all(result.ok for result in results) else 1
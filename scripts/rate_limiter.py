@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Ограничитель частоты запросов по хостам (token bucket)
+Заменяет фиксированные вежливые задержки: ждем только тогда, когда
+к тому же хосту действительно нужно сделать следующий запрос
+"""
+
+import asyncio
+import threading
+import time
+from datetime import timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional, Tuple
+
+# Лимиты по умолчанию: (запросов в секунду, размер пачки)
+DEFAULT_HOST_LIMITS = {
+    'ru.wikipedia.org': (2.0, 4),
+    'ru.wiktionary.org': (2.0, 4),
+    'ru.wikiquote.org': (2.0, 4),
+    'raw.githubusercontent.com': (5.0, 5),
+}
+
+
+class TokenBucket:
+    """Потокобезопасное ведро токенов с резервированием"""
+
+    def __init__(self, rate: float, burst: int):
+        if rate <= 0 or burst < 1:
+            raise ValueError("rate должен быть > 0, burst >= 1")
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        if now > self._last:
+            self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+
+    def reserve(self) -> float:
+        """Резервирует токен и возвращает, сколько секунд нужно подождать"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens -= 1
+            # _last может быть в будущем после defer()
+            delay = max(0.0, self._last - now)
+            if self._tokens < 0:
+                delay += -self._tokens / self.rate
+            return delay
+
+    def defer(self, seconds: float):
+        """Запрещает запросы на указанное время (Retry-After)"""
+        with self._lock:
+            resume_at = time.monotonic() + max(0.0, seconds)
+            if resume_at > self._last:
+                self._last = resume_at
+                self._tokens = min(self._tokens, 1.0)
+
+
+class HostRateLimiter:
+    """Набор ведер токенов, по одному на каждый хост"""
+
+    def __init__(self, default_rate: float = 1.0, default_burst: int = 2,
+                 host_limits: Optional[Dict[str, Tuple[float, int]]] = None):
+        self.default_rate = default_rate
+        self.default_burst = default_burst
+        self.host_limits = dict(DEFAULT_HOST_LIMITS if host_limits is None else host_limits)
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def set_limit(self, host: str, rate: float, burst: int):
+        """Задает лимит хоста; ведро пересоздается при следующем обращении"""
+        with self._lock:
+            self.host_limits[host] = (rate, burst)
+            self._buckets.pop(host, None)
+
+    def bucket(self, host: str) -> TokenBucket:
+        """Ведро токенов для хоста (создается при первом обращении)"""
+        with self._lock:
+            if host not in self._buckets:
+                rate, burst = self.host_limits.get(host, (self.default_rate, self.default_burst))
+                self._buckets[host] = TokenBucket(rate, burst)
+            return self._buckets[host]
+
+    def acquire(self, host: str):
+        """Блокирующее получение токена"""
+        delay = self.bucket(host).reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self, host: str):
+        """Получение токена внутри цикла событий"""
+        delay = self.bucket(host).reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def defer(self, host: str, seconds: float):
+        """Приостанавливает запросы к хосту (ответ 429/503 с Retry-After)"""
+        self.bucket(host).defer(seconds)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Разбирает Retry-After: число секунд или HTTP-дата"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        # Дата с зоной -0000 или без зоны разбирается без tzinfo; в HTTP это всегда UTC
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, retry_at.timestamp() - time.time())
@@ -6,31 +6,11 @@
 
 import os
 import sys
-import subprocess
 import time
 from datetime import datetime
 
-def run_parser(script_name: str, description: str):
-    """Запускает парсер и обрабатывает результат"""
-    print(f"\n{'='*70}")
-    print(f"🚀 {description}")
-    print(f"{'='*70}")
-    
-    try:
-        # Запускаем скрипт
-        result = subprocess.run([sys.executable, script_name], 
-                              capture_output=True, text=True, encoding='utf-8')
-        
-        if result.returncode == 0:
-            print(f"✅ {description} - УСПЕШНО")
-            print(result.stdout)
-        else:
-            print(f"❌ {description} - ОШИБКА")
-            print(f"STDOUT: {result.stdout}")
-            print(f"STDERR: {result.stderr}")
-            
-    except Exception as e:
-        print(f"❌ Ошибка при запуске {script_name}: {e}")
+from delta import format_summary, load_delta
+from parser_runner import ParserRunner, exit_code, print_summary
 
 def main():
     """Главная функция"""
@@ -43,7 +23,7 @@ def main():
     if not os.path.exists('scripts'):
         print("❌ Ошибка: папка 'scripts' не найдена")
         print("Запустите скрипт из корневой директории проекта")
-        return
+        return 1
     
     # Переходим в папку scripts
     os.chdir('scripts')
@@ -57,15 +37,12 @@ def main():
     
     start_time = time.time()
     
-    for script, description in parsers:
-        if os.path.exists(script):
-            run_parser(script, description)
-            time.sleep(1)  # Небольшая пауза между парсерами
-        else:
-            print(f"❌ Файл {script} не найден")
+    # Парсеры не делят состояние, поэтому работают одновременно
+    results = ParserRunner(extra_args=sys.argv[1:]).run_all(parsers)
     
     end_time = time.time()
     duration = end_time - start_time
+    print_summary(results, width=70)
     
     print(f"\n{'='*70}")
     print(f"🎉 УЛУЧШЕННЫЙ ПАРСИНГ ЗАВЕРШЕН!")
@@ -92,11 +69,28 @@ def main():
     
     print(f"\n📈 ОБЩИЙ РАЗМЕР ДАННЫХ: {total_size:,} байт")
     
+    # Изменения относительно прошлой сборки (*.delta.json пишут сами парсеры)
+    print("\n🔀 ИЗМЕНЕНИЯ ОТНОСИТЕЛЬНО ПРОШЛОЙ СБОРКИ:")
+    for file_path in result_files:
+        if not os.path.exists(file_path) or os.path.getmtime(file_path) < start_time:
+            print(f"➖ {file_path} - без изменений")
+            continue
+        delta = load_delta(file_path)
+        if delta is None:
+            print(f"🆕 {file_path} - первая сборка, сравнивать не с чем")
+            continue
+        summary = delta['summary']
+        print(f"🔄 {file_path} - +{summary['added']} -{summary['removed']} ({delta['from']} → {delta['to']})")
+        if delta['changes']:
+            print(format_summary(delta))
+    
     print("\n📝 СЛЕДУЮЩИЕ ШАГИ:")
     print("1. Проверьте собранные данные в папке src/data/")
-    print("2. Сравните с предыдущими результатами")
+    print("2. Просмотрите изменения в файлах *.delta.json")
     print("3. Интегрируйте лучшие данные в существующие файлы")
     print("4. Проверьте с юристом на предмет авторских прав")
+    
+    return exit_code(results)
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -10,27 +10,7 @@ import subprocess
 import time
 from datetime import datetime
 
-def run_parser(script_name: str, description: str):
-    """Запускает парсер и обрабатывает результат"""
-    print(f"\n{'='*60}")
-    print(f"🚀 {description}")
-    print(f"{'='*60}")
-    
-    try:
-        # Запускаем скрипт
-        result = subprocess.run([sys.executable, script_name], 
-                              capture_output=True, text=True, encoding='utf-8')
-        
-        if result.returncode == 0:
-            print(f"✅ {description} - УСПЕШНО")
-            print(result.stdout)
-        else:
-            print(f"❌ {description} - ОШИБКА")
-            print(f"STDOUT: {result.stdout}")
-            print(f"STDERR: {result.stderr}")
-            
-    except Exception as e:
-        print(f"❌ Ошибка при запуске {script_name}: {e}")
+from parser_runner import ParserRunner, exit_code, print_summary
 
 def create_requirements():
     """Создает файл requirements.txt"""
@@ -70,7 +50,7 @@ def main():
     if not os.path.exists('scripts'):
         print("❌ Ошибка: папка 'scripts' не найдена")
         print("Запустите скрипт из корневой директории проекта")
-        return
+        return 1
     
     # Переходим в папку scripts
     os.chdir('scripts')
@@ -81,7 +61,7 @@ def main():
     # Устанавливаем зависимости
     if not install_requirements():
         print("❌ Не удалось установить зависимости. Завершение работы.")
-        return
+        return 1
     
     # Запускаем парсеры
     parsers = [
@@ -92,15 +72,12 @@ def main():
     
     start_time = time.time()
     
-    for script, description in parsers:
-        if os.path.exists(script):
-            run_parser(script, description)
-            time.sleep(1)  # Небольшая пауза между парсерами
-        else:
-            print(f"❌ Файл {script} не найден")
+    # Парсеры не делят состояние, поэтому работают одновременно
+    results = ParserRunner(extra_args=sys.argv[1:]).run_all(parsers)
     
     end_time = time.time()
     duration = end_time - start_time
+    print_summary(results, width=60)
     
     print(f"\n{'='*60}")
     print(f"🎉 ПАРСИНГ ЗАВЕРШЕН!")
@@ -128,6 +105,8 @@ def main():
     print("2. При необходимости отредактируйте данные")
     print("3. Интегрируйте данные в существующие файлы")
     print("4. Проверьте с юристом на предмет авторских прав")
+    
+    return exit_code(results)
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
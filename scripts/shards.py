@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Шардированный вывод наборов для генераторов
+Каждый список (все слова, категория, имена одного пола) режется на части
+фиксированного размера. Манифест хранит число элементов каждого списка и
+каждой части, поэтому потребитель выбирает случайный индекс во всем наборе,
+загружает только часть с этим индексом и получает точно равномерную выборку
+"""
+
+import json
+import os
+import random
+from itertools import count, islice
+from typing import Dict, Iterable, Optional, Tuple
+
+from storage import write_if_changed
+
+MANIFEST_NAME = 'manifest.json'
+MANIFEST_VERSION = 1
+DEFAULT_SHARD_SIZE = 1000
+
+
+def _chunk_path(dataset: str, number: int) -> str:
+    return f'{dataset}/{number:04d}.json'
+
+
+def write_shards(directory: str, datasets: Dict[str, Iterable[str]],
+                 shard_size: int = DEFAULT_SHARD_SIZE) -> Tuple[Dict, int]:
+    """Пишет части всех списков и манифест; возвращает манифест и число измененных файлов
+
+    Списки (в том числе потоки) читаются по одной части. Части пишутся
+    атомарно и только если их содержимое изменилось. Части из прошлого
+    манифеста, которых больше нет, удаляются.
+    """
+    if shard_size <= 0:
+        raise ValueError("Размер части должен быть положительным")
+
+    previous = read_manifest(directory)
+    manifest = {'version': MANIFEST_VERSION, 'shardSize': shard_size, 'datasets': {}}
+    written = set()
+    changed = 0
+
+    for dataset, items in datasets.items():
+        chunks = []
+        start = 0
+        items = iter(items)
+        for number in count():
+            chunk = list(islice(items, shard_size))
+            if not chunk:
+                break
+            path = _chunk_path(dataset, number)
+            content = json.dumps(chunk, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+            changed += write_if_changed(os.path.join(directory, path), content)
+            chunks.append({'file': path, 'start': start, 'count': len(chunk)})
+            written.add(path)
+            start += len(chunk)
+        manifest['datasets'][dataset] = {'count': start, 'chunks': chunks}
+
+    content = json.dumps(manifest, ensure_ascii=False, indent=2).encode('utf-8')
+    changed += write_if_changed(os.path.join(directory, MANIFEST_NAME), content)
+
+    if previous is not None:
+        for dataset in previous['datasets'].values():
+            for chunk in dataset['chunks']:
+                if chunk['file'] not in written:
+                    stale = os.path.join(directory, chunk['file'])
+                    if os.path.exists(stale):
+                        os.remove(stale)
+                        changed += 1
+
+    return manifest, changed
+
+
+def read_manifest(directory: str) -> Optional[Dict]:
+    path = os.path.join(directory, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+class ShardedDataset:
+    """Чтение шардированного набора: случайный элемент с загрузкой одной части"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.manifest = read_manifest(directory)
+        if self.manifest is None:
+            raise FileNotFoundError(os.path.join(directory, MANIFEST_NAME))
+
+    def count(self, *datasets: str) -> int:
+        return sum(self.manifest['datasets'][dataset]['count'] for dataset in datasets)
+
+    def item(self, dataset: str, position: int) -> str:
+        """Элемент по индексу: части одного размера, поэтому номер части - деление"""
+        info = self.manifest['datasets'][dataset]
+        chunk = info['chunks'][position // self.manifest['shardSize']]
+        with open(os.path.join(self.directory, chunk['file']), encoding='utf-8') as f:
+            return json.load(f)[position - chunk['start']]
+
+    def sample(self, *datasets: str, rng: random.Random = random) -> str:
+        """Равномерно случайный элемент из объединения списков datasets"""
+        position = rng.randrange(self.count(*datasets))
+        for dataset in datasets:
+            size = self.manifest['datasets'][dataset]['count']
+            if position < size:
+                return self.item(dataset, position)
+            position -= size
+        raise IndexError(position)
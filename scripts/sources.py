@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Реестр источников данных
+Каждый источник описан декларативно в data/sources.json: список URL,
+функция извлечения (метод парсера или общий извлекатель по CSS-селектору),
+режим загрузки, таймаут и лимит частоты запросов, а для категорий
+MediaWiki - метод разбора заголовков из API (titles). Источники всех парсеров
+выполняет общий движок (SourceParser.crawl_sources), который ставит все
+URL в одно расписание, поэтому новый источник - это запись в файле, а не
+еще один последовательный цикл
+"""
+
+import json
+import os
+from functools import lru_cache, partial
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from html_parsing import make_soup
+
+DEFAULT_SOURCES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'sources.json')
+
+# Режимы загрузки: HTML/JSON-страницы целиком или большой текстовый файл построчно
+PAGES = 'pages'
+LINES = 'lines'
+MODES = (PAGES, LINES)
+
+# Общий извлекатель: тексты элементов по CSS-селектору
+SELECT = 'select'
+
+
+def select_text(response, selector: str, dataset: str) -> Dict[str, List[str]]:
+    """Тексты всех элементов страницы, подходящих под CSS-селектор"""
+    response.raise_for_status()
+    soup = make_soup(response.content)
+    texts = (element.get_text().strip() for element in soup.select(selector))
+    return {dataset: [text for text in texts if text]}
+
+
+class Source:
+    """Описание одного источника"""
+
+    def __init__(self, name: str, urls: List[str], extract: str, title: str = '', mode: str = PAGES,
+                 dataset: Optional[str] = None, options: Optional[Dict] = None, timeout: float = 10,
+                 rate_limit: Optional[Tuple[float, int]] = None, titles: Optional[str] = None):
+        if mode not in MODES:
+            raise ValueError(f"Неизвестный режим источника {name}: {mode}")
+        if mode == LINES and dataset is None:
+            raise ValueError(f"Построчному источнику {name} нужен dataset")
+        self.name = name
+        self.urls = list(urls)
+        self.extract = extract
+        self.title = title or name
+        self.mode = mode
+        self.dataset = dataset
+        self.options = dict(options or {})
+        self.timeout = timeout
+        self.rate_limit = tuple(rate_limit) if rate_limit else None
+        # Метод парсера для режима MediaWiki API: (URL категории, заголовки) -> {набор: [элементы]}
+        self.titles = titles
+
+    @classmethod
+    def from_config(cls, name: str, config: Dict) -> 'Source':
+        return cls(
+            name,
+            config['urls'],
+            config['extract'],
+            title=config.get('title', ''),
+            mode=config.get('mode', PAGES),
+            dataset=config.get('dataset'),
+            options=config.get('options'),
+            timeout=config.get('timeout', 10),
+            rate_limit=config.get('rateLimit'),
+            titles=config.get('titles'),
+        )
+
+    @property
+    def hosts(self) -> List[str]:
+        return sorted({urlparse(url).netloc for url in self.urls})
+
+    def extractor(self, parser) -> Callable:
+        """Функция извлечения для parser; сериализуется через pickle для воркеров разбора
+
+        В режиме pages она получает ответ и возвращает {набор: [элементы]},
+        в режиме lines - итератор строк и возвращает элементы набора dataset.
+        """
+        if self.extract == SELECT:
+            return partial(select_text, **self.options)
+        method = getattr(parser, self.extract)
+        return partial(method, **self.options) if self.options else method
+
+
+class SourceRegistry:
+    """Источники, сгруппированные по парсерам, в порядке объявления"""
+
+    def __init__(self, groups: Optional[Dict[str, Dict[str, Source]]] = None):
+        self.groups = {group: dict(sources) for group, sources in (groups or {}).items()}
+
+    @classmethod
+    def from_file(cls, path: str = DEFAULT_SOURCES_FILE) -> 'SourceRegistry':
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        return cls({
+            group: {name: Source.from_config(name, config) for name, config in sources.items()}
+            for group, sources in data['parsers'].items()
+        })
+
+    def register(self, group: str, source: Source):
+        """Добавляет или заменяет источник парсера group"""
+        self.groups.setdefault(group, {})[source.name] = source
+
+    def select(self, group: str, names: Optional[Iterable[str]] = None) -> List[Source]:
+        """Источники парсера по именам (все - если имена не заданы)"""
+        sources = self.groups.get(group, {})
+        if names is None:
+            return list(sources.values())
+        names = list(names)
+        missing = [name for name in names if name not in sources]
+        if missing:
+            raise KeyError(f"Нет источников {', '.join(missing)} у парсера {group}")
+        return [sources[name] for name in names]
+
+
+@lru_cache(maxsize=None)
+def load_registry(path: str = DEFAULT_SOURCES_FILE) -> SourceRegistry:
+    """Реестр из файла источников, загружается один раз на процесс"""
+    return SourceRegistry.from_file(path)
+
+
+def register_source(group: str, source: Source, path: str = DEFAULT_SOURCES_FILE):
+    """Подключает источник из кода (плагин) к общему реестру"""
+    load_registry(path).register(group, source)
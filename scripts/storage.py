@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Атомарная запись файлов результата
+Файл пишется во временный рядом и переименовывается, так что читатель
+(сборка Next.js, dev-сервер) видит либо старую, либо новую версию целиком.
+Файл с тем же содержимым не перезаписывается, чтобы не менять его mtime
+и не сбрасывать кэши сборки. Большие файлы можно писать кусками, не
+собирая содержимое в памяти
+"""
+
+import filecmp
+import os
+import tempfile
+import time
+from typing import Iterable, Tuple
+
+
+def _write_temp(path: str, chunks: Iterable[bytes]) -> Tuple[str, int]:
+    """Пишет куски во временный файл рядом с path; возвращает его путь и размер"""
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f'.{os.path.basename(path)}.', suffix='.tmp')
+    size = 0
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            for chunk in chunks:
+                f.write(chunk)
+                size += len(chunk)
+            f.flush()
+            os.fsync(f.fileno())
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    return tmp_path, size
+
+
+def atomic_write(path: str, content: bytes):
+    """Записывает файл через временный файл и os.replace"""
+    tmp_path, _ = _write_temp(path, (content,))
+    try:
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def write_if_changed(path: str, content: bytes) -> bool:
+    """Атомарно пишет файл, если его содержимое отличается; True - если записан"""
+    try:
+        if os.path.getsize(path) == len(content):
+            with open(path, 'rb') as f:
+                if f.read() == content:
+                    return False
+    except FileNotFoundError:
+        pass
+    atomic_write(path, content)
+    return True
+
+
+def write_chunks_if_changed(path: str, chunks: Iterable[bytes]) -> Tuple[bool, int]:
+    """То же для содержимого кусками: (записан ли файл, его размер)
+
+    Куски сразу уходят во временный файл, а сравнение с текущим файлом
+    идет по частям, поэтому содержимое целиком в памяти не собирается.
+    """
+    tmp_path, size = _write_temp(path, chunks)
+    try:
+        if os.path.exists(path) and filecmp.cmp(tmp_path, path, shallow=False):
+            os.remove(tmp_path)
+            return False, size
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return True, size
+
+
+class FileLock:
+    """Межпроцессная блокировка через эксклюзивно создаваемый файл
+
+    Нужна для общего манифеста: парсеры запускаются параллельно и пишут
+    результаты в одну папку.
+    """
+
+    def __init__(self, path: str, timeout: float = 30.0, stale_after: float = 120.0):
+        self.path = path
+        self.timeout = timeout
+        self.stale_after = stale_after
+
+    def __enter__(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                os.write(fd, str(os.getpid()).encode())
+                os.close(fd)
+                return self
+            except FileExistsError:
+                # Блокировка, оставленная упавшим процессом
+                try:
+                    if time.time() - os.path.getmtime(self.path) > self.stale_after:
+                        os.remove(self.path)
+                        continue
+                except FileNotFoundError:
+                    continue
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"Не удалось получить блокировку {self.path}")
+                time.sleep(0.05)
+
+    def __exit__(self, *exc_info):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
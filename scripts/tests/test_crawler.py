@@ -0,0 +1,74 @@
+from concurrent.futures import Future, ProcessPoolExecutor
+
+from checkpoint import CheckpointStore
+from crawler import Crawler
+from fetcher import FetchResult
+from metrics import METRICS
+from validation import WordValidator
+
+VALIDATOR = WordValidator(name='test_pool')
+
+URL = 'https://example.org/page'
+
+
+class StubFetcher:
+    """Загрузчик без сети: на любой URL - одна и та же страница"""
+
+    def __init__(self):
+        self.requested = []
+
+    def submit(self, url, timeout=10):
+        self.requested.append(url)
+        future = Future()
+        future.set_result(FetchResult(url, 200, 'страница'.encode('utf-8')))
+        return future
+
+
+def extract_upper(response):
+    return {'words': [response.text.upper()]}
+
+
+def extract_reversed(response):
+    return {'words': [response.text[::-1]]}
+
+
+def crawl_two_jobs(checkpoint):
+    crawler = Crawler(StubFetcher(), checkpoint)
+    results = crawler.crawl_many({
+        'upper': ([URL], extract_upper, 10),
+        'reversed': ([URL], extract_reversed, 10),
+    })
+    return crawler.fetcher.requested, results
+
+
+def test_resume_keeps_results_of_each_job(tmp_path):
+    checkpoint = CheckpointStore(str(tmp_path / 'checkpoint.sqlite'))
+    try:
+        requested, first = crawl_two_jobs(checkpoint)
+        assert len(requested) == 2
+        assert first == {'upper': {'words': ['СТРАНИЦА']}, 'reversed': {'words': ['ацинартс']}}
+
+        # Продолжение: обе страницы берутся из контрольной точки, каждая со своими элементами
+        requested, resumed = crawl_two_jobs(checkpoint)
+        assert requested == []
+        assert resumed == first
+    finally:
+        checkpoint.close()
+
+
+def extract_valid_words(response):
+    return {'words': list(VALIDATOR.filter(['дерево', 'page', 'слово']))}
+
+
+def validator_counters():
+    counters = {item['name']: item['value'] for item in METRICS.to_dict()['counters']
+                if item['labels'].get('validator') == 'test_pool'}
+    return counters.get('items_checked_total', 0), counters.get('items_rejected_total', 0)
+
+
+def test_validator_counters_reach_parent_from_parse_pool():
+    METRICS.reset()
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        results = Crawler(StubFetcher(), parse_pool=pool).crawl([URL], extract_valid_words)
+    assert results == {'words': ['дерево', 'слово']}
+    assert validator_counters() == (3, 1)
@@ -0,0 +1,71 @@
+import json
+
+import pytest
+
+import json_stream
+from json_stream import Stream, iter_json, load_lazy
+
+DOCUMENTS = [
+    {'words': ['а', 'б', 'в'], 'total': 3, 'empty': [], 'nested': {'ids': [1, 2, 3]}},
+    ['ёж', 'дом', 'кот'],
+    # Смешанные списки: скаляр первым и объект/список первым
+    [None, [], True],
+    [1, {'a': 2}],
+    [[1], 2],
+    [{'a': [1, 2]}, 'x', [3, [4]]],
+    {'a': [1, [2]]},
+    {'a': [1, {'b': ['c', 'd']}, 'e'], 'f': ['g']},
+    {'quotes': [{'text': 'цитата "в кавычках"\n', 'author': 'Автор'}], 'escaped': ['\\', 'é', '😀']},
+]
+
+
+def materialize(value):
+    """Потоки Stream - в списки, чтобы сравнить с json.load"""
+    if isinstance(value, Stream):
+        return [materialize(item) for item in value]
+    if isinstance(value, dict):
+        return {key: materialize(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [materialize(item) for item in value]
+    return value
+
+
+@pytest.fixture(params=[None, 7], ids=['default', 'tiny-reads'])
+def read_size(request, monkeypatch):
+    # Крошечные порции чтения проверяют токены на границе порций
+    if request.param is not None:
+        monkeypatch.setattr(json_stream, 'READ_SIZE', request.param)
+        monkeypatch.setattr(json_stream, 'MARGIN', request.param)
+    return request.param
+
+
+@pytest.mark.parametrize('document', DOCUMENTS)
+@pytest.mark.parametrize('indent', [None, 2])
+def test_load_lazy_matches_json_load(tmp_path, read_size, document, indent):
+    path = tmp_path / 'data.json'
+    path.write_text(json.dumps(document, ensure_ascii=False, indent=indent), encoding='utf-8')
+    with open(path, encoding='utf-8') as f:
+        expected = json.load(f)
+    assert materialize(load_lazy(str(path))) == expected
+
+
+def test_load_lazy_streams_only_scalar_lists(tmp_path):
+    path = tmp_path / 'data.json'
+    path.write_text(json.dumps({'words': ['а', 'б'], 'mixed': [1, [2]], 'rows': [[1], 2]}), encoding='utf-8')
+    loaded = load_lazy(str(path))
+    assert isinstance(loaded['words'], Stream)
+    assert loaded['mixed'] == [1, [2]]
+    assert loaded['rows'] == [[1], 2]
+
+
+@pytest.mark.parametrize('document', DOCUMENTS)
+def test_iter_json_matches_json_dumps(document):
+    assert ''.join(iter_json(document, indent=2)) == json.dumps(document, ensure_ascii=False, indent=2)
+    assert ''.join(iter_json(document)) == json.dumps(document, ensure_ascii=False, separators=(',', ':'))
+
+
+def test_load_lazy_rejects_invalid_json(tmp_path):
+    path = tmp_path / 'data.json'
+    path.write_text('{"a": [1 [2]]}', encoding='utf-8')
+    with pytest.raises(ValueError):
+        materialize(load_lazy(str(path)))
@@ -0,0 +1,26 @@
+import time
+from email.utils import formatdate
+
+import pytest
+
+from rate_limiter import parse_retry_after
+
+
+def test_retry_after_seconds():
+    assert parse_retry_after('120') == 120.0
+
+
+def test_retry_after_gmt_date():
+    value = formatdate(time.time() + 60, usegmt=True)
+    assert parse_retry_after(value) == pytest.approx(60, abs=2)
+
+
+@pytest.mark.parametrize('zone', ['-0000', ''])
+def test_retry_after_date_without_zone_is_utc(zone):
+    value = time.strftime('%a, %d %b %Y %H:%M:%S', time.gmtime(time.time() + 60)) + (' ' + zone if zone else '')
+    assert parse_retry_after(value) == pytest.approx(60, abs=2)
+
+
+def test_retry_after_invalid():
+    assert parse_retry_after('скоро') is None
+    assert parse_retry_after(None) is None
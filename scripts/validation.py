@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Общая валидация слов, имен и цитат
+Регулярные выражения компилируются и стоп-листы строятся один раз при
+импорте; пакетные функции проверяют целые итераторы в одном плотном цикле
+"""
+
+import re
+from typing import Iterable, Iterator, List
+
+from metrics import METRICS
+
+# Только русские буквы
+RUSSIAN_WORD = re.compile(r'[А-Яа-яЁё]+')
+# Русские буквы, пробелы и дефис (текст ссылки с именем)
+RUSSIAN_NAME_TEXT = re.compile(r'[А-Яа-яЁё\s\-]+')
+# Хотя бы одна русская буква
+RUSSIAN_LETTER = re.compile(r'[А-Яа-яЁё]')
+# Все, кроме букв, цифр, подчеркивания и дефиса
+NON_NAME_CHARS = re.compile(r'[^\w\-]')
+
+# Служебные слова MediaWiki
+WIKI_STOPWORDS = frozenset([
+    'категория', 'страница', 'вики', 'ссылка', 'редактировать', 'обсуждение',
+    'история', 'создать', 'поиск', 'навигация', 'меню', 'заголовок'
+])
+
+# То же плюс разделы статей
+WIKI_SECTION_STOPWORDS = WIKI_STOPWORDS | frozenset([
+    'содержание', 'примечание', 'см', 'также', 'внешние', 'ссылки', 'литература', 'примечания'
+])
+
+# То же плюс интерфейс редактирования
+WIKI_EDITOR_STOPWORDS = WIKI_SECTION_STOPWORDS | frozenset([
+    'шаблон', 'проект', 'участник', 'вклад', 'источник', 'правка', 'отмена',
+    'сохранить', 'предварительный'
+])
+
+# Подстроки, по которым текст ссылки точно не имя
+NAME_PAGE_SUBSTRINGS = ('имя', 'имена', 'список', 'категория', 'страница', 'википедия')
+
+# Технические тексты, которые не считаются цитатами
+QUOTE_EXCLUDE_PATTERNS = (
+    re.compile(r'^\d+$'),                       # Только цифры
+    re.compile(r'^[А-Яа-яЁё\s]*$'),             # Только русские буквы и пробелы (слишком просто)
+    re.compile(r'категория|страница|вики|ссылка'),  # Технические слова
+)
+
+
+class WordValidator:
+    """Проверка слова: длина, только русские буквы, нет в стоп-листе"""
+
+    def __init__(self, min_length: int = 2, max_length: int = 20, stopwords: frozenset = WIKI_STOPWORDS,
+                 name: str = 'word'):
+        self.min_length = min_length
+        self.max_length = max_length
+        self.stopwords = stopwords
+        # Имя валидатора в метриках отброшенных элементов
+        self.name = name
+
+    def is_valid(self, word: str) -> bool:
+        if not word or not self.min_length <= len(word) <= self.max_length:
+            return False
+        if RUSSIAN_WORD.fullmatch(word) is None:
+            return False
+        return word.lower() not in self.stopwords
+
+    def filter(self, words: Iterable[str]) -> Iterator[str]:
+        """Пакетная проверка: отдает только валидные слова"""
+        fullmatch = RUSSIAN_WORD.fullmatch
+        min_length = self.min_length
+        max_length = self.max_length
+        stopwords = self.stopwords
+        checked = accepted = 0
+        try:
+            for word in words:
+                checked += 1
+                if (min_length <= len(word) <= max_length
+                        and fullmatch(word) is not None
+                        and word.lower() not in stopwords):
+                    accepted += 1
+                    yield word
+        finally:
+            record_rejects(self.name, checked, accepted)
+
+    def filter_lines(self, lines: Iterable[str]) -> Iterator[str]:
+        """Пакетная проверка строк датасета (с обрезкой пробелов)"""
+        return self.filter(line.strip() for line in lines)
+
+
+def record_rejects(validator: str, checked: int, accepted: int):
+    """Счетчики пакетной проверки: сколько элементов проверено и отброшено"""
+    METRICS.inc('items_checked_total', checked, validator=validator)
+    METRICS.inc('items_rejected_total', checked - accepted, validator=validator)
+
+
+def is_name_like_text(text: str) -> bool:
+    """Текст похож на имя: русские буквы/пробел/дефис и нет служебных подстрок"""
+    if not text or len(text) < 2 or len(text) > 20:
+        return False
+    if RUSSIAN_NAME_TEXT.fullmatch(text) is None:
+        return False
+    lowered = text.lower()
+    return not any(substring in lowered for substring in NAME_PAGE_SUBSTRINGS)
+
+
+def find_russian_words(text: str) -> List[str]:
+    """Все последовательности русских букв в тексте"""
+    return RUSSIAN_WORD.findall(text)
+
+
+def clean_names(names: Iterable[str], min_length: int = 2, max_length: int = 20) -> Iterator[str]:
+    """Пакетная очистка имен: убирает лишние символы, проверяет и капитализирует"""
+    strip_chars = NON_NAME_CHARS.sub
+    fullmatch = RUSSIAN_WORD.fullmatch
+    checked = accepted = 0
+    try:
+        for name in names:
+            checked += 1
+            name = strip_chars('', name.strip())
+            if min_length <= len(name) <= max_length and fullmatch(name) is not None:
+                accepted += 1
+                yield name.capitalize()
+    finally:
+        record_rejects('name', checked, accepted)
+
+
+def is_valid_quote(text: str) -> bool:
+    """Проверяет, является ли текст валидной цитатой"""
+    if not text or len(text) < 10 or len(text) > 500:
+        return False
+    if RUSSIAN_LETTER.search(text) is None:
+        return False
+    lowered = text.lower()
+    return not any(pattern.search(lowered) for pattern in QUOTE_EXCLUDE_PATTERNS)
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Потоковое чтение дампа Викисловаря (ruwiktionary-*-pages-articles.xml.bz2)
+Файл распаковывается и разбирается порциями через XMLPullParser: каждая
+статья очищается и удаляется из дерева сразу после разбора, поэтому память
+не растет с размером дампа. Из русской секции статьи по шаблону морфологии
+берется часть речи: существительные ({{сущ ru ...}}) и прилагательные
+({{прил ru ...}}). Работа делится между процессами: дамп multistream с
+индексом читается воркерами по диапазонам потоков bz2, обычный дамп
+распаковывается в основном процессе, а статьи разбираются в пуле пачками
+"""
+
+import bz2
+import os
+import re
+from concurrent.futures import FIRST_COMPLETED, Executor, as_completed, wait
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from lxml import etree
+
+from metrics import METRICS
+from normalization import to_nfc
+from validation import WordValidator
+
+NOUN = 'noun'
+ADJECTIVE = 'adjective'
+PARTS_OF_SPEECH = (NOUN, ADJECTIVE)
+
+# Шаблон морфологии русской секции -> часть речи
+POS_TEMPLATES = {'сущ': NOUN, 'прил': ADJECTIVE}
+POS_TEMPLATE = re.compile(r'\{\{\s*(сущ|прил)[ _]ru\b')
+# Заголовок языковой секции: = {{-ru-}} =
+LANGUAGE_HEADING = re.compile(r'^=\s*\{\{-([\w-]+)-\}\}\s*=\s*$', re.MULTILINE)
+RUSSIAN_MARK = '{{-ru-}}'
+
+READ_SIZE = 1 << 20
+# Статей в пачке для воркера (обычный дамп) и пачек в очереди пула:
+# распаковка не уходит дальше разбора больше чем на несколько пачек
+BATCH_PAGES = 500
+PENDING_BATCHES = 2 * (os.cpu_count() or 1)
+# Потоков bz2 в одном задании воркера (multistream, по 100 статей в потоке)
+STREAMS_PER_TASK = 200
+PROGRESS_EVERY = 100_000
+
+Page = Tuple[str, str]
+Words = Dict[str, Set[str]]
+
+
+def find_index(path: str) -> Optional[str]:
+    """Индекс дампа multistream рядом с ним (…-multistream-index.txt.bz2) или None"""
+    if not path.endswith('-multistream.xml.bz2'):
+        return None
+    index = path[:-len('.xml.bz2')] + '-index.txt.bz2'
+    return index if os.path.exists(index) else None
+
+
+def stream_offsets(index: str) -> List[int]:
+    """Смещения потоков bz2 из индекса (строки «смещение:id:заголовок»)"""
+    offsets = []
+    with bz2.open(index, 'rt', encoding='utf-8') as f:
+        for line in f:
+            offset = int(line.split(':', 1)[0])
+            if not offsets or offsets[-1] != offset:
+                offsets.append(offset)
+    return offsets
+
+
+def read_chunks(path: str) -> Iterator[bytes]:
+    """Распакованный дамп порциями (.bz2, в том числе multistream, или .xml)"""
+    opener = bz2.open if path.endswith('.bz2') else open
+    with opener(path, 'rb') as f:
+        while True:
+            chunk = f.read(READ_SIZE)
+            if not chunk:
+                return
+            yield chunk
+
+
+def read_streams(path: str, start: int, end: Optional[int]) -> Iterator[bytes]:
+    """Распакованные потоки bz2 из байтов [start, end) файла multistream"""
+    with open(path, 'rb') as f:
+        f.seek(start)
+        remaining = None if end is None else end - start
+        decompressor = bz2.BZ2Decompressor()
+        while remaining is None or remaining > 0:
+            data = f.read(READ_SIZE if remaining is None else min(READ_SIZE, remaining))
+            if not data:
+                return
+            if remaining is not None:
+                remaining -= len(data)
+            while data:
+                yield decompressor.decompress(data)
+                data = b''
+                # Поток закончился: хвост порции - начало следующего потока
+                if decompressor.eof:
+                    data = decompressor.unused_data
+                    decompressor = bz2.BZ2Decompressor()
+
+
+def page_fields(page) -> Dict[str, Optional[str]]:
+    """Поля <page> и его <revision> по имени тега без пространства имен схемы
+
+    Один проход по дочерним элементам: findtext с шаблоном {*} на каждую
+    статью заметно медленнее самого разбора XML.
+    """
+    prefix = len(page.tag) - len('page')
+    fields = {}
+    for child in page:
+        tag = child.tag[prefix:]
+        if tag == 'revision':
+            for field in child:
+                fields[field.tag[prefix:]] = field.text
+        else:
+            fields[tag] = child.text
+    return fields
+
+
+def iter_pages(chunks: Iterable[bytes], wrap: bool = False) -> Iterator[Page]:
+    """(заголовок, викитекст) статей основного пространства без перенаправлений
+
+    wrap - данные без корневого элемента (потоки multistream после первого);
+    его закрывающий тег придет в последнем потоке дампа.
+    """
+    parser = etree.XMLPullParser(events=('end',), tag='{*}page', huge_tree=True)
+    if wrap:
+        parser.feed(b'<mediawiki>')
+    for chunk in chunks:
+        parser.feed(chunk)
+        for _, page in parser.read_events():
+            fields = page_fields(page)
+            if fields.get('ns') == '0' and 'redirect' not in fields:
+                yield fields.get('title') or '', fields.get('text') or ''
+            # Разобранные статьи не копятся в дереве
+            page.clear()
+            while page.getprevious() is not None:
+                del page.getparent()[0]
+
+
+def russian_section(text: str) -> Optional[str]:
+    """Русская секция статьи: от = {{-ru-}} = до заголовка следующего языка"""
+    if RUSSIAN_MARK not in text:
+        return None
+    headings = list(LANGUAGE_HEADING.finditer(text))
+    for position, heading in enumerate(headings):
+        if heading.group(1) == 'ru':
+            end = headings[position + 1].start() if position + 1 < len(headings) else len(text)
+            return text[heading.end():end]
+    return None
+
+
+def parts_of_speech(text: str) -> Set[str]:
+    """Части речи русской секции (у омонимов их может быть несколько)"""
+    section = russian_section(text)
+    if section is None:
+        return set()
+    return {POS_TEMPLATES[match.group(1)] for match in POS_TEMPLATE.finditer(section)}
+
+
+def is_candidate(title: str, text: str) -> bool:
+    """Статья может дать слово: есть русская секция, заголовок со строчной буквы
+
+    С прописной буквы в Викисловаре пишутся имена собственные.
+    """
+    return RUSSIAN_MARK in text and title.islower()
+
+
+def extract_words(pages: Iterable[Page], validator: WordValidator) -> Tuple[Words, int]:
+    """Слова по частям речи из статей и число прочитанных статей"""
+    words = {pos: set() for pos in PARTS_OF_SPEECH}
+    count = 0
+    for title, text in pages:
+        count += 1
+        if not is_candidate(title, text):
+            continue
+        word = to_nfc(title)
+        if not validator.is_valid(word):
+            continue
+        for pos in parts_of_speech(text):
+            words[pos].add(word)
+    return words, count
+
+
+def extract_streams(path: str, start: int, end: Optional[int], validator: WordValidator) -> Tuple[Words, int]:
+    """Задание воркера для multistream: свой диапазон потоков bz2"""
+    return extract_words(iter_pages(read_streams(path, start, end), wrap=True), validator)
+
+
+class WiktionaryDump:
+    """Существительные и прилагательные из локального дампа Викисловаря"""
+
+    def __init__(self, path: str, validator: WordValidator, pool: Optional[Executor] = None,
+                 index: Optional[str] = None):
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Нет дампа Викисловаря: {path}")
+        self.path = path
+        self.validator = validator
+        # Пул процессов разбора; без него дамп читается в текущем процессе
+        self.pool = pool
+        self.index = index or find_index(path)
+
+    def words(self) -> Dict[str, List[str]]:
+        """{часть речи: отсортированные слова} по всему дампу"""
+        name = os.path.basename(self.path)
+        print(f"📖 Читаю дамп: {self.path}" + (" (multistream)" if self.index and self.pool else ""))
+
+        words = {pos: set() for pos in PARTS_OF_SPEECH}
+        pages = reported = 0
+        with METRICS.timer('stage_seconds', stage='dump', file=name):
+            for found, count in self._results():
+                for pos, values in found.items():
+                    words[pos].update(values)
+                pages += count
+                if pages - reported >= PROGRESS_EVERY:
+                    reported = pages
+                    print(f"📄 Прочитано статей: {pages:,} (слов: {sum(map(len, words.values())):,})")
+
+        METRICS.inc('dump_pages_total', pages, file=name)
+        for pos, values in words.items():
+            METRICS.inc('items_extracted_total', len(values), host=name, dataset=pos)
+        print(f"✅ Дамп прочитан: {pages:,} статей, "
+              + ', '.join(f"{pos}: {len(values):,}" for pos, values in words.items()))
+        return {pos: sorted(values) for pos, values in words.items()}
+
+    def _results(self) -> Iterator[Tuple[Words, int]]:
+        if self.pool is None:
+            # Тот же разбор в текущем процессе, отрезками для вывода прогресса
+            pages = iter_pages(read_chunks(self.path))
+            while True:
+                found, count = extract_words(islice(pages, PROGRESS_EVERY), self.validator)
+                if not count:
+                    return
+                yield found, count
+        elif self.index is not None:
+            yield from self._map_streams()
+        else:
+            yield from self._map_batches()
+
+    def _map_streams(self) -> Iterator[Tuple[Words, int]]:
+        """Multistream: каждый воркер сам читает и распаковывает свой диапазон файла
+
+        Первый поток дампа - заголовок siteinfo, статьи начинаются со
+        смещения первой записи индекса.
+        """
+        offsets = stream_offsets(self.index)
+        bounds = offsets[::STREAMS_PER_TASK] + [None]
+        futures = [
+            self.pool.submit(extract_streams, self.path, start, end, self.validator)
+            for start, end in zip(bounds, bounds[1:])
+        ]
+        for future in as_completed(futures):
+            yield future.result()
+
+    def _map_batches(self) -> Iterator[Tuple[Words, int]]:
+        """Обычный дамп - один поток bz2: распаковка здесь, разбор статей в пуле
+
+        В пул уходят только статьи с русской секцией, и в очереди не больше
+        PENDING_BATCHES пачек.
+        """
+        pending = {}
+        batch = []
+        read = 0
+        for title, text in iter_pages(read_chunks(self.path)):
+            read += 1
+            if not is_candidate(title, text):
+                continue
+            batch.append((title, text))
+            if len(batch) >= BATCH_PAGES:
+                pending[self.pool.submit(extract_words, batch, self.validator)] = read
+                batch, read = [], 0
+                if len(pending) >= PENDING_BATCHES:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()[0], pending.pop(future)
+        pending[self.pool.submit(extract_words, batch, self.validator)] = read
+        for future in as_completed(pending):
+            yield future.result()[0], pending[future]
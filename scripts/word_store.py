@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+"""
+Компактное множество слов с выгрузкой на диск
+Слова копятся в отсортированных блоках UTF-8 («прогонах»): слово занимает
+свои байты и перевод строки вместо отдельного объекта str в set или list.
+Новые слова собираются в небольшой буфер; заполненный буфер сортируется и
+становится прогоном, а прогоны сливаются k-путевым слиянием с удалением
+повторов. Если задан предел памяти (max_bytes), прогоны сверх него
+сливаются во временный файл, и дальше хранилище работает как внешняя
+сортировка: в памяти остаются только буфер и буферы чтения файлов.
+Обход всегда идет по порядку байтов UTF-8, который совпадает с порядком
+sorted() для строк. Слова не должны содержать перевод строки
+"""
+
+import heapq
+import io
+import os
+import tempfile
+import weakref
+from array import array
+from bisect import bisect_left
+from itertools import accumulate, islice
+from operator import itemgetter
+from typing import Iterable, Iterator, List, Optional, Union
+
+# Слов в буфере до сброса в прогон и прогонов до слияния в один
+BUFFER_SIZE = 200_000
+MAX_RUNS = 32
+# Строк в одной пачке при записи прогона
+BATCH_SIZE = 65_536
+# Буфер чтения файла прогона: при слиянии открыто до MAX_RUNS файлов
+READ_BUFFER = 256 * 1024
+
+NEWLINE = '\n'
+
+# Строка без завершающего перевода строки
+_strip_newline = itemgetter(slice(None, -1))
+
+
+def _unique(lines: Iterable[bytes]) -> Iterator[bytes]:
+    """Отсортированный поток без повторов"""
+    previous = None
+    for line in lines:
+        if line != previous:
+            yield line
+            previous = line
+
+
+def _difference(lines: Iterable[bytes], removed: Iterable[bytes]) -> Iterator[bytes]:
+    """Отсортированный поток без строк отсортированного потока removed (слиянием)"""
+    removed = iter(removed)
+    current = next(removed, None)
+    for line in lines:
+        while current is not None and current < line:
+            current = next(removed, None)
+        if line != current:
+            yield line
+
+
+def _batches(lines: Iterable[bytes]) -> Iterator[List[bytes]]:
+    lines = iter(lines)
+    while True:
+        batch = list(islice(lines, BATCH_SIZE))
+        if not batch:
+            return
+        yield batch
+
+
+def _remove_file(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class Run:
+    """Отсортированный блок строк без повторов в памяти: байты и смещения начала строк
+
+    Строки хранятся вместе с завершающим переводом строки. Он меньше любого
+    символа слова, поэтому строки сравниваются в том же порядке, что и
+    слова, и прогоны сливаются без обрезки каждой строки.
+    """
+
+    def __init__(self, blob: bytes, offsets: array):
+        self.blob = blob
+        self.offsets = offsets
+
+    @classmethod
+    def from_lines(cls, lines: Iterable[bytes]) -> 'Run':
+        """Прогон из отсортированных строк UTF-8 с переводом строки, без повторов"""
+        # BytesIO растет с небольшим запасом и отдает буфер без копирования
+        buffer = io.BytesIO()
+        # 4 байта на смещение, пока блок меньше 4 ГБ
+        offsets = array('I')
+        position = 0
+        # Пачками: join, accumulate и map работают на уровне C
+        for batch in _batches(lines):
+            ends = list(accumulate(map(len, batch)))
+            if position + ends[-1] > 0xFFFFFFFF and offsets.typecode == 'I':
+                offsets = array('Q', offsets)
+            offsets.append(position)
+            offsets.extend(map(position.__add__, ends[:-1]))
+            buffer.write(b''.join(batch))
+            position += ends[-1]
+        return cls(buffer.getvalue(), offsets)
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.blob) + self.offsets.itemsize * len(self.offsets)
+
+    def lines(self) -> Iterator[bytes]:
+        # Строки режет BytesIO на уровне C; буфер blob при этом не копируется
+        return iter(io.BytesIO(self.blob))
+
+    def words(self) -> Iterator[str]:
+        return map(_strip_newline, io.TextIOWrapper(io.BytesIO(self.blob), encoding='utf-8', newline=NEWLINE))
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def __getitem__(self, position: int) -> bytes:
+        end = self.offsets[position + 1] if position + 1 < len(self.offsets) else len(self.blob)
+        return self.blob[self.offsets[position]:end]
+
+    def index(self, line: bytes) -> int:
+        """Номер строки в прогоне или -1"""
+        position = bisect_left(self, line)
+        return position if position < len(self) and self[position] == line else -1
+
+    def __contains__(self, line: bytes) -> bool:
+        return self.index(line) >= 0
+
+    def without(self, lines: Iterable[bytes]) -> 'Run':
+        """Прогон без указанных строк: байты между ними копируются целыми блоками"""
+        positions = sorted({position for position in map(self.index, lines) if position >= 0})
+        if not positions:
+            return self
+        buffer = io.BytesIO()
+        view = memoryview(self.blob)
+        offsets = array(self.offsets.typecode)
+        start = removed = 0
+        for position in positions + [len(self)]:
+            if start < position:
+                end = self.offsets[position] if position < len(self) else len(self.blob)
+                buffer.write(view[self.offsets[start]:end])
+                # Смещения блока сдвигаются на длину уже удаленных строк: offset - removed
+                offsets.extend(map(removed.__rsub__, self.offsets[start:position]))
+            if position < len(self):
+                removed += len(self[position])
+            start = position + 1
+        return Run(buffer.getvalue(), offsets)
+
+
+class FileRun:
+    """Прогон во временном файле: те же строки, но читаются только потоком
+
+    Файл удаляется, когда на прогон не остается ссылок (в том числе из
+    незаконченных обходов), или при выходе из процесса.
+    """
+
+    # Прогон на диске не занимает память под байты строк
+    nbytes = 0
+
+    def __init__(self, path: str, count: int):
+        self.path = path
+        self.count = count
+        self._finalizer = weakref.finalize(self, _remove_file, path)
+
+    @classmethod
+    def from_lines(cls, lines: Iterable[bytes], directory: Optional[str] = None) -> 'FileRun':
+        """Прогон из отсортированных строк UTF-8 с переводом строки, без повторов"""
+        descriptor, path = tempfile.mkstemp(suffix='.run', prefix='words-', dir=directory)
+        count = 0
+        try:
+            with os.fdopen(descriptor, 'wb') as f:
+                for batch in _batches(lines):
+                    f.write(b''.join(batch))
+                    count += len(batch)
+        except BaseException:
+            _remove_file(path)
+            raise
+        return cls(path, count)
+
+    def lines(self) -> Iterator[bytes]:
+        with open(self.path, 'rb', buffering=READ_BUFFER) as f:
+            yield from f
+
+    def words(self) -> Iterator[str]:
+        with open(self.path, encoding='utf-8', newline=NEWLINE, buffering=READ_BUFFER) as f:
+            yield from map(_strip_newline, f)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __contains__(self, line: bytes) -> bool:
+        # У файла нет смещений строк, поэтому поиск - проход по файлу
+        return any(stored == line for stored in self.lines())
+
+    def remove(self):
+        self._finalizer()
+
+
+AnyRun = Union[Run, FileRun]
+
+
+class WordStore:
+    """Множество строк с потоковой вставкой и обходом по порядку
+
+    max_bytes - предел памяти под прогоны: сверх него прогоны сливаются во
+    временный файл в каталоге spill_dir (None - без предела, все в памяти).
+    """
+
+    def __init__(self, words: Iterable[str] = (), buffer_size: int = BUFFER_SIZE, max_runs: int = MAX_RUNS,
+                 max_bytes: Optional[int] = None, spill_dir: Optional[str] = None):
+        self.buffer_size = buffer_size
+        self.max_runs = max_runs
+        self.max_bytes = max_bytes
+        self.spill_dir = spill_dir
+        self._buffer = set()
+        self._runs: List[AnyRun] = []
+        self.update(words)
+
+    def empty_like(self) -> 'WordStore':
+        """Пустое хранилище с теми же пределами и каталогом выгрузки"""
+        return WordStore(buffer_size=self.buffer_size, max_runs=self.max_runs,
+                         max_bytes=self.max_bytes, spill_dir=self.spill_dir)
+
+    @classmethod
+    def from_sorted(cls, words: Iterable[str]) -> 'WordStore':
+        """Хранилище из уже отсортированных слов без повторов: один прогон без буфера"""
+        store = cls()
+        store._runs.append(Run.from_lines((word + NEWLINE).encode('utf-8') for word in words))
+        return store
+
+    def add(self, word: str):
+        self._buffer.add(word)
+        if len(self._buffer) >= self.buffer_size:
+            self._flush()
+
+    def update(self, words: Iterable[str]):
+        buffer = self._buffer
+        limit = self.buffer_size
+        for word in words:
+            buffer.add(word)
+            if len(buffer) >= limit:
+                self._flush()
+                buffer = self._buffer
+
+    @property
+    def spilled(self) -> bool:
+        """Часть слов выгружена во временные файлы"""
+        return any(isinstance(run, FileRun) for run in self._runs)
+
+    def _flush(self):
+        """Буфер -> новый прогон; прогоны сверх предела памяти уходят на диск,
+        при избытке прогонов они сливаются в один"""
+        if self._buffer:
+            blob = (NEWLINE.join(sorted(self._buffer)) + NEWLINE).encode('utf-8')
+            self._runs.append(Run.from_lines(io.BytesIO(blob)))
+            self._buffer = set()
+        if self.max_bytes is not None and self.nbytes > self.max_bytes:
+            self._spill()
+        if len(self._runs) > self.max_runs:
+            self._merge()
+
+    def _spill(self):
+        """Прогоны из памяти сливаются в один временный файл"""
+        in_memory = [run for run in self._runs if isinstance(run, Run)]
+        on_disk = [run for run in self._runs if isinstance(run, FileRun)]
+        self._runs = on_disk + [FileRun.from_lines(self._merged(in_memory), self.spill_dir)]
+
+    def _merge(self):
+        if len(self._runs) > 1:
+            # Файлы слитых прогонов удаляются, когда их дочитают начатые обходы
+            runs, self._runs = self._runs, []
+            self._runs = [self._new_run(self._merged(runs), on_disk=any(isinstance(run, FileRun) for run in runs))]
+
+    def _new_run(self, lines: Iterable[bytes], on_disk: bool) -> AnyRun:
+        return FileRun.from_lines(lines, self.spill_dir) if on_disk else Run.from_lines(lines)
+
+    @staticmethod
+    def _merged(runs: List[AnyRun]) -> Iterator[bytes]:
+        if len(runs) == 1:
+            return runs[0].lines()
+        return _unique(heapq.merge(*(run.lines() for run in runs)))
+
+    def compact(self) -> 'WordStore':
+        """Сводит все слова в один прогон (после этого len - без слияния)"""
+        self._flush()
+        self._merge()
+        return self
+
+    def lines(self) -> Iterator[bytes]:
+        """Слова в UTF-8 с переводом строки, по порядку и без повторов"""
+        self._flush()
+        return self._merged(self._runs) if self._runs else iter(())
+
+    def iter_bytes(self) -> Iterator[bytes]:
+        """Слова в UTF-8 по порядку, без повторов"""
+        return map(_strip_newline, self.lines())
+
+    def __iter__(self) -> Iterator[str]:
+        self._flush()
+        if len(self._runs) == 1:
+            return self._runs[0].words()
+        return (line.decode('utf-8') for line in self.iter_bytes())
+
+    def __len__(self) -> int:
+        self.compact()
+        return len(self._runs[0]) if self._runs else 0
+
+    def __bool__(self) -> bool:
+        return bool(self._buffer) or any(self._runs)
+
+    def __contains__(self, word: str) -> bool:
+        if word in self._buffer:
+            return True
+        line = (word + NEWLINE).encode('utf-8')
+        return any(line in run for run in self._runs)
+
+    def without(self, words: Union['WordStore', Iterable[str]]) -> 'WordStore':
+        """Новое хранилище без указанных слов (одним прогоном)
+
+        Немногие слова вырезаются из прогона в памяти поиском делением
+        пополам, иначе оба хранилища проходятся одним слиянием.
+        """
+        self.compact()
+        store = self.empty_like()
+        if not self._runs:
+            return store
+        if not isinstance(words, WordStore):
+            removed, words = words, self.empty_like()
+            words.update(removed)
+        run = self._runs[0]
+        if isinstance(run, Run) and not words.spilled and len(words) * 64 < len(run):
+            store._runs.append(run.without(words.lines()))
+        else:
+            store._runs.append(self._new_run(_difference(run.lines(), words.lines()), isinstance(run, FileRun)))
+        return store
+
+    def close(self):
+        """Удаляет временные файлы прогонов сразу; хранилище становится пустым"""
+        for run in self._runs:
+            if isinstance(run, FileRun):
+                run.remove()
+        self._runs = []
+        self._buffer = set()
+
+    @property
+    def nbytes(self) -> int:
+        """Объем прогонов в памяти в байтах (без буфера и файлов)"""
+        return sum(run.nbytes for run in self._runs)
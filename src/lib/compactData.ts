@@ -0,0 +1,68 @@
+// Декодер компактного формата наборов данных (scripts/output.py, формат strtab-1):
+// строки лежат в одной таблице, списки хранятся индексами в нее
+
+const SORTED_INDEXES = '@d'
+const INDEXES = '@i'
+const COLUMNS = '@c'
+
+export const COMPACT_FORMAT = 'strtab-1'
+
+export interface CompactPayload {
+  format: string
+  strings: string[]
+  data: unknown
+}
+
+function decodeValue(value: unknown, table: string[]): unknown {
+  if (Array.isArray(value)) {
+    return value.map((item) => decodeValue(item, table))
+  }
+  if (value === null || typeof value !== 'object') {
+    return value
+  }
+
+  const entries = Object.entries(value as Record<string, unknown>)
+  if (entries.length === 1) {
+    const [key, item] = entries[0]
+    if (key === SORTED_INDEXES) {
+      const deltas = item as number[]
+      const result = new Array<string>(deltas.length)
+      let position = 0
+      for (let i = 0; i < deltas.length; i++) {
+        position += deltas[i]
+        result[i] = table[position]
+      }
+      return result
+    }
+    if (key === INDEXES) {
+      return (item as number[]).map((position) => table[position])
+    }
+    if (key === COLUMNS) {
+      const names = Object.keys(item as object)
+      const columns = names.map((name) => decodeValue((item as Record<string, unknown>)[name], table) as unknown[])
+      const length = columns.length ? columns[0].length : 0
+      const rows = new Array<Record<string, unknown>>(length)
+      for (let i = 0; i < length; i++) {
+        const row: Record<string, unknown> = {}
+        names.forEach((name, column) => {
+          row[name] = columns[column][i]
+        })
+        rows[i] = row
+      }
+      return rows
+    }
+  }
+
+  const result: Record<string, unknown> = {}
+  for (const [key, item] of entries) {
+    result[key] = decodeValue(item, table)
+  }
+  return result
+}
+
+export function decodeCompact<T>(payload: CompactPayload): T {
+  if (payload.format !== COMPACT_FORMAT) {
+    throw new Error(`Неизвестный формат данных: ${payload.format}`)
+  }
+  return decodeValue(payload.data, payload.strings) as T
+}
@@ -0,0 +1,40 @@
+// Выборка из шардированных наборов (scripts/shards.py): по манифесту
+// выбирается случайный индекс во всем наборе и загружается одна часть с ним
+
+export interface ShardChunk {
+  file: string
+  start: number
+  count: number
+}
+
+export interface ShardManifest {
+  version: number
+  shardSize: number
+  datasets: Record<string, { count: number; chunks: ShardChunk[] }>
+}
+
+// Загрузка части по пути из манифеста (fetch из public/ или динамический import)
+export type ChunkLoader = (file: string) => Promise<string[]>
+
+export function countItems(manifest: ShardManifest, datasets: string[]): number {
+  return datasets.reduce((total, dataset) => total + manifest.datasets[dataset].count, 0)
+}
+
+export async function itemAt(manifest: ShardManifest, dataset: string, position: number, load: ChunkLoader): Promise<string> {
+  const chunk = manifest.datasets[dataset].chunks[Math.floor(position / manifest.shardSize)]
+  const items = await load(chunk.file)
+  return items[position - chunk.start]
+}
+
+// Равномерно случайный элемент из объединения списков datasets
+export async function sampleItem(manifest: ShardManifest, datasets: string[], load: ChunkLoader): Promise<string> {
+  let position = Math.floor(Math.random() * countItems(manifest, datasets))
+  for (const dataset of datasets) {
+    const size = manifest.datasets[dataset].count
+    if (position < size) {
+      return itemAt(manifest, dataset, position, load)
+    }
+    position -= size
+  }
+  throw new RangeError('Пустой набор данных')
+}